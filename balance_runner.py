@@ -0,0 +1,220 @@
+"""
+Monte Carlo balance testing: plays many independent bot games in parallel.
+
+Each game gets its own seed and runs headless on a worker process. Workers
+play games in batches and send back one compact NumPy record per game (never
+the fields themselves); the results are aggregated into win rate, survival
+times, time to reach each size and what size of AI player ate the bot.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import numpy as np
+from character import Character, AIPlayer
+from hungry_sharks_field import HungrySharksField, HungrySharksArrayField
+from hungry_sharks_headless import HeadlessRunner
+from player_input import ChaseBotInput
+import behavior_kernels
+
+OUTCOMES = ("timeout", "win", "lose")
+MAX_SIZE = 10
+
+# one record per game
+GAME_RECORD = np.dtype([
+    ("seed", np.int64),
+    ("outcome", np.int8),
+    ("survival_time", np.float64),
+    # game time at which the player first reached each size (NaN if never),
+    # indexed by size; index MAX_SIZE + 1 is "evolved past the whale shark"
+    ("size_reached_at", np.float64, (MAX_SIZE + 2,)),
+    # size of the AI player that ate the player (0 if it wasn't eaten)
+    ("eaten_by", np.int8),
+])
+
+FIELD_CLASSES = {
+    "list": HungrySharksField,
+    "array": HungrySharksArrayField,
+}
+
+
+def apply_params(params):
+    """
+    Overrides game balance parameters in this process.
+
+    Args:
+        params (dict): any of "speed_from_size" and "fov_from_size" (dicts of
+            size -> value), "growth_rate" and "max_nemeses"
+    """
+    if "speed_from_size" in params:
+        Character.speed_from_size.update(\
+            {int(size): value for size, value in params["speed_from_size"].items()})
+    if "fov_from_size" in params:
+        AIPlayer.fov_from_size.update(\
+            {int(size): value for size, value in params["fov_from_size"].items()})
+    if "growth_rate" in params:
+        HungrySharksField.growth_rate = params["growth_rate"]
+    if "max_nemeses" in params:
+        HungrySharksField.max_nemeses = params["max_nemeses"]
+    behavior_kernels.refresh_size_tables()
+
+
+def play_game(seed, num_characters=10, max_seconds=600, fps=40, backend="list"):
+    """
+    Plays one bot game and returns its result.
+
+    Args:
+        seed (int): random seed for the game
+        num_characters (int): number of AI players. Defaults to 10.
+        max_seconds (float): game seconds after which the game is called a
+            timeout. Defaults to 600.
+        fps (int): simulation ticks per game second. Defaults to 40.
+        backend (string): "list" or "array". Defaults to "list".
+
+    Returns:
+        (numpy.void): a GAME_RECORD
+    """
+    field = FIELD_CLASSES[backend](1200, 600, num_characters, seed=seed)
+    runner = HeadlessRunner(field, ChaseBotInput(), fps=fps)
+
+    record = np.zeros((), dtype=GAME_RECORD)
+    record["seed"] = seed
+    record["size_reached_at"] = np.nan
+    record["size_reached_at"][field.player.size] = 0
+    max_ticks = int(max_seconds * fps)
+    while not field.game_end and runner.ticks < max_ticks:
+        runner.step()
+        size = min(field.player.size, MAX_SIZE + 1)
+        if np.isnan(record["size_reached_at"][size]):
+            record["size_reached_at"][size] = field.sim_clock.time
+
+    if field.eaten_by is not None:
+        record["eaten_by"] = field.eaten_by.size
+    record["outcome"] = OUTCOMES.index(field.game_end or "timeout")
+    record["survival_time"] = field.sim_clock.time
+    return record
+
+
+def play_batch(job):
+    """
+    Plays a batch of games on a worker process.
+
+    Args:
+        job (tuple): (list of seeds, keyword arguments for play_game)
+
+    Returns:
+        (bytes): the GAME_RECORD array for the batch, as raw bytes
+    """
+    seeds, game_kwargs = job
+    records = np.array([play_game(seed, **game_kwargs) for seed in seeds],\
+        dtype=GAME_RECORD)
+    return records.tobytes()
+
+
+def run_games(num_games, base_seed=0, workers=None, batch_size=16, params=None,\
+        **game_kwargs):
+    """
+    Plays many games across a process pool.
+
+    Args:
+        num_games (int): number of games
+        base_seed (int): game i is played with seed base_seed + i
+        workers (int, optional): worker processes. Defaults to the CPU count.
+        batch_size (int): games per job sent to a worker
+        params (dict, optional): balance overrides, see apply_params
+        game_kwargs: passed on to play_game
+
+    Returns:
+        (numpy array): one GAME_RECORD per game, in seed order
+    """
+    params = params or {}
+    seeds = list(range(base_seed, base_seed + num_games))
+    jobs = [(seeds[i:i + batch_size], game_kwargs)
+            for i in range(0, num_games, batch_size)]
+
+    # spawn (not fork) so workers start clean even if this process has already
+    # started SDL or other threads
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(workers, initializer=apply_params,\
+            initargs=(params,)) as pool:
+        batches = [np.frombuffer(data, dtype=GAME_RECORD)
+                   for data in pool.imap_unordered(play_batch, jobs)]
+
+    records = np.concatenate(batches) if batches else np.zeros(0, dtype=GAME_RECORD)
+    return records[np.argsort(records["seed"])]
+
+
+def aggregate(records):
+    """
+    Summarizes game records.
+
+    Args:
+        records (numpy array): GAME_RECORDs
+
+    Returns:
+        dict: outcome counts, survival time statistics, mean/median time to
+        reach each size and loss counts by the size of the AI that ate the bot
+    """
+    survival = records["survival_time"]
+    summary = {
+        "games": len(records),
+        "outcomes": {name: int(np.count_nonzero(records["outcome"] == code))
+                     for code, name in enumerate(OUTCOMES)},
+        "survival_time": {
+            "mean": float(np.mean(survival)) if len(records) else 0.0,
+            "median": float(np.median(survival)) if len(records) else 0.0,
+            "max": float(np.max(survival)) if len(records) else 0.0,
+        },
+        "time_to_reach_size": {},
+        "eaten_by_size": {},
+    }
+    for size in range(1, MAX_SIZE + 2):
+        reached = records["size_reached_at"][:, size]
+        reached = reached[~np.isnan(reached)]
+        if len(reached):
+            summary["time_to_reach_size"][size] = {
+                "games": len(reached),
+                "mean": float(np.mean(reached)),
+                "median": float(np.median(reached)),
+            }
+    eaters = records["eaten_by"][records["outcome"] == OUTCOMES.index("lose")]
+    for size in np.unique(eaters):
+        summary["eaten_by_size"][int(size)] = int(np.count_nonzero(eaters == size))
+    return summary
+
+
+def main():
+    """
+    Runs a balance test from the command line and prints the summary as JSON.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--games", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--characters", type=int, default=10)
+    parser.add_argument("--max-seconds", type=float, default=600,
+                        help="game seconds before a game is called a timeout")
+    parser.add_argument("--backend", choices=FIELD_CLASSES, default="list")
+    parser.add_argument("--params", help="JSON file of balance overrides "
+                        "(speed_from_size, fov_from_size, growth_rate, max_nemeses)")
+    parser.add_argument("--output", help="also write the summary to this file")
+    args = parser.parse_args()
+
+    params = {}
+    if args.params:
+        with open(args.params, encoding="utf-8") as params_file:
+            params = json.load(params_file)
+
+    records = run_games(args.games, base_seed=args.seed, workers=args.workers,\
+        batch_size=args.batch_size, params=params, num_characters=args.characters,\
+        max_seconds=args.max_seconds, backend=args.backend)
+    summary = json.dumps(aggregate(records), indent=2)
+    print(summary)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as summary_file:
+            summary_file.write(summary)
+
+
+if __name__ == "__main__":
+    main()
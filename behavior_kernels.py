@@ -0,0 +1,237 @@
+"""
+Batched (NumPy) versions of the Hungry Sharks AI rules, operating on every AI
+player at once instead of one AIPlayer at a time.
+"""
+import math
+import random
+import numpy as np
+from euclid3 import Vector2
+from character import Character, AIPlayer
+from character_arrays import BEHAVIOR_CODES
+
+def _fov_table():
+    """
+    Returns the FOV of each AI size, indexed by size.
+    """
+    return np.array([AIPlayer.fov_from_size.get(size, 0) * AIPlayer.fov_scale
+                     for size in range(max(AIPlayer.fov_from_size) + 1)], dtype=float)
+
+
+def _speed_table():
+    """
+    Returns the max speed of each AI size, indexed by size.
+    """
+    return np.array([Character(size, Vector2(0, 0)).max_speed()
+                     if size in Character.speed_from_size else 0
+                     for size in range(max(Character.speed_from_size) + 1)], dtype=float)
+
+
+# fov and max speed of each AI size, indexed by size
+FOV_BY_SIZE = _fov_table()
+SPEED_BY_SIZE = _speed_table()
+
+# seconds a wandering AI keeps its heading before turning
+WANDER_PERIOD = 0.2
+# angular width of a wandering AI's random turn
+WANDER_TURN_RANGE = math.pi/6
+
+# distance from a wall at which AIs start avoiding it
+BOUNDARY_MARGIN = 25
+
+
+def refresh_size_tables():
+    """
+    Rebuilds FOV_BY_SIZE and SPEED_BY_SIZE after AIPlayer.fov_from_size or
+    Character.speed_from_size have been changed.
+    """
+    FOV_BY_SIZE[:] = _fov_table()
+    SPEED_BY_SIZE[:] = _speed_table()
+
+
+def dist_to_walls(positions, window_x, window_y):
+    """
+    Returns the distances from many positions to the field boundaries.
+
+    Args:
+        positions (array): (n, 2) positions
+        window_x (float): field width
+        window_y (float): field height
+
+    Returns:
+        (array): (n, 4) distances to walls in [left, right, top, bottom] form
+    """
+    x = positions[:, 0]
+    y = positions[:, 1]
+    return np.stack([x, window_x - x, y, window_y - y], axis=1)
+
+
+def swept_contacts(offsets, displacements, radius):
+    """
+    Returns when many pairs of characters first collided during the last
+    timestep, moving in straight lines. Same test as
+    hungry_sharks_field.swept_contact.
+
+    Args:
+        offsets (array): (n, 2) offsets between the pairs at the end of the
+            timestep
+        displacements (array): (n, 2) how much each offset changed over the
+            timestep
+        radius (float): the collision radius
+
+    Returns:
+        (array): (n,) fractions of the timestep at which each pair came
+        within radius of each other (0 if they started that close), inf for
+        the pairs that never did
+    """
+    starts = offsets - displacements
+    c = np.einsum("ij,ij->i", starts, starts) - radius**2
+    a = np.einsum("ij,ij->i", displacements, displacements)
+    b = np.einsum("ij,ij->i", starts, displacements)
+    discriminant = b*b - a*c
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = (-b - np.sqrt(discriminant)) / a
+    contacts = np.where((a > 0) & (discriminant > 0) & (t >= 0) & (t < 1), t, np.inf)
+    contacts[c < 0] = 0
+    return contacts
+
+
+def classify_behaviors(positions, velocities, sizes, behaviors, player_position,
+                       player_size, window_x, window_y, walls=True):
+    """
+    Returns every AI player's next behavior state. Same rules as
+    HungrySharksField.update_ai_behaviors:
+
+    - in the wall zone, an AI heading into its closest wall avoids walls, and
+      one that is not keeps its current state (the zone takes precedence over
+      the player)
+    - otherwise an AI that can see the player attacks if bigger, flees if
+      smaller and keeps its state if the same size
+    - everything else wanders
+
+    Args:
+        positions (array): (n, 2) AI positions
+        velocities (array): (n, 2) AI velocities
+        sizes (array): (n,) AI sizes
+        behaviors (array): (n,) current behavior codes
+        player_position: the player's position, an (x, y) pair or an (n, 2)
+            array (one player position per AI)
+        player_size: the player's size, a number or an (n,) array
+        window_x (float): field width
+        window_y (float): field height
+        walls (bool, optional): whether the field's edges are walls to avoid.
+            Defaults to True.
+
+    Returns:
+        (array): (n,) new behavior codes
+    """
+    new_behaviors = behaviors.copy()
+
+    if walls:
+        # wall zone: closest wall (first one on ties, like list.index(min))
+        distances = dist_to_walls(positions, window_x, window_y)
+        closest_wall = np.argmin(distances, axis=1)
+        in_danger_zone = distances[np.arange(len(distances)), closest_wall]\
+            <= BOUNDARY_MARGIN
+
+        # cross product of velocity with the wall direction: (0, 1) for the
+        # left/right walls and (1, 0) for the top/bottom walls
+        cross = np.where(closest_wall < 2, velocities[:, 0], -velocities[:, 1])
+        new_behaviors[in_danger_zone & (cross != 0)] = BEHAVIOR_CODES["avoid walls"]
+    else:
+        in_danger_zone = np.zeros(len(positions), dtype=bool)
+
+    # interact with the player
+    displacement = positions - player_position
+    dist_to_player = np.sqrt(np.einsum("ij,ij->i", displacement, displacement))
+    free = ~in_danger_zone
+    sees_player = free & (dist_to_player < FOV_BY_SIZE[sizes])
+    new_behaviors[sees_player & (sizes > player_size)] = BEHAVIOR_CODES["attack"]
+    new_behaviors[sees_player & (sizes < player_size)] = BEHAVIOR_CODES["flee"]
+    new_behaviors[free & ~sees_player] = BEHAVIOR_CODES["wander"]
+
+    return new_behaviors
+
+
+def wander(positions, velocities, clocks, prev_ticks, indices, now, timestep,\
+           uniform=random.uniform, rng=None):
+    """
+    Moves wandering AI players: each one advances its clock by the time since
+    its previous tick, then either turns to a random new heading (once the
+    clock passes WANDER_PERIOD) or moves along its current heading.
+
+    Args:
+        positions, velocities (array): (n, 2) AI state, updated in place
+        clocks, prev_ticks (array): (n,) AI wander clocks, updated in place
+        indices (array): which AI players are wandering
+        now (float): the current time
+        timestep (float): duration of the tick
+        uniform (callable): draws a random float between two bounds. Turn
+            angles are drawn in index order, like the per-AI controller does.
+        rng (numpy.random.Generator, optional): if given, every turn angle is
+            drawn from it in one call instead of one uniform() call per AI.
+    """
+    clocks[indices] += now - prev_ticks[indices]
+    prev_ticks[indices] = now
+
+    turning = clocks[indices] > WANDER_PERIOD
+    turners = indices[turning]
+    if len(turners):
+        if rng is not None:
+            angles = rng.uniform(-WANDER_TURN_RANGE/2, WANDER_TURN_RANGE/2,\
+                len(turners))
+        else:
+            angles = np.array([uniform(-WANDER_TURN_RANGE/2, WANDER_TURN_RANGE/2)
+                               for _ in range(len(turners))])
+        cos, sin = np.cos(angles), np.sin(angles)
+        vx, vy = velocities[turners, 0], velocities[turners, 1]
+        velocities[turners] = np.stack([cos*vx - sin*vy, sin*vx + cos*vy], axis=1)
+        clocks[turners] = 0
+
+    movers = indices[~turning]
+    positions[movers] += velocities[movers] * timestep
+
+
+def pursue(positions, velocities, sizes, indices, target, timestep, flee=False):
+    """
+    Moves AI players at full speed toward (attack) or away from (flee) a
+    target point. Attackers within 5 of the target stop.
+
+    Args:
+        positions, velocities (array): (n, 2) AI state, updated in place
+        sizes (array): (n,) AI sizes
+        indices (array): which AI players are moving
+        target: the point, an (x, y) pair or one row per index
+        timestep (float): duration of the tick
+        flee (bool): move away from the target instead of toward it
+    """
+    displacement = np.asarray(target, dtype=float) - positions[indices]
+    distance = np.sqrt(np.einsum("ij,ij->i", displacement, displacement))
+    if flee:
+        moving = distance > 0
+        direction = -1
+    else:
+        moving = distance >= 5
+        direction = 1
+    scale = np.zeros_like(distance)
+    scale[moving] = direction * SPEED_BY_SIZE[sizes[indices[moving]]] / distance[moving]
+
+    velocities[indices] = displacement * scale[:, np.newaxis]
+    positions[indices] += velocities[indices] * timestep
+
+
+def bounce(positions, velocities, indices, window_x, window_y, timestep):
+    """
+    Reflects AI players' velocities off their closest wall and moves them.
+
+    Args:
+        positions, velocities (array): (n, 2) AI state, updated in place
+        indices (array): which AI players are bouncing
+        window_x (float): field width
+        window_y (float): field height
+        timestep (float): duration of the tick
+    """
+    walls = dist_to_walls(positions[indices], window_x, window_y)
+    # left/right walls flip x, top/bottom walls flip y
+    axis = np.argmin(walls, axis=1) // 2
+    velocities[indices, axis] *= -1
+    positions[indices] += velocities[indices] * timestep
@@ -0,0 +1,120 @@
+"""
+Benchmarks drawing Hungry Sharks frames, separately from the simulation.
+
+Runs under SDL's dummy video driver (no display needed). Fields of increasing
+size, with every species equally represented, are drawn in each render mode by
+PyGameView.draw itself; the view's profiler phases split each frame into
+viewport culling, sprite transform, blit, progress-bar draw and display update
+time, and a frames-per-second curve is printed for each mode. With
+--world-scale, the fish are spread over a field bigger than the window and
+only the visible ones are drawn.
+"""
+import argparse
+import json
+import os
+
+# must be set before pygame initializes its display
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+# pylint: disable=wrong-import-position
+from hungry_sharks_field import HungrySharksField
+from hungry_sharks_view import PyGameView
+from frame_profiler import FrameProfiler
+
+DEFAULT_SIZES = (10, 100, 1000, 5000)
+PHASES = ("cull", "transform", "blit", "progress_bar", "display_update")
+WINDOW_SIZE = (1200, 600)
+
+
+def build_field(num_characters, seed=0, world_scale=1):
+    """
+    Returns a field with AI players of all ten species in equal numbers, at
+    random positions and headings.
+
+    Args:
+        num_characters (int): number of AI players
+        seed (int): random seed. Defaults to 0.
+        world_scale (int): the field is this many windows wide and high.
+            Defaults to 1.
+    """
+    field = HungrySharksField(WINDOW_SIZE[0] * world_scale, WINDOW_SIZE[1] * world_scale,\
+        0, seed=seed)
+    for i in range(num_characters):
+        field.spawn_new_ai(field.get_new_ai(i % 10 + 1))
+    return field
+
+
+def benchmark_view(num_characters, mode, frames, cache_size, world_scale=1):
+    """
+    Draws a number of frames of one field and returns the median phase times.
+
+    Args:
+        num_characters (int): number of AI players
+        mode (string): "full" or "dirty"
+        frames (int): number of frames to draw (after one warm-up frame)
+        cache_size (int): sprite cache size (0 transforms every sprite every
+            frame)
+        world_scale (int): the field is this many windows wide and high.
+            Defaults to 1.
+
+    Returns:
+        dict: phase name (and "total") -> median milliseconds per frame
+    """
+    field = build_field(num_characters, world_scale=world_scale)
+    # the profiler's window only keeps the timed frames, not the warm-up one
+    profiler = FrameProfiler(window=frames)
+    view = PyGameView(field, sprite_cache_size=cache_size, render_mode=mode,\
+        profiler=profiler, fps=0, window_size=WINDOW_SIZE)
+
+    view.draw()
+    profiler.end_frame()
+    for _ in range(frames):
+        # move everyone a little so dirty rects change every frame
+        for aip in field.characters:
+            aip.update_pos(1/40)
+        view.draw()
+        profiler.end_frame()
+
+    timing = {phase: profiler.percentiles(phase, (50,))[0] for phase in PHASES}
+    timing["total"] = profiler.percentiles("draw", (50,))[0]
+    return timing
+
+
+def main():
+    """
+    Runs the render benchmarks from the command line.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--modes", nargs="+", choices=PyGameView.render_modes,
+                        default=list(PyGameView.render_modes))
+    parser.add_argument("--frames", type=int, default=30)
+    parser.add_argument("--cache-size", type=int, default=1024,
+                        help="sprite cache entries (0 disables caching)")
+    parser.add_argument("--world-scale", type=int, default=1,
+                        help="spread the fish over a field this many windows "
+                        "wide and high (default 1)")
+    parser.add_argument("--output", help="also write the results as JSON")
+    args = parser.parse_args()
+
+    results = {}
+    for mode in args.modes:
+        print(f"\n{mode} redraw, sprite cache {args.cache_size}, "\
+            f"world {args.world_scale}x{args.world_scale} windows")
+        print(f"{'fish':>7} " + " ".join(f"{phase:>15}" for phase in PHASES)
+              + f" {'total':>10} {'fps':>8}")
+        for size in args.sizes:
+            timing = benchmark_view(size, mode, args.frames, args.cache_size,\
+                args.world_scale)
+            fps = 1000 / timing["total"] if timing["total"] else float("inf")
+            results[f"{mode}/{size}"] = dict(timing, fps=fps)
+            print(f"{size:>7} " + " ".join(f"{timing[phase]:>12.3f} ms" for phase in PHASES)
+                  + f" {timing['total']:>7.2f} ms {fps:>8.1f}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as results_file:
+            json.dump(results, results_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+"""
+Benchmarks the Hungry Sharks simulation phases at increasing population sizes.
+
+Each phase of a tick (behavior updates, eating, player collisions and AI
+movement) is timed separately on fields built with a controlled mix of AI
+sizes and behaviors. Results are written as JSON; --compare checks them
+against a saved baseline and exits with status 1 if anything got slower.
+"""
+import argparse
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+from euclid3 import Vector2
+from hungry_sharks_field import HungrySharksField, HungrySharksArrayField
+from character_controller import AIVelocityController, PlayerVelocityController
+from player_input import ChaseBotInput
+from game_loop import step_game
+
+FIELD_CLASSES = {
+    "list": HungrySharksField,
+    "array": HungrySharksArrayField,
+}
+
+# (weights of AI sizes 1-10, weights of wander/attack/flee) for each mix
+MIXES = {
+    # the start of a game: all minnows, all wandering
+    "start": ([1] + [0]*9, (1, 0, 0)),
+    # every size equally likely, a third of the AIs reacting to the player
+    "mixed": ([1]*10, (2, 0.5, 0.5)),
+    # late game: mostly big predators hunting the player
+    "predators": ([0]*5 + [1]*5, (1, 1, 0)),
+}
+
+DEFAULT_SIZES = (10, 1000, 10000, 100000)
+
+
+def build_field(backend, num_characters, mix, seed=0):
+    """
+    Returns a field populated with a reproducible mix of AI players.
+
+    Args:
+        backend (string): "list" or "array"
+        num_characters (int): number of AI players
+        mix (string): a key of MIXES
+        seed (int): random seed. Defaults to 0.
+    """
+    size_weights, behavior_weights = MIXES[mix]
+    field = FIELD_CLASSES[backend](1200, 600, 0, seed=seed)
+    field.player._size = 5
+    for _ in range(num_characters):
+        size = field.rng.choices(range(1, 11), size_weights)[0]
+        aip = field.get_new_ai(size)
+        aip.behavior_state = field.rng.choices(("wander", "attack", "flee"),\
+            behavior_weights)[0]
+        field.spawn_new_ai(aip)
+    return field
+
+
+def time_call(function, repeat):
+    """
+    Returns per-call timings of a function, in milliseconds.
+
+    Args:
+        function (callable): the function, called with no arguments
+        repeat (int): number of calls
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def benchmark_field(backend, num_characters, mix, repeat):
+    """
+    Times each simulation phase on one field mix. Every phase gets a freshly
+    built field, so phases that change the field (behavior updates reclassify
+    AIs, eating respawns them) don't skew the mix the later phases see.
+
+    Returns:
+        dict: phase name -> {"median_ms": ..., "min_ms": ...}
+    """
+    def handle_eating(field):
+        def call():
+            field.handle_eating_and_win_lose()
+            # keep the player the same size so every call does comparable work
+            field.player._size = 5
+            field.player._growth_progress = 0
+            field.game_end = ""
+        return call
+
+    # phase name -> returns the function to time on a given field
+    phases = {
+        "update_ai_behaviors": lambda field: field.update_ai_behaviors,
+        "handle_eating_and_win_lose": handle_eating,
+        "player_collisions": lambda field: field.player_collisions,
+        "ai_move": lambda field: AIVelocityController(field, fps=40).move,
+    }
+
+    results = {}
+    for name, make_call in phases.items():
+        function = make_call(build_field(backend, num_characters, mix))
+        times = time_call(function, repeat)
+        results[name] = {"median_ms": statistics.median(times), "min_ms": min(times)}
+    return results
+
+
+def count_vector2_allocations(function, repeat=1):
+    """
+    Returns how many euclid3 Vector2 objects a function creates per call, and
+    how many garbage collections ran while it was being called.
+
+    Args:
+        function (callable): the function, called with no arguments
+        repeat (int): number of calls
+
+    Returns:
+        (tuple): (Vector2s created per call, garbage collections in total)
+    """
+    created = [0]
+    original_init = Vector2.__init__
+
+    def counting_init(vector, *args, **kwargs):
+        created[0] += 1
+        original_init(vector, *args, **kwargs)
+
+    collections = sum(stats["collections"] for stats in gc.get_stats())
+    Vector2.__init__ = counting_init
+    try:
+        for _ in range(repeat):
+            function()
+    finally:
+        Vector2.__init__ = original_init
+    collections = sum(stats["collections"] for stats in gc.get_stats()) - collections
+    return created[0] / repeat, collections
+
+
+def tick_allocations(backend, num_characters, mix, ticks=200, warmup=20):
+    """
+    Measures the Vector2 objects created by whole bot-driven simulation ticks
+    once a field has settled into a steady state.
+
+    Returns:
+        dict: {"vector2_per_tick": ..., "gc_collections": ...} over the
+        measured ticks
+    """
+    field = build_field(backend, num_characters, mix)
+    player_controller = PlayerVelocityController(field, ChaseBotInput(), fps=40)
+    ai_controller = AIVelocityController(field, fps=40)
+
+    def tick():
+        step_game(field, player_controller, ai_controller, 1/40)
+        # keep playing past the end of a game
+        field.game_end = ""
+
+    for _ in range(warmup):
+        tick()
+    per_tick, collections = count_vector2_allocations(tick, ticks)
+    return {"vector2_per_tick": per_tick, "gc_collections": collections}
+
+
+def run_benchmarks(sizes, backends, mixes, repeat, max_list_size):
+    """
+    Runs every benchmark combination.
+
+    Returns:
+        dict: machine-readable results, keyed "backend/mix/size/phase"
+    """
+    results = {}
+    for backend in backends:
+        for mix in mixes:
+            for size in sizes:
+                if backend == "list" and size > max_list_size:
+                    continue
+                # keep the total work per benchmark roughly constant
+                runs = max(3, min(repeat, repeat * 1000 // max(size, 1)))
+                phases = benchmark_field(backend, size, mix, runs)
+                for phase, timing in phases.items():
+                    key = f"{backend}/{mix}/{size}/{phase}"
+                    results[key] = timing
+                    print(f"{key:55} {timing['median_ms']:10.3f} ms")
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+
+
+def compare_results(current, baseline, threshold):
+    """
+    Returns the benchmarks that got slower than a baseline.
+
+    Args:
+        current (dict): results from run_benchmarks
+        baseline (dict): earlier results from run_benchmarks
+        threshold (float): allowed fractional slowdown, e.g. 0.2 for 20%
+
+    Returns:
+        list of tuples: (key, baseline ms, current ms) for each regression
+    """
+    regressions = []
+    for key, timing in current["results"].items():
+        if key not in baseline["results"]:
+            continue
+        before = baseline["results"][key]["median_ms"]
+        after = timing["median_ms"]
+        if after > before * (1 + threshold):
+            regressions.append((key, before, after))
+    return regressions
+
+
+def main():
+    """
+    Runs the benchmarks from the command line.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--backends", nargs="+", choices=FIELD_CLASSES,
+                        default=list(FIELD_CLASSES))
+    parser.add_argument("--mixes", nargs="+", choices=MIXES, default=["mixed"])
+    parser.add_argument("--repeat", type=int, default=20,
+                        help="calls per phase at 1k characters")
+    parser.add_argument("--max-list-size", type=int, default=10000,
+                        help="skip the list backend above this population")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", metavar="BASELINE",
+                        help="flag regressions against a saved results file")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="allowed fractional slowdown (default 0.2)")
+    parser.add_argument("--allocations", action="store_true",
+                        help="only report Vector2 objects created per tick")
+    args = parser.parse_args()
+
+    if args.allocations:
+        for backend in args.backends:
+            for mix in args.mixes:
+                for size in args.sizes:
+                    if backend == "list" and size > args.max_list_size:
+                        continue
+                    counts = tick_allocations(backend, size, mix)
+                    key = f"{backend}/{mix}/{size}"
+                    print(f"{key:30} {counts['vector2_per_tick']:10.1f} Vector2/tick"
+                          f" {counts['gc_collections']:6} collections")
+        return
+
+    current = run_benchmarks(args.sizes, args.backends, args.mixes,\
+        args.repeat, args.max_list_size)
+    with open(args.output, "w", encoding="utf-8") as results_file:
+        json.dump(current, results_file, indent=2)
+    print(f"results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+        regressions = compare_results(current, baseline, args.threshold)
+        for key, before, after in regressions:
+            print(f"REGRESSION {key}: {before:.3f} ms -> {after:.3f} ms")
+        if regressions:
+            sys.exit(1)
+        print("no regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 """
 A Hungry Sharks player or AI player.
 """
+import math
 from euclid3 import Vector2
 
 class Character():
@@ -13,12 +14,21 @@ class Character():
         _position: the character's current position
         _growth_progress: percentage toward evolution
         velocity: the character's current velocity
+        _spatial_index: the SpatialHashGrid (if any) that tracks this
+        character's position
+
+    The movement methods update position and velocity in place, component by
+    component, so moving a character creates no new Vector2 objects.
     """
+    __slots__ = ("_size", "_position", "_growth_progress", "velocity",\
+        "_spatial_index")
+
     def __init__(self, size, position):
         self._size = size
         self._position = position
         self._growth_progress = 0
         self.velocity = Vector2(0, 0)
+        self._spatial_index = None
 
     @property
     def position(self):
@@ -41,6 +51,23 @@ class Character():
         """
         return self._growth_progress
 
+    def track_position(self, spatial_index):
+        """
+        Registers a spatial index to be told whenever the character moves.
+
+        Args:
+            spatial_index (SpatialHashGrid): the index, or None to stop
+                tracking.
+        """
+        self._spatial_index = spatial_index
+
+    def _moved(self):
+        """
+        Tells the character's spatial index (if any) that it has moved.
+        """
+        if self._spatial_index is not None:
+            self._spatial_index.update(self)
+
     speed_from_size = {
         1: 50,
         2: 75,
@@ -75,6 +102,31 @@ class Character():
             self._growth_progress = 15
             self._size += 1
 
+    def set_velocity(self, x, y):
+        """
+        Sets the character's velocity from its components, in place.
+
+        Args:
+            x (float): x-component of the new velocity
+            y (float): y-component of the new velocity
+        """
+        velocity = self.velocity
+        velocity.x = x
+        velocity.y = y
+
+    def translate(self, dx, dy):
+        """
+        Moves the character's position by an offset, in place.
+
+        Args:
+            dx (float): x-component of the offset
+            dy (float): y-component of the offset
+        """
+        position = self._position
+        position.x += dx
+        position.y += dy
+        self._moved()
+
     def update_pos(self, timestep):
         """
         Moves character's position based on velocity.
@@ -83,7 +135,8 @@ class Character():
             timestep: duration of the timestep over which the positional update
             happens
         """
-        self._position += self.velocity * timestep
+        velocity = self.velocity
+        self.translate(velocity.x * timestep, velocity.y * timestep)
 
     def move_toward_point(self, point, velocity_scaling=False, timestep=1/30):
         """
@@ -98,22 +151,22 @@ class Character():
         """
         # get displacement vector
         player_pos = self.position
-        displacement = Vector2(point[0], point[1]) - player_pos
-        distance = displacement.magnitude()
+        dx = point[0] - player_pos.x
+        dy = point[1] - player_pos.y
+        distance = math.sqrt(dx**2 + dy**2)
 
         # stop moving if on top of point
         if distance < 5:
-            displacement = Vector2(0,0)
-
-        # get the unit vector heading
-        heading = displacement.normalize()
-
-        # set the new velocity
-        if velocity_scaling:
-            v_scale = min(0.005*distance, 1)
+            self.set_velocity(0.0, 0.0)
         else:
-            v_scale = 1
-        self.velocity = heading * self.max_speed() * v_scale
+            # set the new velocity along the unit vector heading
+            if velocity_scaling:
+                v_scale = min(0.005*distance, 1)
+            else:
+                v_scale = 1
+            speed = self.max_speed()
+            self.set_velocity(dx / distance * speed * v_scale,\
+                dy / distance * speed * v_scale)
 
         # update position
         self.update_pos(timestep)
@@ -128,13 +181,17 @@ class Character():
         """
         # get displacement vector
         player_pos = self.position
-        displacement = Vector2(point[0], point[1]) - player_pos
-
-        # get the unit vector heading away from the fleeing center
-        heading = -1 * displacement.normalize()
-
-        # set the new velocity
-        self.velocity = heading * self.max_speed()
+        dx = point[0] - player_pos.x
+        dy = point[1] - player_pos.y
+        distance = math.sqrt(dx**2 + dy**2)
+
+        # set the new velocity along the unit vector heading away from the
+        # fleeing center (no heading if on top of it)
+        if distance:
+            speed = self.max_speed()
+            self.set_velocity(-(dx / distance) * speed, -(dy / distance) * speed)
+        else:
+            self.set_velocity(0.0, 0.0)
 
         # update position
         self.update_pos(timestep)
@@ -147,7 +204,11 @@ class Character():
             wall_direction (Vector2): defines the orientation of the wall.
             timestep (float): timestep (1/frame rate). Defaults to 1/30.
         """
-        self.velocity = self.velocity.reflect(Vector2(wall_direction.y, wall_direction.x))
+        # reflect about the wall's normal (the wall direction, swapped)
+        velocity = self.velocity
+        normal_x, normal_y = wall_direction.y, wall_direction.x
+        d = 2 * (velocity.x * normal_x + velocity.y * normal_y)
+        self.set_velocity(velocity.x - d * normal_x, velocity.y - d * normal_y)
         self.update_pos(timestep)
 
         # self.velocity = self.velocity.reflect(wall_direction)
@@ -177,6 +238,8 @@ class Player(Character):
     Attributes:
         boost (bool): determines whether the player is currently boosting.
     """
+    __slots__ = ("boost",)
+
     def __init__(self, size, position):
         """
         Create a new AIPlayer with default or custom parameters.
@@ -210,7 +273,8 @@ class Player(Character):
         growth_decay_rate = 15 # growth progress points / second
         if self.boost:
             self._growth_progress -= growth_decay_rate * timestep
-        self._position += self.velocity * timestep
+        velocity = self.velocity
+        self.translate(velocity.x * timestep, velocity.y * timestep)
 
 
 class AIPlayer(Character):
@@ -224,8 +288,12 @@ class AIPlayer(Character):
         behavior_state (string): defines how the AI controller moves the AI
             player.
         clock: keeps track of time for random motion switching
-        prev_tick: keeps track of the previous system time
+        prev_tick: keeps track of the simulation time of the previous tick
+        entity_id: the id the field's population knows the AI player by, or
+            None while it isn't in one
     """
+    __slots__ = ("behavior_state", "clock", "prev_tick", "entity_id")
+
     def __init__(self, size, position, velocity, behavior_state):
         """
         Create a new AIPlayer with default or custom parameters.
@@ -235,8 +303,10 @@ class AIPlayer(Character):
         self.behavior_state = behavior_state
         self.clock = 0
         self.prev_tick = 0
+        self.entity_id = None
 
 
+    fov_scale = 3
     fov_from_size = {
         1: 50,
         2: 75,
@@ -257,8 +327,17 @@ class AIPlayer(Character):
         Returns:
             [float]: Character's FOV
         """
-        scale_factor = 3
-        return self.fov_from_size[self.size] * scale_factor
+        return self.fov_from_size[self.size] * self.fov_scale
+
+    @classmethod
+    def max_fov(cls):
+        """
+        Returns the largest field of view of any AI player size.
+
+        Returns:
+            [float]: the largest FOV
+        """
+        return max(cls.fov_from_size.values()) * cls.fov_scale
 
     def relocate(self, player, window_x, window_y):
         """
@@ -275,3 +354,4 @@ class AIPlayer(Character):
 
             safe_pos = player.position + player_to_window_center.normalize() * self.fov() * 1.25
             self._position = safe_pos
+            self._moved()
@@ -0,0 +1,350 @@
+"""
+Struct-of-arrays storage for a population of Hungry Sharks AI players.
+"""
+import numpy as np
+from euclid3 import Vector2
+from character import AIPlayer
+from indexed_population import SizeCounts
+
+# behavior states are stored as small integer codes
+BEHAVIOR_STATES = ("", "wander", "attack", "flee", "avoid walls")
+BEHAVIOR_CODES = {state: code for code, state in enumerate(BEHAVIOR_STATES)}
+
+
+class AIPopulation():
+    """
+    A list-like collection of AI players whose state lives in contiguous NumPy
+    arrays (one row per AI player) instead of in separate Python objects.
+
+    Iterating, indexing or appending gives AIPlayerView objects which behave
+    like AIPlayers but read and write the arrays. Removal is a swap-remove, so
+    the order of the AI players is not preserved.
+
+    Attributes:
+        _count (int): number of AI players currently stored
+        _positions, _velocities: (capacity, 2) float arrays
+        _sizes, _behaviors: (capacity,) integer arrays
+        _growth, _clocks, _prev_ticks: (capacity,) float arrays
+        _views: the AIPlayerView for each row, or None for rows whose view
+            hasn't been asked for yet (views are made on first use)
+        size_counts (SizeCounts): the AI players counted by size
+    """
+    def __init__(self, capacity=64):
+        capacity = max(1, capacity)
+        self._count = 0
+        self._positions = np.zeros((capacity, 2))
+        self._velocities = np.zeros((capacity, 2))
+        self._sizes = np.zeros(capacity, dtype=np.int64)
+        self._growth = np.zeros(capacity)
+        self._behaviors = np.zeros(capacity, dtype=np.int8)
+        self._clocks = np.zeros(capacity)
+        self._prev_ticks = np.zeros(capacity)
+        self._views = []
+        self.size_counts = SizeCounts()
+
+    array_names = ("_positions", "_velocities", "_sizes", "_growth",
+                   "_behaviors", "_clocks", "_prev_ticks")
+
+    @property
+    def capacity(self):
+        """
+        Returns the number of rows allocated in the arrays.
+        """
+        return len(self._sizes)
+
+    @property
+    def positions(self):
+        """
+        Returns a live (n, 2) view of every AI player's position.
+        """
+        return self._positions[:self._count]
+
+    @property
+    def velocities(self):
+        """
+        Returns a live (n, 2) view of every AI player's velocity.
+        """
+        return self._velocities[:self._count]
+
+    @property
+    def sizes(self):
+        """
+        Returns a live (n,) view of every AI player's size.
+        """
+        return self._sizes[:self._count]
+
+    @property
+    def growth(self):
+        """
+        Returns a live (n,) view of every AI player's growth progress.
+        """
+        return self._growth[:self._count]
+
+    @property
+    def behaviors(self):
+        """
+        Returns a live (n,) view of every AI player's behavior code (an index
+        into BEHAVIOR_STATES).
+        """
+        return self._behaviors[:self._count]
+
+    @property
+    def clocks(self):
+        """
+        Returns a live (n,) view of every AI player's wander clock.
+        """
+        return self._clocks[:self._count]
+
+    @property
+    def prev_ticks(self):
+        """
+        Returns a live (n,) view of every AI player's previous tick time.
+        """
+        return self._prev_ticks[:self._count]
+
+    def _grow_capacity(self, needed):
+        """
+        Reallocates the arrays so that they hold at least `needed` rows.
+        """
+        new_capacity = max(needed, 2 * self.capacity)
+        for name in self.array_names:
+            old = getattr(self, name)
+            new = np.zeros((new_capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self._count] = old[:self._count]
+            setattr(self, name, new)
+
+    def append(self, aip):
+        """
+        Adds an AI player to the population.
+
+        Args:
+            aip (AIPlayer): the AI player. Its state is copied into the
+                arrays. A detached AIPlayerView is re-attached instead.
+
+        Returns:
+            AIPlayerView: the live view of the new row.
+        """
+        if self._count == self.capacity:
+            self._grow_capacity(self._count + 1)
+        index = self._count
+        self._count += 1
+
+        self._positions[index] = (aip.position.x, aip.position.y)
+        self._velocities[index] = (aip.velocity.x, aip.velocity.y)
+        self._sizes[index] = aip.size
+        self.size_counts.add(aip.size)
+        self._growth[index] = aip.growth_progress
+        self._behaviors[index] = BEHAVIOR_CODES[aip.behavior_state]
+        self._clocks[index] = aip.clock
+        self._prev_ticks[index] = aip.prev_tick
+
+        if isinstance(aip, AIPlayerView):
+            view = aip
+            view._population, view._index = self, index
+        else:
+            view = AIPlayerView(self, index)
+        self._views.append(view)
+        return view
+
+    def remove(self, view):
+        """
+        Removes an AI player by moving the last row into its place. The removed
+        view keeps a private copy of its state.
+
+        Args:
+            view (AIPlayerView): the AI player to remove.
+
+        Raises:
+            ValueError: if the view is not in this population.
+        """
+        if view not in self:
+            raise ValueError("AI player is not in the population")
+        index = view._index
+        last = self._count - 1
+        self.size_counts.discard(int(self._sizes[index]))
+
+        # detach the removed view with a copy of its row
+        detached = AIPopulation(capacity=1)
+        for name in self.array_names:
+            getattr(detached, name)[0] = getattr(self, name)[index]
+        detached._count = 1
+        detached.size_counts.add(int(detached._sizes[0]))
+        detached._views.append(view)
+        view._population, view._index = detached, 0
+
+        # move the last row into the hole
+        if index != last:
+            for name in self.array_names:
+                array = getattr(self, name)
+                array[index] = array[last]
+            moved = self._views[last]
+            if moved is not None:
+                moved._index = index
+            self._views[index] = moved
+        self._views.pop()
+        self._count -= 1
+
+    def load(self, columns):
+        """
+        Replaces every AI player with rows given as whole columns, copied in
+        one go instead of appended one AI player at a time.
+
+        Args:
+            columns (dict): array name without its leading underscore (see
+                array_names) -> array of that column's rows
+        """
+        self.clear()
+        self.extend(columns)
+
+    def extend(self, columns):
+        """
+        Adds many AI players at once, given as whole columns (as for load).
+        Their views are made on first use.
+
+        Args:
+            columns (dict): array name without its leading underscore (see
+                array_names) -> array (or scalar, for every row) of that
+                column's rows
+        """
+        start = self._count
+        end = start + len(columns["sizes"])
+        if end > self.capacity:
+            self._grow_capacity(end)
+        for name in self.array_names:
+            getattr(self, name)[start:end] = columns[name[1:]]
+        for size in self._sizes[start:end].tolist():
+            self.size_counts.add(size)
+        self._count = end
+        self._views.extend([None] * (end - start))
+
+    def count_larger(self, size):
+        """
+        Returns the number of AI players bigger than a size (see
+        SizeCounts.count_larger).
+        """
+        return self.size_counts.count_larger(size)
+
+    def clear(self):
+        """
+        Removes every AI player.
+        """
+        for view in list(self):
+            self.remove(view)
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        return iter([self[index] for index in range(self._count)])
+
+    def __getitem__(self, index):
+        view = self._views[index]
+        if view is None:
+            view = AIPlayerView(self, index % self._count)
+            self._views[index] = view
+        return view
+
+    def __contains__(self, aip):
+        return isinstance(aip, AIPlayerView) and aip._population is self
+
+
+class AIPlayerView(AIPlayer):
+    """
+    An AIPlayer whose state is a row of an AIPopulation's arrays.
+
+    The position and velocity properties return Vector2 copies, so they must be
+    reassigned (not mutated component-wise) for a change to stick. The
+    in-place movement methods (set_velocity, translate, update_pos) write the
+    row directly instead.
+
+    Attributes:
+        _population (AIPopulation): the population holding this AI player.
+        _index (int): this AI player's row in the population's arrays.
+    """
+    __slots__ = ("_population", "_index")
+
+    def __init__(self, population, index):
+        # state lives in the population's arrays, so the AIPlayer constructor
+        # is deliberately not called
+        # pylint: disable=super-init-not-called
+        self._population = population
+        self._index = index
+        self._spatial_index = None
+        self.entity_id = None
+
+    @property
+    def _position(self):
+        row = self._population._positions[self._index]
+        return Vector2(float(row[0]), float(row[1]))
+
+    @_position.setter
+    def _position(self, value):
+        self._population._positions[self._index] = (value[0], value[1])
+
+    @property
+    def velocity(self):
+        row = self._population._velocities[self._index]
+        return Vector2(float(row[0]), float(row[1]))
+
+    @velocity.setter
+    def velocity(self, value):
+        self._population._velocities[self._index] = (value[0], value[1])
+
+    @property
+    def _size(self):
+        return int(self._population._sizes[self._index])
+
+    @_size.setter
+    def _size(self, value):
+        population = self._population
+        population.size_counts.discard(int(population._sizes[self._index]))
+        population.size_counts.add(value)
+        population._sizes[self._index] = value
+
+    @property
+    def _growth_progress(self):
+        return float(self._population._growth[self._index])
+
+    @_growth_progress.setter
+    def _growth_progress(self, value):
+        self._population._growth[self._index] = value
+
+    @property
+    def behavior_state(self):
+        return BEHAVIOR_STATES[self._population._behaviors[self._index]]
+
+    @behavior_state.setter
+    def behavior_state(self, value):
+        self._population._behaviors[self._index] = BEHAVIOR_CODES[value]
+
+    @property
+    def clock(self):
+        return float(self._population._clocks[self._index])
+
+    @clock.setter
+    def clock(self, value):
+        self._population._clocks[self._index] = value
+
+    @property
+    def prev_tick(self):
+        return float(self._population._prev_ticks[self._index])
+
+    @prev_tick.setter
+    def prev_tick(self, value):
+        self._population._prev_ticks[self._index] = value
+
+    def set_velocity(self, x, y):
+        velocities = self._population._velocities
+        velocities[self._index, 0] = x
+        velocities[self._index, 1] = y
+
+    def translate(self, dx, dy):
+        positions = self._population._positions
+        positions[self._index, 0] += dx
+        positions[self._index, 1] += dy
+        self._moved()
+
+    def update_pos(self, timestep):
+        velocities = self._population._velocities
+        self.translate(velocities[self._index, 0] * timestep,\
+            velocities[self._index, 1] * timestep)
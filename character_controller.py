@@ -4,28 +4,49 @@ Hungry Sharks game controller
 from abc import ABC, abstractmethod
 import random
 import math
-import time
-import pygame
+import numpy as np
 from euclid3 import Vector2
+from character_arrays import AIPopulation, BEHAVIOR_CODES
+import behavior_kernels
 
-def get_new_heading(curr_heading, degree_range):
+def get_new_heading_components(curr_heading, degree_range, rng=random):
     """
     Generate a random heading within a range of angles around the current
-    heading
+    heading, as components (creates no Vector2)
 
     Args:
         curr_heading (Vector2): the current heading
         degree_range (Vector2): angular width of slice around the current
             heading within which a new heading is chosen
+        rng (random.Random): random number generator. Defaults to the
+            random module's shared one.
 
     Returns:
-        Vector2: new heading
+        (tuple): x and y components of the new heading
     """
-    rand_angle = random.uniform(-degree_range/2, degree_range/2)
+    rand_angle = rng.uniform(-degree_range/2, degree_range/2)
     new_x = math.cos(rand_angle)*curr_heading.x - math.sin(rand_angle)*curr_heading.y
     new_y = math.sin(rand_angle)*curr_heading.x + math.cos(rand_angle)*curr_heading.y
 
-    return Vector2(new_x, new_y)
+    return new_x, new_y
+
+
+def get_new_heading(curr_heading, degree_range, rng=random):
+    """
+    Generate a random heading within a range of angles around the current
+    heading
+
+    Args:
+        curr_heading (Vector2): the current heading
+        degree_range (Vector2): angular width of slice around the current
+            heading within which a new heading is chosen
+        rng (random.Random): random number generator. Defaults to the
+            random module's shared one.
+
+    Returns:
+        Vector2: new heading
+    """
+    return Vector2(*get_new_heading_components(curr_heading, degree_range, rng))
 
 
 class Controller(ABC):
@@ -52,29 +73,30 @@ class Controller(ABC):
 
 class PlayerVelocityController(Controller):
     """
-    Handles player input through mouse/keyboard inputs and controls the player's
-    velocity and eating/growth behavior.
+    Handles player input from a player input source (mouse/keyboard, a script,
+    a recording or a bot) and controls the player's velocity and eating/growth
+    behavior.
 
     Attributes:
+        _player_input (PlayerInput): where the player's target point and boost
+            come from.
         _fps (int): view fps (for movement control).
     """
-    def __init__(self, field, fps=30):
+    def __init__(self, field, player_input, fps=30):
         super().__init__(field)
 
+        self._player_input = player_input
         self._fps = fps
 
     def move(self):
-        # move toward mouse
-        mouse_pos = pygame.mouse.get_pos()
-        self._field.player.move_toward_point(mouse_pos, velocity_scaling=False,\
+        target, boost = self._player_input.get_input(self._field)
+
+        # move toward target (the mouse when playing live)
+        self._field.player.move_toward_point(target, velocity_scaling=False,\
             timestep=1/self._fps)
 
         # speed boosting
-        keys = pygame.key.get_pressed()
-        if keys[pygame.K_SPACE]:
-            self._field.player.boost = True
-        else:
-            self._field.player.boost = False
+        self._field.player.boost = boost
 
 class AIVelocityController(Controller):
     """
@@ -88,55 +110,64 @@ class AIVelocityController(Controller):
 
         self._fps = fps
 
-    def avoid_walls(self, aip):
+    def avoid_walls(self, aip, timestep=None):
         """
         Velocity controller that steers an AI player away from window boundaries
         so that no player ever goes off-screen.
 
         Args:
             aip (AIPlayer): the AI Player that gets controlled.
+            timestep (float, optional): time to move by. Defaults to one tick.
         """
         # identify the direction of the wall to avoid
-        dist_to_walls = self._field.get_dist_to_walls(aip)
-        closest_wall_id = dist_to_walls.index(min(dist_to_walls))
-        wall_cases = {0: Vector2(0, 1),
-                      1: Vector2(0, 1),
-                      2: Vector2(1, 0),
-                      3: Vector2(1, 0)}
-        wall_direction = wall_cases[closest_wall_id] # [1,0] or [0,1]
+        wall_direction = self._field.get_closest_wall_direction(aip) # [1,0] or [0,1]
 
-        aip.bounce(wall_direction, timestep=1/self._fps)
+        if timestep is None:
+            timestep = 1/self._fps
+        aip.bounce(wall_direction, timestep=timestep)
 
-    def wander(self, aip):
+    def wander(self, aip, timestep=None):
         """
         Defines AI wandering behavior
+
+        A turn takes one tick, so an update longer than a tick (see
+        lod_scheduler) still moves the AI player for the rest of it.
         """
-        current_time = time.time()
+        current_time = self._field.sim_clock.time
         elapsed_time = current_time - aip.prev_tick
+        tick = 1/self._fps
+        if timestep is None:
+            timestep = tick
 
         aip.clock += elapsed_time
 
         if aip.clock > 0.2:
             degree_range = math.pi/6
-            new_heading = get_new_heading(aip.velocity, degree_range)
-            aip.velocity = new_heading
+            aip.set_velocity(*get_new_heading_components(aip.velocity, degree_range,\
+                self._field.rng))
             aip.clock = 0
+            if timestep > tick:
+                aip.update_pos(timestep - tick)
         else:
-            aip.update_pos(1/self._fps)
+            aip.update_pos(timestep)
 
         aip.prev_tick = current_time
 
-    def attack(self, aip):
+    def attack(self, aip, timestep=None):
         """
         Defines AI attacking behavior
         """
-        aip.move_toward_point(self._field.player.position, timestep=1/self._fps)
+        if timestep is None:
+            timestep = 1/self._fps
+        aip.move_toward_point(self._field.player.position, timestep=timestep)
 
-    def flee(self, aip):
+    def flee(self, aip, timestep=None):
         """
         Defines AI fleeing behavior
         """
-        aip.move_away_from_point(self._field.player.position, timestep=1/self._fps)
+        if timestep is None:
+            timestep = 1/self._fps
+        aip.move_away_from_point(self._field.player.position, timestep=timestep)
 
     behavior_switcher = {
         "wander": wander,
@@ -145,11 +176,54 @@ class AIVelocityController(Controller):
         "avoid walls": avoid_walls
     }
 
+    def move_batched(self):
+        """
+        Moves every AI Player in an array-backed field, grouping them by
+        behavior state and running one batched movement kernel per group.
+        """
+        population = self._field.characters
+        positions = population.positions
+        velocities = population.velocities
+        behaviors = population.behaviors
+        timestep = 1/self._fps
+        player_position = (self._field.player.position.x,\
+            self._field.player.position.y)
+
+        behavior_kernels.wander(positions, velocities, population.clocks,\
+            population.prev_ticks, np.flatnonzero(behaviors == BEHAVIOR_CODES["wander"]),\
+            self._field.sim_clock.time, timestep, uniform=self._field.rng.uniform)
+        behavior_kernels.pursue(positions, velocities, population.sizes,\
+            np.flatnonzero(behaviors == BEHAVIOR_CODES["attack"]), player_position,\
+            timestep)
+        behavior_kernels.pursue(positions, velocities, population.sizes,\
+            np.flatnonzero(behaviors == BEHAVIOR_CODES["flee"]), player_position,\
+            timestep, flee=True)
+        behavior_kernels.bounce(positions, velocities,\
+            np.flatnonzero(behaviors == BEHAVIOR_CODES["avoid walls"]),\
+            self._field.window_x, self._field.window_y, timestep)
+
     def move(self):
         """
         Loops through every AI Player on the field and calls the movement
-        functions that are appropriate to their behavior states.
+        functions that are appropriate to their behavior states. Array-backed
+        fields are moved in batches instead, and fields with a level-of-detail
+        scheduler only move the AI players it picks.
         """
+        if isinstance(self._field.characters, AIPopulation):
+            self.move_batched()
+            return
+
+        changed = self._field.changed
+        if self._field.lod is not None:
+            for aip, timestep in self._field.lod.schedule(self._field, 1/self._fps):
+                movement_function = self.behavior_switcher[aip.behavior_state]
+                movement_function(self, aip, timestep)
+                if changed is not None:
+                    changed.add(aip)
+            return
+
         for aip in self._field.characters:
             movement_function = self.behavior_switcher[aip.behavior_state]
             movement_function(self, aip)
+        if changed is not None:
+            changed.update(self._field.characters)
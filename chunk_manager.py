@@ -0,0 +1,383 @@
+"""
+An endless ocean streamed in square chunks around a HungrySharksField.
+
+The field only ever holds the chunks within a few chunks of the player. When
+the player crosses into another chunk, the AI players in chunks that fall out
+of range are packed into AI_RECORD arrays (see field_snapshot) and stored,
+everything left is shifted so the player is back in the field's center chunk
+and the chunks coming into range are loaded, or generated the first time they
+are reached. Field coordinates therefore stay small however far the player
+swims; a chunk's key is its position in the whole ocean. The field's edges
+aren't walls (AI players swim on past them), and an AI player that has
+swum out of the loaded chunks belongs to the nearest one.
+
+Stored chunks are kept in memory up to a byte budget, least recently used
+first out: evicted chunks are written to disk and read back (and deleted)
+when the player returns. Chunks ahead of the player, in the direction it is
+heading, are generated on a background thread before they are needed.
+"""
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import math
+import os
+import random
+import shutil
+import tempfile
+import numpy as np
+from character_arrays import AIPopulation
+from field_snapshot import ai_records, spawn_records
+from hungry_sharks_field import HungrySharksField, pick_ai_size
+
+
+def generate_chunk(field, key, chunk_size, num_characters, player_size, seed):
+    """
+    Generates the AI players of a chunk reached for the first time, with the
+    same sizes as respawns get (see hungry_sharks_field.pick_ai_size, with at
+    most the field's max_nemeses bigger than the player per chunk).
+
+    Safe to call from a background thread: it only reads the field, and its
+    randomness comes from a generator seeded by the ocean's seed and the
+    chunk's key, so a chunk always comes out the same for the same player
+    size.
+
+    Args:
+        field (HungrySharksField): the field (for get_new_ai)
+        key: (column, row) of the chunk in the ocean
+        chunk_size (int): side length of a chunk
+        num_characters (int): number of AI players to generate
+        player_size (int): the player's size when the chunk was requested
+        seed: the ocean's seed
+
+    Returns:
+        (array): AI_RECORDs of the new AI players, in ocean coordinates
+    """
+    rng = random.Random(f"{seed}:{key[0]}:{key[1]}")
+    x_min, y_min = key[0] * chunk_size, key[1] * chunk_size
+    area = (x_min, x_min + chunk_size, y_min, y_min + chunk_size)
+    characters = []
+    num_enemies = 0
+    for _ in range(num_characters):
+        size = pick_ai_size(player_size, num_enemies, field._max_nemeses, rng)
+        num_enemies += size > player_size
+        characters.append(field.get_new_ai(size, rng=rng, area=area))
+    return ai_records(characters)
+
+
+class ChunkStore():
+    """
+    Holds chunks that are out of the player's range: the most recently used
+    ones in memory, up to a byte budget, and the rest on disk.
+
+    Attributes:
+        _max_bytes (int): most memory the chunks held in memory may take up
+        _directory (string): where evicted chunks are written, one .npy
+            file per chunk
+        _chunks: OrderedDict of key -> AI_RECORD array, least recently used
+            first
+        nbytes (int): memory the chunks held in memory take up
+        evictions (int): number of chunks written to disk so far
+    """
+    def __init__(self, directory, max_bytes=4 * 2**20):
+        self._max_bytes = max_bytes
+        self._directory = directory
+        self._chunks = OrderedDict()
+        self.nbytes = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._chunks)
+
+    @property
+    def directory(self):
+        """
+        Returns the directory evicted chunks are written to.
+        """
+        return self._directory
+
+    def _path(self, key):
+        """
+        Returns the file an evicted chunk is written to.
+        """
+        return os.path.join(self._directory, f"{key[0]}_{key[1]}.npy")
+
+    def __contains__(self, key):
+        return key in self._chunks or os.path.exists(self._path(key))
+
+    def put(self, key, records):
+        """
+        Stores a chunk, evicting the least recently used chunks to disk if
+        that takes the store over its memory budget.
+
+        Args:
+            key: (column, row) of the chunk
+            records (array): the chunk's AI_RECORDs
+        """
+        self._chunks[key] = records
+        self.nbytes += records.nbytes
+        while self.nbytes > self._max_bytes and self._chunks:
+            old_key, old_records = self._chunks.popitem(last=False)
+            self.nbytes -= old_records.nbytes
+            np.save(self._path(old_key), old_records)
+            self.evictions += 1
+
+    def take(self, key):
+        """
+        Removes a chunk from the store and returns it.
+
+        Args:
+            key: (column, row) of the chunk
+
+        Returns:
+            (array): the chunk's AI_RECORDs, or None if the chunk was never
+            stored
+        """
+        records = self._chunks.pop(key, None)
+        if records is not None:
+            self.nbytes -= records.nbytes
+            return records
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        records = np.load(path)
+        os.remove(path)
+        return records
+
+
+class ChunkManager():
+    """
+    Streams an endless ocean through a HungrySharksField, which holds the
+    (2 * radius + 1)**2 chunks around the player's chunk.
+
+    Call update() after every simulation step.
+
+    Attributes:
+        field (HungrySharksField): the field holding the chunks in range
+        store (ChunkStore): the chunks out of range
+        _chunk_size (int): side length of a chunk (and of the field's center
+            chunk, which the player is kept in)
+        _radius (int): chunks kept in the field on each side of the
+            player's chunk
+        _characters_per_chunk (int): AI players a new chunk is generated with
+        _seed: the seed chunks are generated from
+        _lookahead (int): how many chunks ahead of the player are generated
+            in the background
+        _center: key of the player's chunk
+        _prefetched: the (center, heading) the background work was last
+            planned for
+        _pending: dict of key -> Future of a chunk being generated
+        _executor (ThreadPoolExecutor): the background generation thread, or
+            None to generate chunks only when they are reached
+        _own_directory (bool): whether the chunk directory is a temporary one
+            to delete on close
+        shifts (int): number of times the player crossed into another chunk
+    """
+    def __init__(self, field_class=HungrySharksField, chunk_size=1200, radius=1,\
+            characters_per_chunk=10, max_bytes=4 * 2**20, seed=None, directory=None,\
+            lookahead=2, background=True):
+        self._chunk_size = chunk_size
+        self._radius = radius
+        self._characters_per_chunk = characters_per_chunk
+        self._lookahead = lookahead
+        span = (2 * radius + 1) * chunk_size
+        self.field = field_class(span, span, 0, seed=seed)
+        self.field.walls = False
+        self._seed = self.field.rng.randrange(2**32) if seed is None else seed
+
+        self._own_directory = directory is None
+        if directory is None:
+            directory = tempfile.mkdtemp(prefix="hungry_sharks_chunks_")
+        self.store = ChunkStore(directory, max_bytes)
+
+        self._center = (0, 0)
+        self._prefetched = None
+        self._pending = {}
+        self._executor = ThreadPoolExecutor(max_workers=1) if background else None
+        self.shifts = 0
+
+        # the player starts in the middle of chunk (0, 0)
+        for key in self.keys_in_range(self._center):
+            self._load(key)
+
+    @property
+    def origin(self):
+        """
+        Returns the ocean coordinates of the field's top left corner.
+        """
+        return ((self._center[0] - self._radius) * self._chunk_size,
+                (self._center[1] - self._radius) * self._chunk_size)
+
+    @property
+    def center(self):
+        """
+        Returns the key of the player's chunk.
+        """
+        return self._center
+
+    def keys_in_range(self, center):
+        """
+        Returns the keys of the chunks the field holds while the player is in
+        a chunk.
+
+        Args:
+            center: key of the player's chunk
+        """
+        return {(center[0] + dx, center[1] + dy)
+                for dx in range(-self._radius, self._radius + 1)
+                for dy in range(-self._radius, self._radius + 1)}
+
+    def chunk_of(self, x, y):
+        """
+        Returns the key of the chunk a field position is in.
+        """
+        origin_x, origin_y = self.origin
+        return (math.floor((x + origin_x) / self._chunk_size),
+                math.floor((y + origin_y) / self._chunk_size))
+
+    def loaded_chunk_of(self, x, y):
+        """
+        Returns the key of the loaded chunk a field position is in, or of the
+        nearest one if it is outside them all.
+        """
+        key = self.chunk_of(x, y)
+        return tuple(min(max(axis, center - self._radius), center + self._radius)
+                     for axis, center in zip(key, self._center))
+
+    def ocean_position(self, x, y):
+        """
+        Returns the ocean coordinates of a field position.
+        """
+        origin_x, origin_y = self.origin
+        return (x + origin_x, y + origin_y)
+
+    def _chunk_records(self, key):
+        """
+        Returns a chunk that isn't in the field: stored, being generated or
+        generated now.
+        """
+        records = self.store.take(key)
+        if records is not None:
+            return records
+        future = self._pending.pop(key, None)
+        if future is not None:
+            return future.result()
+        return generate_chunk(self.field, key, self._chunk_size,\
+            self._characters_per_chunk, self.field.player.size, self._seed)
+
+    def _load(self, key):
+        """
+        Spawns a chunk's AI players into the field.
+        """
+        records = self._chunk_records(key).copy()
+        records["positions"] -= self.origin
+        spawn_records(self.field, records)
+
+    def _unload(self, keys):
+        """
+        Moves the AI players in some chunks (including any that have swum
+        out of the loaded chunks past them) out of the field and into the
+        store. Chunks with no AI players left are stored empty, so they
+        aren't generated again.
+        """
+        leaving = {key: [] for key in keys}
+        for aip in self.field.characters:
+            key = self.loaded_chunk_of(aip.position.x, aip.position.y)
+            if key in leaving:
+                leaving[key].append(aip)
+        for key, characters in leaving.items():
+            records = ai_records(characters)
+            records["positions"] += self.origin
+            for aip in characters:
+                self.field.despawn_ai(aip)
+            self.store.put(key, records)
+
+    def _shift(self, dx, dy):
+        """
+        Moves every character in the field by (dx, dy).
+        """
+        characters = self.field.characters
+        if isinstance(characters, AIPopulation):
+            characters.positions[:] += (dx, dy)
+        else:
+            for aip in characters:
+                aip.translate(dx, dy)
+            if self.field.changed is not None:
+                self.field.changed.update(characters)
+        self.field.player.translate(dx, dy)
+        # start every AI player's events over from its new position
+        if self.field.kinetic is not None:
+            self.field.kinetic.reset(self.field.characters)
+
+    def _collect(self):
+        """
+        Stores the chunks the background thread has finished generating.
+        """
+        for key in [key for key, future in self._pending.items() if future.done()]:
+            self.store.put(key, self._pending.pop(key).result())
+
+    def _prefetch(self):
+        """
+        Starts generating, in the background, the chunks that will come into
+        range over the player's next few chunk crossings if it keeps its
+        heading.
+        """
+        velocity = self.field.player.velocity
+        speed = math.hypot(velocity.x, velocity.y)
+        if self._executor is None or not speed:
+            return
+        heading = (round(velocity.x / speed), round(velocity.y / speed))
+        if self._prefetched == (self._center, heading):
+            return
+        self._prefetched = (self._center, heading)
+
+        center = self._center
+        in_range = self.keys_in_range(center)
+        for _ in range(self._lookahead):
+            center = (center[0] + heading[0], center[1] + heading[1])
+            ahead = self.keys_in_range(center)
+            for key in sorted(ahead - in_range):
+                if key not in self._pending and key not in self.store:
+                    self._pending[key] = self._executor.submit(generate_chunk,\
+                        self.field, key, self._chunk_size,\
+                        self._characters_per_chunk, self.field.player.size,\
+                        self._seed)
+            in_range |= ahead
+
+    def update(self):
+        """
+        Re-centers the field on the player's chunk if the player crossed into
+        another one, and keeps background generation ahead of it.
+
+        Returns:
+            (tuple): the (dx, dy) every character in the field was moved by,
+            or None if the player is still in the same chunk. Anything that
+            remembers field positions (like render interpolation) should
+            forget them after a shift.
+        """
+        self._collect()
+        player = self.field.player
+        new_center = self.chunk_of(player.position.x, player.position.y)
+        shift = None
+        if new_center != self._center:
+            old_keys = self.keys_in_range(self._center)
+            new_keys = self.keys_in_range(new_center)
+            self._unload(old_keys - new_keys)
+            shift = ((self._center[0] - new_center[0]) * self._chunk_size,
+                     (self._center[1] - new_center[1]) * self._chunk_size)
+            self._center = new_center
+            self._shift(*shift)
+            for key in sorted(new_keys - old_keys):
+                self._load(key)
+            self.shifts += 1
+        self._prefetch()
+        return shift
+
+    def close(self):
+        """
+        Stops the background thread and deletes the chunk directory if it is
+        a temporary one.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+        self._pending.clear()
+        if self._own_directory:
+            shutil.rmtree(self.store.directory, ignore_errors=True)
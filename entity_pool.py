@@ -0,0 +1,184 @@
+"""
+Recycling of AIPlayer objects, with generational entity ids.
+
+Every eat despawns one AI player and spawns another. Rather than dropping
+the eaten AIPlayer (and its Vector2s) for the garbage collector and
+allocating a new one, the pool keeps it in a free slot and hands it out,
+reset, as the next AI player.
+
+A recycled object is a different AI player, so references to AI players that
+must outlive them are held as entity ids: a slot number and the slot's
+generation, which goes up every time the slot is freed. An id from before
+its AI player was despawned no longer matches its slot, so get() returns
+None for it instead of whichever AI player took the slot over.
+
+Freed slots are only reused after the next reclaim(), which the field calls
+once a tick, so an AI player despawned during a tick is never the same
+object as one spawned in that tick (to anything that still holds it, like
+render interpolation's previous positions).
+"""
+from euclid3 import Vector2
+from character import AIPlayer
+
+# low bits of an entity id hold the slot, the rest its generation
+SLOT_BITS = 32
+SLOT_MASK = (1 << SLOT_BITS) - 1
+
+
+def make_entity_id(slot, generation):
+    """
+    Returns the entity id of a slot's generation.
+    """
+    return generation << SLOT_BITS | slot
+
+
+def entity_slot(entity_id):
+    """
+    Returns the slot an entity id refers to.
+    """
+    return entity_id & SLOT_MASK
+
+
+def entity_generation(entity_id):
+    """
+    Returns the generation of its slot an entity id refers to.
+    """
+    return entity_id >> SLOT_BITS
+
+
+class EntityPool():
+    """
+    Slots of AIPlayer objects, each either live (an AI player in the field)
+    or free (its object waiting to be reused).
+
+    Attributes:
+        _slots (list): the AIPlayer of each slot
+        _generations (list): each slot's current generation
+        _live (list): whether each slot is live
+        _free (list): free slots, the most recently reclaimed last
+        _released (list): slots freed since the last reclaim
+        allocated (int): AIPlayer objects the pool has created
+    """
+    def __init__(self):
+        self._slots = []
+        self._generations = []
+        self._live = []
+        self._free = []
+        self._released = []
+        self.allocated = 0
+
+    def __len__(self):
+        """
+        Returns the number of live slots.
+        """
+        return len(self._slots) - len(self._free) - len(self._released)
+
+    @property
+    def capacity(self):
+        """
+        Returns the number of slots, live or free.
+        """
+        return len(self._slots)
+
+    def _claim(self, aip):
+        """
+        Makes an AI player live in a free slot (or a new one) and returns it
+        with its entity id set.
+        """
+        if self._free:
+            slot = self._free.pop()
+            self._slots[slot] = aip
+        else:
+            slot = len(self._slots)
+            self._slots.append(aip)
+            self._generations.append(0)
+            self._live.append(False)
+        self._live[slot] = True
+        aip.entity_id = make_entity_id(slot, self._generations[slot])
+        return aip
+
+    def acquire(self, size, x, y, vx, vy, behavior_state="wander"):
+        """
+        Returns a live AI player with a new entity id and the given state,
+        reusing a free slot's object if there is one.
+
+        Args:
+            size (int): the AI player's size
+            x, y (float): its position
+            vx, vy (float): its velocity
+            behavior_state (string): its behavior. Defaults to "wander".
+
+        Returns:
+            AIPlayer: the AI player, not yet in any field
+        """
+        if self._free:
+            aip = self._slots[self._free[-1]]
+            aip._size = size
+            aip._position.x, aip._position.y = x, y
+            aip.velocity.x, aip.velocity.y = vx, vy
+            aip._growth_progress = 0
+            aip.behavior_state = behavior_state
+            aip.clock = 0
+            aip.prev_tick = 0
+        else:
+            aip = AIPlayer(size, Vector2(x, y), Vector2(vx, vy), behavior_state)
+            self.allocated += 1
+        return self._claim(aip)
+
+    def adopt(self, aip):
+        """
+        Makes an AI player created outside the pool live, taking over a free
+        slot (whose old object is dropped) or a new one.
+
+        Args:
+            aip (AIPlayer): the AI player
+
+        Returns:
+            AIPlayer: the AI player, with its entity id set
+        """
+        return self._claim(aip)
+
+    def release(self, aip):
+        """
+        Frees a live AI player's slot, for reuse after the next reclaim. Its
+        entity id, and any copy of it, goes stale.
+
+        Args:
+            aip (AIPlayer): the AI player
+
+        Raises:
+            ValueError: if the AI player isn't live in this pool
+        """
+        if self.get(aip.entity_id) is not aip:
+            raise ValueError("AI player is not live in the pool")
+        slot = entity_slot(aip.entity_id)
+        self._generations[slot] += 1
+        self._live[slot] = False
+        self._released.append(slot)
+        aip.entity_id = None
+
+    def reclaim(self):
+        """
+        Makes the slots freed since the last reclaim available for reuse.
+        """
+        self._free.extend(self._released)
+        self._released.clear()
+
+    def get(self, entity_id):
+        """
+        Returns the live AI player an entity id refers to, or None if the id
+        is stale (its AI player has been released) or unknown.
+        """
+        if entity_id is None:
+            return None
+        slot = entity_slot(entity_id)
+        if slot >= len(self._slots) or not self._live[slot]\
+                or self._generations[slot] != entity_generation(entity_id):
+            return None
+        return self._slots[slot]
+
+    def is_alive(self, entity_id):
+        """
+        Returns whether an entity id still refers to a live AI player.
+        """
+        return self.get(entity_id) is not None
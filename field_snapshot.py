@@ -0,0 +1,296 @@
+"""
+Compact binary snapshots of a whole Hungry Sharks field.
+
+A snapshot is one fixed-layout header record (game state, the player and the
+state of the field's random number generator) followed by one fixed-layout
+record per AI player. Both are NumPy structured arrays, so saving is a handful
+of column copies and loading memory-maps the file instead of parsing it.
+"""
+import numpy as np
+from character_arrays import AIPopulation, BEHAVIOR_STATES
+from hungry_sharks_field import HungrySharksField, HungrySharksArrayField
+from indexed_population import SizeCounts
+
+MAGIC = b"HSF1"
+VERSION = 1
+
+# game_end values, stored as their index
+GAME_ENDS = ("", "win", "lose")
+
+HEADER = np.dtype([
+    ("magic", "S4"),
+    ("version", "<u2"),
+    # 1 if the field stores its AI players in arrays (HungrySharksArrayField)
+    ("array_backend", "u1"),
+    ("game_end", "i1"),
+    ("window", "<i8", (2,)),
+    ("sim_time", "<f8"),
+    # NaN for unthrottled
+    ("warp", "<f8"),
+    ("max_nemeses", "<i8"),
+    ("num_characters", "<u8"),
+    ("player_position", "<f8", (2,)),
+    ("player_velocity", "<f8", (2,)),
+    ("player_size", "<i8"),
+    ("player_growth", "<f8"),
+    ("player_boost", "u1"),
+    # field.rng.getstate(): version, Mersenne Twister state, gauss_next (NaN
+    # for None)
+    ("rng_version", "<i8"),
+    ("rng_state", "<u4", (625,)),
+    ("rng_gauss", "<f8"),
+])
+
+# one per AI player, in the same order as AIPopulation.array_names
+AI_RECORD = np.dtype([
+    ("positions", "<f8", (2,)),
+    ("velocities", "<f8", (2,)),
+    ("sizes", "<i8"),
+    ("growth", "<f8"),
+    ("behaviors", "i1"),
+    ("clocks", "<f8"),
+    ("prev_ticks", "<f8"),
+])
+
+
+def ai_records(characters):
+    """
+    Returns the records of some AI players.
+
+    Args:
+        characters: AIPlayers (or views of an AIPopulation)
+
+    Returns:
+        (array): one AI_RECORD per AI player, in the same order
+    """
+    records = np.empty(len(characters), dtype=AI_RECORD)
+    if not len(records):
+        return records
+    records["positions"] = [(aip.position.x, aip.position.y) for aip in characters]
+    records["velocities"] = [(aip.velocity.x, aip.velocity.y) for aip in characters]
+    records["sizes"] = [aip.size for aip in characters]
+    records["growth"] = [aip.growth_progress for aip in characters]
+    records["behaviors"] = [BEHAVIOR_STATES.index(aip.behavior_state)
+                            for aip in characters]
+    records["clocks"] = [aip.clock for aip in characters]
+    records["prev_ticks"] = [aip.prev_tick for aip in characters]
+    return records
+
+
+def spawn_records(field, records):
+    """
+    Spawns an AI player into a field for each of some records: as one block
+    of rows in an array field, or into AIPlayers from a list field's entity
+    pool.
+
+    Args:
+        field (HungrySharksField): the field
+        records: an array of AI_RECORDs
+    """
+    characters = field.characters
+    if isinstance(characters, AIPopulation):
+        characters.extend({name: records[name] for name in AI_RECORD.names})
+        return
+    pool = characters.pool
+    for (x, y), (vx, vy), size, growth, behavior, clock, prev_tick\
+            in records.tolist():
+        aip = pool.acquire(size, x, y, vx, vy, BEHAVIOR_STATES[behavior])
+        aip._growth_progress = growth
+        aip.clock = clock
+        aip.prev_tick = prev_tick
+        field.spawn_new_ai(aip)
+
+
+def restore_records(field, records):
+    """
+    Puts a list field's AI players into the state of some records, writing
+    the records into the AIPlayers already in the field (and only despawning
+    or spawning the difference in number) rather than replacing them all.
+
+    Args:
+        field (HungrySharksField): the field
+        records: an array of AI_RECORDs
+    """
+    characters = field.characters
+    for aip in list(characters)[len(records):]:
+        field.despawn_ai(aip)
+
+    grid = field.grid
+    rows = records.tolist()
+    for aip, ((x, y), (vx, vy), size, growth, behavior, clock, prev_tick)\
+            in zip(characters, rows):
+        aip._size = size
+        aip._position.x, aip._position.y = x, y
+        aip.velocity.x, aip.velocity.y = vx, vy
+        aip._growth_progress = growth
+        aip.behavior_state = BEHAVIOR_STATES[behavior]
+        aip.clock = clock
+        aip.prev_tick = prev_tick
+        grid.update(aip)
+    reused = len(characters)
+    characters.size_counts = SizeCounts(row[2] for row in rows[:reused])
+    if field.kinetic is not None:
+        field.kinetic.reset(characters)
+
+    spawn_records(field, records[reused:])
+
+
+def take_header(field):
+    """
+    Captures the part of a field's state that isn't its AI players.
+
+    Args:
+        field (HungrySharksField): the field
+
+    Returns:
+        a HEADER record
+    """
+    header = np.zeros((), dtype=HEADER)
+    header["magic"] = MAGIC
+    header["version"] = VERSION
+    header["array_backend"] = isinstance(field.characters, AIPopulation)
+    header["game_end"] = GAME_ENDS.index(field.game_end)
+    header["window"] = (field.window_x, field.window_y)
+    header["sim_time"] = field.sim_clock.time
+    warp = field.sim_clock.warp
+    header["warp"] = np.nan if warp is None else warp
+    header["max_nemeses"] = field._max_nemeses
+    header["num_characters"] = len(field.characters)
+
+    player = field.player
+    header["player_position"] = (player.position.x, player.position.y)
+    header["player_velocity"] = (player.velocity.x, player.velocity.y)
+    header["player_size"] = player.size
+    header["player_growth"] = player.growth_progress
+    header["player_boost"] = player.boost
+
+    rng_version, rng_state, rng_gauss = field.rng.getstate()
+    header["rng_version"] = rng_version
+    header["rng_state"] = rng_state
+    header["rng_gauss"] = np.nan if rng_gauss is None else rng_gauss
+    return header
+
+
+def take_snapshot(field):
+    """
+    Captures a field's state.
+
+    Args:
+        field (HungrySharksField): the field
+
+    Returns:
+        (tuple): (header, records): a HEADER record and an array of AI_RECORDs
+    """
+    characters = field.characters
+    if isinstance(characters, AIPopulation):
+        records = np.empty(len(characters), dtype=AI_RECORD)
+        for name in AI_RECORD.names:
+            records[name] = getattr(characters, name)
+    else:
+        records = ai_records(characters)
+    return take_header(field), records
+
+
+def save_snapshot(field, path):
+    """
+    Writes a field's snapshot to a file.
+
+    Args:
+        field (HungrySharksField): the field
+        path (string): the snapshot file
+    """
+    header, records = take_snapshot(field)
+    with open(path, "wb") as snapshot_file:
+        snapshot_file.write(header.tobytes())
+        snapshot_file.write(records.tobytes())
+
+
+def read_snapshot(path):
+    """
+    Memory-maps a snapshot file.
+
+    Args:
+        path (string): the snapshot file
+
+    Returns:
+        (tuple): (header, records), read-only memory maps of the file
+
+    Raises:
+        ValueError: if the file is not a snapshot this version can read
+    """
+    header = np.memmap(path, dtype=HEADER, mode="r", shape=())
+    if header["magic"] != MAGIC or header["version"] != VERSION:
+        raise ValueError(f"{path} is not a version {VERSION} field snapshot")
+    count = int(header["num_characters"])
+    if not count:
+        return header, np.zeros(0, dtype=AI_RECORD)
+    records = np.memmap(path, dtype=AI_RECORD, mode="r", offset=HEADER.itemsize,\
+        shape=(count,))
+    return header, records
+
+
+def restore_snapshot(header, records, field=None):
+    """
+    Puts a field into a snapshot's state, including its random number
+    generator.
+
+    Args:
+        header: a HEADER record
+        records: an array of AI_RECORDs
+        field (HungrySharksField, optional): the field to restore into. Its
+            window size must match. Defaults to a new field of the
+            snapshot's kind.
+
+    Returns:
+        HungrySharksField: the restored field
+    """
+    window_x, window_y = (int(size) for size in header["window"])
+    if field is None:
+        field_class = HungrySharksArrayField if header["array_backend"]\
+            else HungrySharksField
+        field = field_class(window_x, window_y, 0)
+    elif (field.window_x, field.window_y) != (window_x, window_y):
+        raise ValueError("snapshot was taken on a field of a different size")
+
+    field.game_end = GAME_ENDS[int(header["game_end"])]
+    field.eaten_by = None
+    field._max_nemeses = int(header["max_nemeses"])
+    field.sim_clock.reset(float(header["sim_time"]))
+    warp = float(header["warp"])
+    field.sim_clock.warp = None if np.isnan(warp) else warp
+
+    # into the field's own Player, so anything holding it keeps seeing it
+    player = field.player
+    player._size = int(header["player_size"])
+    player._position.x, player._position.y = header["player_position"].tolist()
+    player.velocity.x, player.velocity.y = header["player_velocity"].tolist()
+    player._growth_progress = float(header["player_growth"])
+    player.boost = bool(header["player_boost"])
+
+    # replace the AI players wholesale (views of the old ones stay valid)
+    if isinstance(field.characters, AIPopulation):
+        field.characters = AIPopulation(capacity=len(records))
+        spawn_records(field, records)
+    else:
+        restore_records(field, records)
+
+    rng_gauss = float(header["rng_gauss"])
+    field.rng.setstate((int(header["rng_version"]), tuple(header["rng_state"].tolist()),\
+        None if np.isnan(rng_gauss) else rng_gauss))
+    return field
+
+
+def load_snapshot(path, field=None):
+    """
+    Restores a field from a snapshot file.
+
+    Args:
+        path (string): the snapshot file
+        field (HungrySharksField, optional): the field to restore into.
+            Defaults to a new field of the snapshot's kind.
+
+    Returns:
+        HungrySharksField: the restored field
+    """
+    header, records = read_snapshot(path)
+    return restore_snapshot(header, records, field)
@@ -0,0 +1,179 @@
+"""
+Low-overhead per-phase timing for the Hungry Sharks game loop.
+"""
+from collections import defaultdict, deque
+from contextlib import nullcontext
+import functools
+import json
+import math
+import time
+
+# shared do-nothing context manager handed out by disabled profilers
+_NO_TIMING = nullcontext()
+
+
+class _PhaseTimer():
+    """
+    Context manager that adds the time spent inside it to one profiler phase.
+    """
+    __slots__ = ("_profiler", "_name", "_start")
+
+    def __init__(self, profiler, name):
+        self._profiler = profiler
+        self._name = name
+        self._start = 0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._profiler.record(self._name, time.perf_counter() - self._start)
+        return False
+
+
+class FrameProfiler():
+    """
+    Times the phases of each frame and keeps rolling percentiles of them.
+
+    Phases are timed with `with profiler.phase(name):` blocks, or by
+    instrumenting a method so every call to it is timed. Times within one frame
+    add up; end_frame() closes the frame, adds its totals to the rolling
+    windows and (optionally) writes them as a line of JSON.
+
+    When disabled, phase() returns a shared no-op context manager and
+    instrument() does nothing, so leaving the hooks in costs almost nothing.
+
+    Attributes:
+        enabled (bool): whether timings are being collected
+        _window (int): number of recent frames the percentiles cover
+        _current: phase name -> seconds spent so far this frame
+        _history: phase name -> deque of per-frame milliseconds
+        _log: open JSON-lines file, or None
+        _instrumented: list of (object, method name) pairs wrapped by
+            instrument()
+        frames (int): number of frames ended so far
+    """
+    def __init__(self, enabled=True, window=300, jsonl_path=None):
+        self.enabled = enabled
+        self._window = window
+        self._current = defaultdict(float)
+        self._history = {}
+        self._log = open(jsonl_path, "w", encoding="utf-8") if jsonl_path else None
+        self._instrumented = []
+        self.frames = 0
+
+    def phase(self, name):
+        """
+        Returns a context manager that times the code inside it as a phase.
+
+        Args:
+            name (string): the phase name
+        """
+        if not self.enabled:
+            return _NO_TIMING
+        return _PhaseTimer(self, name)
+
+    def record(self, name, seconds):
+        """
+        Adds time to a phase of the current frame.
+
+        Args:
+            name (string): the phase name
+            seconds (float): time spent
+        """
+        self._current[name] += seconds
+
+    def instrument(self, obj, method_name, phase_name=None):
+        """
+        Times every call of one object's method as a phase, by wrapping the
+        method on that object only. Does nothing while disabled.
+
+        Args:
+            obj: the object whose method is timed
+            method_name (string): the method's name
+            phase_name (string, optional): the phase name. Defaults to the
+                method name.
+        """
+        if not self.enabled:
+            return
+        method = getattr(obj, method_name)
+        name = phase_name or method_name
+        record = self.record
+        perf_counter = time.perf_counter
+
+        @functools.wraps(method)
+        def timed(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                record(name, perf_counter() - start)
+
+        setattr(obj, method_name, timed)
+        self._instrumented.append((obj, method_name))
+
+    def uninstrument(self):
+        """
+        Removes every wrapper added by instrument().
+        """
+        for obj, method_name in self._instrumented:
+            delattr(obj, method_name)
+        self._instrumented = []
+
+    def end_frame(self):
+        """
+        Closes the current frame: its phase totals join the rolling windows
+        and are written to the JSON-lines log if there is one.
+        """
+        if not self.enabled:
+            return
+        frame = {name: seconds * 1000 for name, seconds in self._current.items()}
+        for name, milliseconds in frame.items():
+            if name not in self._history:
+                self._history[name] = deque(maxlen=self._window)
+            self._history[name].append(milliseconds)
+        if self._log is not None:
+            self._log.write(json.dumps({"frame": self.frames, "ms": frame}) + "\n")
+        self._current.clear()
+        self.frames += 1
+
+    def percentiles(self, name, quantiles=(50, 95, 99)):
+        """
+        Returns rolling percentiles of a phase's per-frame time.
+
+        Args:
+            name (string): the phase name
+            quantiles (tuple of numbers): percentiles to return
+
+        Returns:
+            (tuple of floats): milliseconds at each percentile (nearest rank)
+        """
+        samples = sorted(self._history.get(name, ()))
+        if not samples:
+            return tuple(0.0 for _ in quantiles)
+        return tuple(samples[min(len(samples) - 1, max(0,\
+            math.ceil(q / 100 * len(samples)) - 1))] for q in quantiles)
+
+    def summary(self):
+        """
+        Returns the rolling p50/p95/p99 of every phase.
+
+        Returns:
+            dict: phase name -> {"p50": ms, "p95": ms, "p99": ms}
+        """
+        return {name: dict(zip(("p50", "p95", "p99"), self.percentiles(name)))
+                for name in self._history}
+
+    def close(self):
+        """
+        Removes method wrappers and closes the JSON-lines log.
+        """
+        self.uninstrument()
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+
+# profiler used when none is given: always disabled
+DISABLED = FrameProfiler(enabled=False)
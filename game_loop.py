@@ -0,0 +1,144 @@
+"""
+Fixed-timestep timing for the Hungry Sharks game loop.
+
+The simulation always advances in steps of the same length, however long a
+rendered frame takes; frames draw characters interpolated between the last two
+simulation steps.
+"""
+import math
+from euclid3 import Vector2
+from frame_profiler import DISABLED
+
+
+def step_game(field, player_controller, ai_controller, timestep, profiler=DISABLED):
+    """
+    Runs one simulation step: control, update the model to a valid state and
+    advance game time.
+
+    Args:
+        field (HungrySharksField): the field being simulated
+        player_controller (PlayerVelocityController): moves the player
+        ai_controller (AIVelocityController): moves the AI players
+        timestep (float): length of the step in game seconds (the controllers'
+            1/fps)
+        profiler (FrameProfiler, optional): times the player control, AI
+            control and field update phases. Defaults to a disabled profiler.
+    """
+    # where everyone starts from, to check collisions along the tick's paths
+    field.start_tick(timestep)
+
+    # control
+    with profiler.phase("player_control"):
+        player_controller.move()
+    with profiler.phase("ai_control"):
+        ai_controller.move()
+
+    # update model to valid state
+    with profiler.phase("field_update"):
+        field.update(timestep)
+    field.sim_clock.advance(timestep)
+
+
+class FixedTimestepLoop():
+    """
+    Converts real frame times into a whole number of fixed-length simulation
+    steps, carrying the remainder over to the next frame.
+
+    Attributes:
+        _tick_rate (int): simulation steps per second of game time
+        _max_substeps (int): the most steps run for one frame. Time beyond
+            that is dropped, so a slow frame can't snowball into ever slower
+            frames.
+        _accumulator (float): simulation time owed but not yet stepped
+        dropped_time (float): total game time dropped by the substep cap
+    """
+    def __init__(self, tick_rate=40, max_substeps=5):
+        self._tick_rate = tick_rate
+        self._max_substeps = max_substeps
+        self._accumulator = 0
+        self.dropped_time = 0
+
+    @property
+    def tick_rate(self):
+        """
+        Returns private attribute _tick_rate
+        """
+        return self._tick_rate
+
+    @property
+    def timestep(self):
+        """
+        Returns the length of one simulation step in seconds.
+        """
+        return 1/self._tick_rate
+
+    @property
+    def alpha(self):
+        """
+        Returns how far (0 to 1) the current time is between the last
+        simulation step and the next one, for render interpolation.
+        """
+        return min(self._accumulator / self.timestep, 1)
+
+    def advance(self, frame_time, warp=1):
+        """
+        Adds a frame's worth of real time and returns how many simulation steps
+        to run for it.
+
+        Args:
+            frame_time (float): seconds since the previous frame
+            warp (float): game seconds per real second. The substep cap is
+                scaled up with it. Defaults to 1.
+
+        Returns:
+            int: number of simulation steps to run
+        """
+        self._accumulator += frame_time * warp
+        max_substeps = self._max_substeps * math.ceil(warp)
+        # (the epsilon keeps float rounding from leaving a whole step behind)
+        steps = int(self._accumulator / self.timestep + 1e-9)
+        if steps > max_substeps:
+            # drop the whole backlog, not just the excess whole steps
+            steps = max_substeps
+            self.dropped_time += self._accumulator - steps * self.timestep
+            self._accumulator = steps * self.timestep
+        self._accumulator = max(self._accumulator - steps * self.timestep, 0)
+        return steps
+
+
+def capture_positions(field):
+    """
+    Returns the current position of every character on a field.
+
+    Args:
+        field (HungrySharksField): the field
+
+    Returns:
+        dict: character -> (x, y)
+    """
+    positions = {aip: (aip.position.x, aip.position.y) for aip in field.characters}
+    positions[field.player] = (field.player.position.x, field.player.position.y)
+    return positions
+
+
+def interpolated_position(char, previous_positions, alpha):
+    """
+    Returns a character's position blended between where it was before the
+    last simulation step and where it is now.
+
+    Args:
+        char (Character): the character
+        previous_positions (dict): character -> (x, y) before the last step,
+            as returned by capture_positions. Characters missing from it (just
+            spawned) are drawn where they are.
+        alpha (float): 0 for the previous position, 1 for the current one
+
+    Returns:
+        Vector2: the position to draw the character at
+    """
+    current = char.position
+    previous = previous_positions.get(char)
+    if previous is None:
+        return Vector2(current.x, current.y)
+    return Vector2(previous[0] + (current.x - previous[0]) * alpha,
+                   previous[1] + (current.y - previous[1]) * alpha)
@@ -1,11 +1,18 @@
 """
 Hungry Sharks playing field implementation.
 """
-from random import randrange
+import math
+import random
+import numpy as np
 from euclid3 import Vector2
 from character import Player, AIPlayer
+from character_arrays import AIPopulation, BEHAVIOR_CODES
+from indexed_population import IndexedPopulation
+from spatial_hash import SpatialHashGrid
+from behavior_kernels import classify_behaviors, swept_contacts, SPEED_BY_SIZE
+from simulation_clock import SimulationClock
 
-def random_vector2(x_min, x_max, y_min, y_max):
+def random_vector2(x_min, x_max, y_min, y_max, rng=random):
     """
     Returns a Vector2 with random components within a specified range
 
@@ -14,11 +21,43 @@ def random_vector2(x_min, x_max, y_min, y_max):
         x_max (float): x-component upper bound
         y_min (float): y-component lower bound
         y_max (float): y-component upper bound
+        rng (random.Random): random number generator. Defaults to the
+            random module's shared one.
 
     Returns:
         Vector2: random Vector2
     """
-    return Vector2(randrange(x_min, x_max), randrange(y_min, y_max))
+    return Vector2(rng.randrange(x_min, x_max), rng.randrange(y_min, y_max))
+
+def pick_ai_size(player_size, num_enemies, max_nemeses, rng=random):
+    """
+    Picks the size of a new AI player: smaller than the player, or up to two
+    sizes bigger while there are fewer than max_nemeses bigger AI players
+    around. Sizes stay within 1-10 even once the player has evolved past 10.
+
+    Args:
+        player_size (int): the player's size
+        num_enemies (int): AI players bigger than the player so far
+        max_nemeses (int): most AI players bigger than the player
+        rng (random.Random): random number generator. Defaults to the
+            random module's shared one.
+
+    Returns:
+        int: the new AI player's size
+    """
+    min_size = max(1, min(player_size - 2, 9))
+    if num_enemies < max_nemeses:
+        max_size = min(player_size + 3, 10)
+    else:
+        max_size = min(player_size, 10)
+    return rng.randrange(min_size, max(max_size, min_size + 1))
+
+# characters closer than this are colliding
+COLLISION_RADIUS = 30
+
+# unit vector parallel to each wall, in [left, right, top, bottom] order
+# (shared, so looking up a wall direction creates no new Vector2)
+WALL_DIRECTIONS = (Vector2(0, 1), Vector2(0, 1), Vector2(1, 0), Vector2(1, 0))
 
 def check_collision(char1, char2):
     """
@@ -26,7 +65,58 @@ def check_collision(char1, char2):
     Returns True if they are and False otherwise.
     """
     distance = abs(char1.position - char2.position)
-    return distance < 30
+    return distance < COLLISION_RADIUS
+
+def max_player_speed():
+    """
+    Returns the fastest the player can move at any size, boosting.
+    """
+    player = Player(1, None)
+    player.boost = True
+    player._growth_progress = 1
+    speeds = []
+    for size in Player.speed_from_size:
+        player._size = size
+        speeds.append(player.max_speed())
+    return max(speeds)
+
+def swept_contact(char1, char2, start1, start2):
+    """
+    Checks whether a pair of characters collided at any point during the last
+    timestep, assuming each moved in a straight line from where it started
+    the timestep to where it is now, so that fast characters can't pass
+    through each other between ticks.
+
+    Args:
+        char1 (Character): one character
+        char2 (Character): the other character
+        start1, start2: (x, y) positions of char1 and char2 at the start of
+            the timestep
+
+    Returns:
+        float: the fraction of the timestep at which they first came within
+        the collision radius of each other (0 if they started that close), or
+        None if they never did
+    """
+    # char2's offset from char1 at the start of the timestep, and how much it
+    # changed over it
+    sx = start2[0] - start1[0]
+    sy = start2[1] - start1[1]
+    mx = char2.position.x - char1.position.x - sx
+    my = char2.position.y - char1.position.y - sy
+
+    # solve |start + t * change| = radius for the first t in [0, 1)
+    c = sx*sx + sy*sy - COLLISION_RADIUS**2
+    if c < 0:
+        return 0.0
+    a = mx*mx + my*my
+    b = sx*mx + sy*my
+    discriminant = b*b - a*c
+    if a == 0 or discriminant <= 0:
+        return None
+    t = (-b - math.sqrt(discriminant)) / a
+    return t if 0 <= t < 1 else None
+
 
 class HungrySharksField():
     """
@@ -34,73 +124,282 @@ class HungrySharksField():
 
     Attributes:
         player: the player of the game
-        characters: a list of AI characters currently in the game
+        characters (IndexedPopulation): the AI characters currently in the
+        game
+        grid: a spatial index of the AI characters, keyed on the collision
+        radius
         _max_nemeses: the maximum number of AI predators allowed on screen at a
         time
         game_end: a string that is empty as long as the player has not won
         or lost the game and is "win" or "lose" when the game ends
+        eaten_by: the AI player that ate the player, once the game is lost
+        sim_clock: the game-time clock that controllers read instead of the
+        system time
+        rng (random.Random): the field's own random number generator, which
+        all of the game's randomness comes from
+        lod (LODScheduler): if set, only the AI players it picks are moved
+        each tick, and only the ones near the player or a wall have their
+        behavior re-evaluated. Not used by array-backed fields, which update
+        everyone in a few array operations.
+        kinetic (KineticEventQueue): if set, only the AI players whose
+        behavior could have changed since they were last checked are
+        re-evaluated each tick. Not used by array-backed fields either.
+        changed (set): if set, every AI player the game moves, re-evaluates,
+        spawns or shifts to another index is added to it, so a RewindBuffer
+        can record just those. Not used by array-backed fields.
+        walls (bool): whether AI players avoid the edges of the field. An
+        endless ocean (see chunk_manager) turns them off, since its field
+        only ends where the loaded chunks do.
+        _tick_start: where the player and the AI players near it started
+        the current tick (see start_tick), or None
+        _max_player_speed (float): the fastest the player can move (see
+        max_player_speed)
     """
-    def __init__(self, window_x, window_y, num_characters):
+    def __init__(self, window_x, window_y, num_characters, seed=None):
         # window size parameters
         self.window_x = window_x
         self.window_y = window_y
 
+        # randomness (a seed makes the whole game reproducible)
+        self.rng = random.Random(seed)
+
+        # game time
+        self.sim_clock = SimulationClock()
+
         # create player 1
         self.player = Player(2, Vector2(window_x/2, window_y/2))
 
         # create AI players
-        self.characters = []
-        for _ in range(num_characters):
-            new_aip = self.get_new_ai(1)
-            self.spawn_new_ai(new_aip)
-        self._max_nemeses = 2
+        self.kinetic = None
+        self.changed = None
+        self._tick_start = None
+        self._max_player_speed = max_player_speed()
+        self.characters = IndexedPopulation()
+        self.grid = SpatialHashGrid(cell_size=COLLISION_RADIUS)
+        self.spawn_ais([1] * num_characters)
+        self._max_nemeses = self.max_nemeses
         self.game_end = ""
+        self.eaten_by = None
+        self.lod = None
+        self.walls = True
+
+    # fraction of a level gained by eating an AI player of the player's size
+    growth_rate = 0.5
+    # default limit on AI predators on screen at a time
+    max_nemeses = 2
+
+    def characters_near(self, point, radius):
+        """
+        Returns the AI characters within a distance of a point.
+
+        Args:
+            point (Vector2): center of the search
+            radius (float): search radius
+
+        Returns:
+            list of players: AI characters strictly closer than radius to
+            point.
+        """
+        return self.grid.query_radius(point, radius)
+
+    def characters_in_rect(self, x_min, y_min, x_max, y_max):
+        """
+        Returns the AI characters inside a rectangle of the field (e.g. what a
+        camera can see).
+
+        Args:
+            x_min, y_min (float): the rectangle's top left corner
+            x_max, y_max (float): the rectangle's bottom right corner
+
+        Returns:
+            list of players: AI characters with x_min <= x < x_max and
+            y_min <= y < y_max.
+        """
+        return self.grid.query_rect(x_min, y_min, x_max, y_max)
 
-    def player_collisions(self):
+    def start_tick(self, timestep):
+        """
+        Remembers where the player and the AI players that could reach it
+        during the coming tick start it from, so that player_collisions can
+        follow them from there (step_game calls it before anyone moves).
+
+        Args:
+            timestep (float): length of the coming tick
+        """
+        player = self.player
+        # furthest an AI player can be and still reach the player this tick
+        reach = COLLISION_RADIUS\
+            + (self._max_player_speed + SPEED_BY_SIZE.max()) * timestep
+        self._tick_start = ((player.position.x, player.position.y),\
+            {aip: (aip.position.x, aip.position.y)
+             for aip in self.characters_near(player.position, reach)})
+
+    def player_collisions(self, timestep=None):
         """
         Returns any AIPlayers which the player is colliding with.
 
+        Args:
+            timestep (float, optional): length of the tick just simulated.
+                If given, and start_tick was called before it, AI players
+                the player passed through during the tick collide too (see
+                swept_contact), in the order the player reached them.
+                Defaults to only checking where everyone is now.
+
         Returns:
             list of players: who is being collided with. Empty list if no
             collisions.
         """
-        collisions = []
-
-        # check each AIPlayer against player1.
-        # If they collide, add the AIPlayer to collisions
-        for char in self.characters:
-            if check_collision(self.player, char):
-                collisions.append(char)
+        player = self.player
+        if not timestep or self._tick_start is None:
+            return self.characters_near(player.position, COLLISION_RADIUS)
 
-        return collisions
+        player_start, starts = self._tick_start
+        candidates = dict.fromkeys(aip for aip in starts if aip in self.characters)
+        # any others (spawned since) didn't move into the player this tick
+        candidates.update(dict.fromkeys(self.characters_near(player.position,\
+            COLLISION_RADIUS)))
+        contacts = []
+        for aip in candidates:
+            start = starts.get(aip, (aip.position.x, aip.position.y))
+            contact = swept_contact(player, aip, player_start, start)
+            if contact is not None:
+                contacts.append((contact, aip))
+        contacts.sort(key=lambda contact: contact[0])
+        return [aip for _, aip in contacts]
 
-    def get_new_ai(self, size):
+    def get_new_ai(self, size, rng=None, area=None):
         """
         Returns a new AI player with a random location.
 
         Args:
             size (int): size of the new player.
+            rng (random.Random, optional): random number generator. Defaults
+                to the field's.
+            area (tuple, optional): (x_min, x_max, y_min, y_max) to place it
+                in. Defaults to the field, 50 in from the walls.
         """
-        pos = random_vector2(50, self.window_x - 50, 50, self.window_y - 50)
+        rng = rng or self.rng
+        pos = random_vector2(*self._spawn_area(area), rng)
         vel = Vector2(0,0)
         aip = AIPlayer(size, pos, vel, "wander")
-        aip.velocity = random_vector2(-10, 10, -10, 10).normalize() * aip.max_speed()
+        aip.velocity = random_vector2(-10, 10, -10, 10, rng).normalize()\
+            * aip.max_speed()
         return aip
 
+    def _spawn_area(self, area):
+        """
+        Returns the (x_min, x_max, y_min, y_max) area new AI players are
+        placed in: area, or the field 50 in from the walls if it is None.
+        """
+        if area is None:
+            return (50, self.window_x - 50, 50, self.window_y - 50)
+        return area
+
+    def spawn_ai(self, size, area=None):
+        """
+        Spawns a new AI player, placed and headed at random like
+        get_new_ai's, into a recycled AIPlayer from the field's entity pool
+        rather than a newly allocated one.
+
+        Args:
+            size (int): size of the new player.
+            area (tuple, optional): (x_min, x_max, y_min, y_max) to place it
+                in. Defaults to the field, 50 in from the walls.
+
+        Returns:
+            AIPlayer: the spawned AI player as stored in the field.
+        """
+        rng = self.rng
+        x_min, x_max, y_min, y_max = self._spawn_area(area)
+        x, y = rng.randrange(x_min, x_max), rng.randrange(y_min, y_max)
+        vx, vy = rng.randrange(-10, 10), rng.randrange(-10, 10)
+        length = math.hypot(vx, vy)
+        if length:
+            speed = float(SPEED_BY_SIZE[size])
+            vx, vy = vx / length * speed, vy / length * speed
+        return self.spawn_new_ai(self.characters.pool.acquire(size, x, y, vx, vy))
+
+    def spawn_ais(self, sizes, area=None):
+        """
+        Spawns many new AI players at once, wandering from random positions
+        along random headings. The positions and headings are drawn in a few
+        array operations from a NumPy generator seeded from the field's rng,
+        so a seeded field still spawns the same AI players.
+
+        Args:
+            sizes: sizes of the new AI players.
+            area (tuple, optional): (x_min, x_max, y_min, y_max) to place them
+                in. Defaults to the field, 50 in from the walls.
+        """
+        sizes = np.asarray(sizes, dtype=np.int64)
+        if not len(sizes):
+            return
+        x_min, x_max, y_min, y_max = self._spawn_area(area)
+        generator = np.random.default_rng(self.rng.getrandbits(64))
+        positions = np.stack([generator.integers(x_min, x_max, len(sizes)),\
+            generator.integers(y_min, y_max, len(sizes))], axis=1).astype(float)
+        headings = generator.uniform(0, 2 * math.pi, len(sizes))
+        velocities = np.stack([np.cos(headings), np.sin(headings)], axis=1)\
+            * SPEED_BY_SIZE[sizes][:, np.newaxis]
+        self._spawn_columns(sizes, positions, velocities)
+
+    def _spawn_columns(self, sizes, positions, velocities):
+        """
+        Spawns wandering AI players given as arrays of their sizes, positions
+        and velocities, into AIPlayers from the field's entity pool.
+        """
+        pool = self.characters.pool
+        for size, (x, y), (vx, vy) in zip(sizes.tolist(), positions.tolist(),\
+                velocities.tolist()):
+            self.spawn_new_ai(pool.acquire(size, x, y, vx, vy))
+
+    def _reclaim_despawned(self):
+        """
+        Lets the entity pool reuse the AIPlayers despawned since the last
+        call (see EntityPool.reclaim).
+        """
+        self.characters.pool.reclaim()
+
     def spawn_new_ai(self, aip):
         """
         Add an AI character to the game.
 
         Args:
             aip (AIPlayer): the aip to be spawned in.
+
+        Returns:
+            AIPlayer: the spawned AI player as stored in the field.
         """
         self.characters.append(aip)
+        self.grid.insert(aip)
+        aip.track_position(self.grid)
+        if self.kinetic is not None:
+            self.kinetic.add(aip)
+        if self.changed is not None:
+            self.changed.add(aip)
+        return aip
+
+    def despawn_ai(self, aip):
+        """
+        Remove an AI character from the game.
+
+        Args:
+            aip (AIPlayer): the aip to be removed.
+        """
+        if self.changed is not None and len(self.characters):
+            # the last AI player takes its place (see IndexedPopulation)
+            self.changed.add(self.characters[-1])
+        self.characters.remove(aip)
+        self.grid.remove(aip)
+        aip.track_position(None)
+        if self.kinetic is not None:
+            self.kinetic.discard(aip)
 
     def get_num_enemies(self):
         """
         Returns the number of AI players in the game larger than Player 1.
         """
-        return sum([aip.size > self.player.size for aip in self.characters])
+        return self.characters.count_larger(self.player.size)
 
     def get_dist_to_walls(self, char):
         """
@@ -112,8 +411,10 @@ class HungrySharksField():
 
         Returns:
             (list of floats): distances to walls in [lef, right, top, bottom]
-            form
+            form (all infinite if the field has no walls)
         """
+        if not self.walls:
+            return [math.inf] * 4
         return [char.position.x,
                 self.window_x - char.position.x,
                 char.position.y,
@@ -129,17 +430,26 @@ class HungrySharksField():
         """
         dist_to_walls = self.get_dist_to_walls(char)
         closest_wall_id = dist_to_walls.index(min(dist_to_walls))
-        wall_cases = {0: Vector2(0, 1),
-                      1: Vector2(0, 1),
-                      2: Vector2(1, 0),
-                      3: Vector2(1, 0)}
-        return wall_cases[closest_wall_id]
+        return WALL_DIRECTIONS[closest_wall_id]
 
     def update_ai_behaviors(self):
         """
         Checks the state of the field and updates ai players to behave correctly
         """
-        for aip in self.characters:
+        # only AIs this close to the player can possibly see it
+        in_view_range = set(self.characters_near(self.player.position,\
+            AIPlayer.max_fov()))
+        player_position = self.player.position
+        # far AI players can only be wandering (the scheduler sets them to),
+        # and so can ones whose next kinetic event hasn't come due
+        if self.kinetic is not None:
+            characters = self.kinetic.due(self.sim_clock.time)
+        elif self.lod is not None:
+            characters = self.lod.near
+        else:
+            characters = self.characters
+
+        for aip in characters:
             # avoid walls:
             boundary_margin = 25
             in_danger_zone = min(self.get_dist_to_walls(aip)) <= boundary_margin
@@ -150,8 +460,9 @@ class HungrySharksField():
                 continue
 
             # interact with player 1:
-            dist_to_player = (aip.position - self.player.position).magnitude()
-            if dist_to_player < aip.fov():
+            if aip in in_view_range and \
+                    math.sqrt((aip.position.x - player_position.x)**2\
+                    + (aip.position.y - player_position.y)**2) < aip.fov():
                 # bigger AIs attack, smaller ones flee, and equal sized
                 # ones keep wandering
                 if aip.size > self.player.size:
@@ -161,42 +472,221 @@ class HungrySharksField():
             else:
                 aip.behavior_state = "wander"
 
-    def handle_eating_and_win_lose(self):
+        if self.changed is not None:
+            self.changed.update(characters)
+        if self.kinetic is not None:
+            for aip in characters:
+                self.kinetic.reschedule(self, aip, self.sim_clock.time)
+
+    def handle_eating_and_win_lose(self, timestep=None):
         """
         Checks state of the field and updates players when an eating event
         occurs.
+
+        Args:
+            timestep (float, optional): length of the tick just simulated, to
+                also catch AI players the player passed through during it
+                (see player_collisions)
         """
+        # AI players despawned last tick can now be recycled
+        self._reclaim_despawned()
+
         # Handle Player1 Eating AI players and winning/losing the game
-        colliders = self.player_collisions()
+        colliders = self.player_collisions(timestep)
+        self._tick_start = None
         for aip in colliders:
             # determine if the player won or lost the match:
             if aip.size > self.player.size:
                 # Player loses the game!
                 self.game_end = "lose"
+                if self.eaten_by is None:
+                    self.eaten_by = aip
             elif aip.size < self.player.size:
                 # grow the player
-                growth_factor = 0.5 * aip.size / self.player.size * 100
+                growth_factor = self.growth_rate * aip.size / self.player.size * 100
                 self.player.grow(growth_factor)
                 # remove the collider
-                self.characters.remove(aip)
-                # spawn a new AI player that is smaller or one size bigger than player
-                if self.get_num_enemies() < 2:
-                    new_aip = self.get_new_ai(randrange(\
-                        max(1, self.player.size - 2),\
-                        min(self.player.size + 3, 10)))
-                else:
-                    new_aip = self.get_new_ai(randrange(\
-                        max(1, self.player.size - 2),\
-                        self.player.size))
+                self.despawn_ai(aip)
+                # spawn a new AI player that is smaller or a little bigger than player
+                new_aip = self.spawn_ai(pick_ai_size(self.player.size,\
+                    self.get_num_enemies(), self._max_nemeses, self.rng))
                 new_aip.relocate(self.player, self.window_x, self.window_y)
-                self.spawn_new_ai(new_aip)
         if self.player.size > 10:
             self.game_end = "win"
 
-    def update(self):
+    def update(self, timestep=None):
         """
         Takes care of player-to-player interations: collision detection,
         eating, growing, and respawn of AI players.
+
+        Args:
+            timestep (float, optional): length of the tick just simulated
+                (see handle_eating_and_win_lose)
         """
         self.update_ai_behaviors()
-        self.handle_eating_and_win_lose()
+        self.handle_eating_and_win_lose(timestep)
+
+
+class HungrySharksArrayField(HungrySharksField):
+    """
+    Hungry Sharks playing field whose AI players are stored in NumPy arrays
+    (an AIPopulation) rather than a list of AIPlayer objects.
+
+    The characters attribute still iterates as AIPlayer-like views, so views
+    and controllers written for HungrySharksField keep working.
+
+    Attributes:
+        characters (AIPopulation): the AI characters currently in the game
+    """
+    def __init__(self, window_x, window_y, num_characters, seed=None):
+        super().__init__(window_x, window_y, 0, seed)
+
+        # create AI players
+        self.characters = AIPopulation(capacity=num_characters)
+        self.spawn_ais([1] * num_characters)
+
+    def spawn_new_ai(self, aip):
+        """
+        Add an AI character to the game.
+
+        Args:
+            aip (AIPlayer): the aip to be spawned in. Its state is copied into
+                the field's arrays.
+
+        Returns:
+            AIPlayerView: the live view of the spawned AI player.
+        """
+        return self.characters.append(aip)
+
+    def despawn_ai(self, aip):
+        """
+        Remove an AI character from the game.
+
+        Args:
+            aip (AIPlayerView): the aip to be removed.
+        """
+        self.characters.remove(aip)
+
+    def spawn_ai(self, size, area=None):
+        """
+        Spawns a new AI player, placed and headed at random like
+        get_new_ai's, straight into a new row of the arrays.
+
+        Args:
+            size (int): size of the new player.
+            area (tuple, optional): (x_min, x_max, y_min, y_max) to place it
+                in. Defaults to the field, 50 in from the walls.
+
+        Returns:
+            AIPlayerView: the live view of the spawned AI player.
+        """
+        rng = self.rng
+        x_min, x_max, y_min, y_max = self._spawn_area(area)
+        x, y = rng.randrange(x_min, x_max), rng.randrange(y_min, y_max)
+        vx, vy = rng.randrange(-10, 10), rng.randrange(-10, 10)
+        length = math.hypot(vx, vy)
+        if length:
+            speed = float(SPEED_BY_SIZE[size])
+            vx, vy = vx / length * speed, vy / length * speed
+        self._spawn_columns(np.array([size]), np.array([(x, y)], dtype=float),\
+            np.array([(vx, vy)], dtype=float))
+        return self.characters[len(self.characters) - 1]
+
+    def _reclaim_despawned(self):
+        """
+        Does nothing: rows are reused as soon as they are freed.
+        """
+
+    def _spawn_columns(self, sizes, positions, velocities):
+        """
+        Spawns wandering AI players given as arrays of their sizes, positions
+        and velocities, copying each array into the population in one go.
+        """
+        self.characters.extend({"positions": positions, "velocities": velocities,\
+            "sizes": sizes, "growth": 0, "behaviors": BEHAVIOR_CODES["wander"],\
+            "clocks": 0, "prev_ticks": 0})
+
+    def characters_near(self, point, radius):
+        """
+        Returns the AI characters within a distance of a point, using an array
+        mask over every position instead of the spatial grid.
+
+        Args:
+            point (Vector2): center of the search
+            radius (float): search radius
+
+        Returns:
+            list of players: AI characters strictly closer than radius to
+            point.
+        """
+        displacement = self.characters.positions - (point[0], point[1])
+        dist_sq = np.einsum("ij,ij->i", displacement, displacement)
+        return [self.characters[i] for i in np.flatnonzero(dist_sq < radius**2)]
+
+    def characters_in_rect(self, x_min, y_min, x_max, y_max):
+        """
+        Returns the AI characters inside a rectangle of the field, using an
+        array mask over every position instead of the spatial grid.
+
+        Args:
+            x_min, y_min (float): the rectangle's top left corner
+            x_max, y_max (float): the rectangle's bottom right corner
+
+        Returns:
+            list of players: AI characters with x_min <= x < x_max and
+            y_min <= y < y_max.
+        """
+        x = self.characters.positions[:, 0]
+        y = self.characters.positions[:, 1]
+        inside = (x >= x_min) & (x < x_max) & (y >= y_min) & (y < y_max)
+        return [self.characters[i] for i in np.flatnonzero(inside)]
+
+    def player_collisions(self, timestep=None):
+        """
+        Returns any AIPlayers which the player is colliding with, testing
+        every AI player at once.
+
+        Args:
+            timestep (float, optional): length of the tick just simulated, to
+                also catch AI players the player passed through during it
+                (if start_tick was called before it)
+
+        Returns:
+            list of players: who is being collided with, in the order the
+            player reached them. Empty list if no collisions.
+        """
+        population = self.characters
+        if not timestep or self._tick_start is None\
+                or len(self._tick_start[1]) != len(population):
+            return super().player_collisions()
+        player = self.player
+        player_start, starts = self._tick_start
+        offsets = population.positions - (player.position.x, player.position.y)
+        displacements = offsets - (starts - player_start)
+        contacts = swept_contacts(offsets, displacements, COLLISION_RADIUS)
+        colliding = np.flatnonzero(np.isfinite(contacts))
+        colliding = colliding[np.argsort(contacts[colliding], kind="stable")]
+        return [population[i] for i in colliding]
+
+    def start_tick(self, timestep):
+        """
+        Remembers where the player and every AI player start the coming tick
+        (see HungrySharksField.start_tick), as a copy of the positions array.
+
+        Args:
+            timestep (float): length of the coming tick
+        """
+        player = self.player
+        self._tick_start = (np.array((player.position.x, player.position.y)),\
+            self.characters.positions.copy())
+
+    def update_ai_behaviors(self):
+        """
+        Checks the state of the field and updates ai players to behave
+        correctly, classifying every AI player at once.
+        """
+        population = self.characters
+        population.behaviors[:] = classify_behaviors(population.positions,\
+            population.velocities, population.sizes, population.behaviors,\
+            (self.player.position.x, self.player.position.y), self.player.size,\
+            self.window_x, self.window_y, walls=self.walls)
@@ -1,31 +1,256 @@
 """
 Runs the Hungry Sharks game
 """
-from hungry_sharks_view import PyGameView
+import argparse
+import random
+import time
+from hungry_sharks_view import PyGameView, PyGameInput
 from hungry_sharks_field import HungrySharksField
 from character_controller import PlayerVelocityController, AIVelocityController
+from game_loop import FixedTimestepLoop, capture_positions, step_game
+from frame_profiler import FrameProfiler
+from rewind_buffer import RewindBuffer
+from player_input import InputRecorder, ReplayInput
+from chunk_manager import ChunkManager
+from lod_scheduler import LODScheduler
+from kinetic_events import KineticEventQueue
 
 
-def main():
+def parse_warp(text):
+    """
+    Parses a --warp value: a number of game seconds per real second, or "max"
+    to run unthrottled.
+
+    Args:
+        text (string): the command-line value
+
+    Returns:
+        float or None: the warp, None for unthrottled
+    """
+    if text.lower() == "max":
+        return None
+    warp = float(text)
+    if warp <= 0:
+        raise argparse.ArgumentTypeError("warp must be positive")
+    return warp
+
+
+def parse_args(args=None):
+    """
+    Parses the game's command-line options.
+
+    Args:
+        args (list of strings, optional): the arguments. Defaults to
+            sys.argv[1:].
+
+    Returns:
+        dict: keyword arguments for main
+    """
+    parser = argparse.ArgumentParser(description="Runs the game of Hungry Sharks")
+    parser.add_argument("--tick-rate", type=int, default=40,
+                        help="simulation steps per second (default 40)")
+    parser.add_argument("--max-substeps", type=int, default=5,
+                        help="most simulation steps per frame (default 5)")
+    parser.add_argument("--warp", type=parse_warp, default=1,
+                        help='game seconds per real second, or "max" to run '
+                        "unthrottled (default 1)")
+    parser.add_argument("--render-mode", choices=PyGameView.render_modes,
+                        default="full",
+                        help='"dirty" only redraws the areas that changed, and '
+                        'scrolls the window as the camera moves (default "full")')
+    parser.add_argument("--profile", action="store_true",
+                        help="time each phase of the loop (F3 shows the timings)")
+    parser.add_argument("--profile-inner", action="store_true",
+                        help="also time sprite drawing, behavior updates and eating")
+    parser.add_argument("--profile-log", metavar="FILE",
+                        help="write per-frame timings to FILE as JSON lines")
+    parser.add_argument("--rewind-seconds", type=float, default=30,
+                        help="game seconds kept for rewinding with R (default 30, "
+                        "0 turns rewinding off)")
+    parser.add_argument("--world-scale", type=int, default=3,
+                        help="the ocean is this many windows wide and high, with "
+                        "10 AI players per window's worth (default 3)")
+    parser.add_argument("--endless", action="store_true",
+                        help="swim an endless ocean, streamed in chunks around the "
+                        "player (no rewinding, recording or replaying)")
+    parser.add_argument("--lod", action="store_true",
+                        help="update AI players far from the player less often")
+    parser.add_argument("--kinetic", action="store_true",
+                        help="only re-check AI players whose behavior could have "
+                        "changed (kinetic events)")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="seed of the game's randomness (default: random)")
+    parser.add_argument("--record-input", metavar="FILE",
+                        help="record the player's input to FILE for replaying")
+    parser.add_argument("--replay-input", metavar="FILE",
+                        help="replay a recorded game (its seed, tick rate and "
+                        "world too)")
+    options = parser.parse_args(args)
+    if options.endless and (options.record_input or options.replay_input):
+        parser.error("endless games can't be recorded or replayed")
+    return vars(options)
+
+
+def main(tick_rate=40, max_substeps=5, warp=1, profile=False, profile_inner=False,\
+        profile_log=None, rewind_seconds=30, world_scale=3, endless=False,\
+        lod=False, kinetic=False, seed=None, record_input=None, replay_input=None,\
+        render_mode="full"):
     """
     Runs the game of Hungry Sharks
+
+    The simulation runs at a fixed tick rate, independent of how fast frames
+    are drawn: each frame runs however many simulation steps real time calls
+    for (at most max_substeps) and draws characters interpolated between the
+    last two steps.
+
+    Args:
+        tick_rate (int): simulation steps per second. Defaults to 40.
+        max_substeps (int): most simulation steps run per frame (at x1 time
+            warp). Defaults to 5.
+        warp: game seconds per real second (e.g. 1, 10, 100), or None to
+            simulate as much as fits between frames. Defaults to 1.
+        profile (bool): time each phase of the loop (F3 shows the timings).
+            Defaults to False.
+        profile_inner (bool): also time draw_character_as_img,
+            update_ai_behaviors and handle_eating_and_win_lose (implies
+            profile). Defaults to False.
+        profile_log (string, optional): file to write per-frame timings to as
+            JSON lines (implies profile).
+        rewind_seconds (float): game seconds of history kept for rewinding
+            (R in game). 0 turns rewinding off. Defaults to 30.
+        world_scale (int): the field is this many windows wide and high, with
+            10 AI players per window's area. The camera follows the player.
+            Defaults to 3.
+        endless (bool): stream an endless ocean in window-wide chunks
+            around the player instead (see chunk_manager). Turns rewinding
+            off. Defaults to False.
+        lod (bool): move AI players far from the player less often, by
+            bigger steps (see lod_scheduler). Defaults to False.
+        kinetic (bool): only re-evaluate the behavior of AI players whose
+            next wall or player event has come due (see kinetic_events).
+            Defaults to False.
+        seed (int, optional): seed of the field's randomness. Defaults to a
+            random seed.
+        record_input (string, optional): file to record every tick's player
+            input to, along with the seed and tick rate.
+        replay_input (string, optional): recording to play back instead of
+            following the mouse. Its seed, tick rate and field replace seed,
+            tick_rate and world_scale, so the recorded game repeats exactly.
+        render_mode (string): "full" or "dirty" (see PyGameView). Defaults to
+            "full".
+
+    Raises:
+        ValueError: if replay_input was recorded on an array-backed field
     """
-    field = HungrySharksField(1200, 600, 10)
-    view = PyGameView(field)
-    player_controller = PlayerVelocityController(field, fps=view.fps)
-    ai_controller = AIVelocityController(field, fps=view.fps)
+    window_size = (1200, 600)
+    world = (window_size[0] * world_scale, window_size[1] * world_scale)
+    num_characters = 10 * world_scale**2
+    mouse_input = None
+    if replay_input:
+        player_input = ReplayInput(replay_input)
+        if player_input.array_backend:
+            raise ValueError(f"{replay_input} was recorded on an array-backed "\
+                "field, which only the headless runner plays")
+        seed, tick_rate = player_input.seed, player_input.fps
+        world, num_characters = player_input.world, player_input.num_characters
+    else:
+        player_input = mouse_input = PyGameInput()
+    if seed is None:
+        # pick one anyway, so that a recording can reproduce the game
+        seed = random.randrange(2**32)
+    recorder = None
+    if record_input:
+        recorder = player_input = InputRecorder(player_input, record_input,\
+            seed=seed, fps=tick_rate, num_characters=num_characters, world=world)
+
+    chunks = None
+    if endless:
+        chunks = ChunkManager(chunk_size=window_size[0], seed=seed)
+        field = chunks.field
+        # rewinding would need the chunks back as they were too
+        rewind_seconds = 0
+    else:
+        field = HungrySharksField(world[0], world[1], num_characters, seed=seed)
+    field.sim_clock.warp = warp
+    if lod:
+        field.lod = LODScheduler()
+    if kinetic:
+        field.kinetic = KineticEventQueue(field.characters)
+    profiler = FrameProfiler(enabled=profile or profile_inner or bool(profile_log),\
+        jsonl_path=profile_log)
+    rewind = None
+    if rewind_seconds:
+        rewind = RewindBuffer(max_ticks=int(rewind_seconds * tick_rate),\
+            keyframe_interval=tick_rate)
+        rewind.record(field)
+    view = PyGameView(field, profiler=profiler, rewind=rewind,\
+        window_size=window_size, render_mode=render_mode)
+    if mouse_input is not None:
+        # the mouse points at the window, the player moves in the field
+        mouse_input.camera = view.camera
+    if profile_inner:
+        profiler.instrument(view, "draw_character_as_img")
+        profiler.instrument(field, "update_ai_behaviors")
+        profiler.instrument(field, "handle_eating_and_win_lose")
+    loop = FixedTimestepLoop(tick_rate=tick_rate, max_substeps=max_substeps)
+    player_controller = PlayerVelocityController(field, player_input,\
+        fps=loop.tick_rate)
+    ai_controller = AIVelocityController(field, fps=loop.tick_rate)
 
     # main game loop
+    previous_positions = None
+    was_rewinding = False
+    previous_time = time.perf_counter()
     while not field.game_end:
         # view
-        view.draw()
+        view.draw(previous_positions, loop.alpha)
+
+        current_time = time.perf_counter()
+        frame_time = current_time - previous_time
+        previous_time = current_time
+
+        if view.rewinding:
+            # paused while scrubbing through the rewind buffer
+            previous_positions = None
+            was_rewinding = True
+            continue
+        if was_rewinding and recorder is not None:
+            # resumed from a rewound tick: the ticks after it never happened
+            recorder.truncate(rewind.last_tick)
+        was_rewinding = False
+
+        if field.sim_clock.unthrottled:
+            # step until it's time for the next frame (nothing to interpolate)
+            previous_positions = None
+            frame_deadline = current_time + 1/view.fps
+            while time.perf_counter() < frame_deadline and not field.game_end:
+                step_game(field, player_controller, ai_controller, loop.timestep,\
+                    profiler)
+                if chunks is not None:
+                    chunks.update()
+                if rewind is not None:
+                    rewind.record(field)
+            profiler.end_frame()
+            continue
 
-        # control
-        player_controller.move()
-        ai_controller.move()
+        for _ in range(loop.advance(frame_time, field.sim_clock.warp)):
+            previous_positions = capture_positions(field)
+            step_game(field, player_controller, ai_controller, loop.timestep,\
+                profiler)
+            if chunks is not None and chunks.update() is not None:
+                # everything was shifted back toward the field's center
+                previous_positions = None
+            if rewind is not None:
+                rewind.record(field)
+            if field.game_end:
+                break
+        profiler.end_frame()
 
-        # update model to valid state
-        field.update()
+    profiler.close()
+    if chunks is not None:
+        chunks.close()
+    if recorder is not None:
+        recorder.close()
 
     # win and lose screen
     end_screen_switcher = {
@@ -37,4 +262,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    main(**parse_args())
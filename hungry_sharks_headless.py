@@ -0,0 +1,202 @@
+"""
+Runs Hungry Sharks without a display, as fast as the CPU allows.
+
+Useful for balance testing on machines with no screen: the player is driven by
+a PlayerInput source (scripted, recorded or bot) instead of the mouse, and the
+loop is never throttled by a frame clock (unless the field's time warp asks
+for it).
+"""
+import argparse
+import random
+import time
+from collections import namedtuple
+from hungry_sharks_field import HungrySharksField, HungrySharksArrayField
+from character_controller import PlayerVelocityController, AIVelocityController
+from player_input import ChaseBotInput, InputRecorder, ReplayInput
+from game_loop import step_game
+from frame_profiler import DISABLED
+from chunk_manager import ChunkManager
+from lod_scheduler import LODScheduler
+from kinetic_events import KineticEventQueue
+
+HeadlessStats = namedtuple("HeadlessStats",
+    ["ticks", "wall_seconds", "sim_seconds", "ticks_per_second", "game_end"])
+
+
+class HeadlessRunner():
+    """
+    Steps a Hungry Sharks field with no view attached.
+
+    Attributes:
+        _field: the game field being simulated
+        _player_controller: moves the player from the player input source
+        _ai_controller: moves every AI player
+        _profiler (FrameProfiler): times the phases of each tick
+        _fps (int): simulated frames per second (sets the timestep)
+        _chunks (ChunkManager): streams the ocean around the player after
+            every tick, or None for a fixed field
+        ticks (int): number of ticks simulated so far
+
+    The runner sets the field's time warp: None (the default) runs
+    unthrottled, and a number paces the run at that many game seconds per real
+    second.
+    """
+    def __init__(self, field, player_input, fps=40, warp=None, profiler=DISABLED,\
+            chunks=None):
+        self._field = field
+        self._chunks = chunks
+        self._profiler = profiler
+        self._field.sim_clock.warp = warp
+        self._fps = fps
+        self._player_controller = PlayerVelocityController(field, player_input,\
+            fps=fps)
+        self._ai_controller = AIVelocityController(field, fps=fps)
+        self.ticks = 0
+
+    @property
+    def field(self):
+        """
+        Returns private attribute _field
+        """
+        return self._field
+
+    def step(self):
+        """
+        Runs one tick of the game: control, then update the model.
+        """
+        step_game(self._field, self._player_controller, self._ai_controller,\
+            1/self._fps, self._profiler)
+        if self._chunks is not None:
+            with self._profiler.phase("chunks"):
+                self._chunks.update()
+        self._profiler.end_frame()
+        self.ticks += 1
+
+    def run(self, max_ticks=None, max_seconds=None):
+        """
+        Steps the game until it ends, max_ticks ticks have run or max_seconds
+        of wall-clock time have passed, whichever comes first.
+
+        Args:
+            max_ticks (int, optional): tick limit. Defaults to None (no limit).
+            max_seconds (float, optional): wall-clock limit. Defaults to None
+                (no limit).
+
+        Returns:
+            HeadlessStats: what was simulated and how fast.
+        """
+        start_ticks = self.ticks
+        start_sim_time = self._field.sim_clock.time
+        start = time.perf_counter()
+        now = start
+        while not self._field.game_end:
+            if max_ticks is not None and self.ticks - start_ticks >= max_ticks:
+                break
+            if max_seconds is not None and now - start >= max_seconds:
+                break
+            self.step()
+            now = time.perf_counter()
+
+            # stay no further ahead of real time than the time warp allows
+            clock = self._field.sim_clock
+            if not clock.unthrottled:
+                ahead = (clock.time - start_sim_time) / clock.warp - (now - start)
+                if ahead > 0:
+                    time.sleep(ahead)
+                    now = time.perf_counter()
+
+        ticks = self.ticks - start_ticks
+        wall_seconds = now - start
+        ticks_per_second = ticks / wall_seconds if wall_seconds > 0 else float("inf")
+        return HeadlessStats(ticks, wall_seconds, ticks / self._fps,\
+            ticks_per_second, self._field.game_end)
+
+
+def main():
+    """
+    Runs a headless bot game and reports the simulation rate.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--characters", type=int, default=10)
+    parser.add_argument("--world", type=int, nargs=2, default=(1200, 600),
+                        metavar=("WIDTH", "HEIGHT"), help="field size (default 1200 600)")
+    parser.add_argument("--ticks", type=int, default=None)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--fps", type=int, default=40)
+    parser.add_argument("--arrays", action="store_true",
+                        help="store AI players in NumPy arrays")
+    parser.add_argument("--warp", type=float, default=None,
+                        help="game seconds per real second (default: unthrottled)")
+    parser.add_argument("--lod", action="store_true",
+                        help="update AI players far from the player less often "
+                        "(list fields only)")
+    parser.add_argument("--kinetic", action="store_true",
+                        help="only re-check AI players whose kinetic events come "
+                        "due (list fields only)")
+    parser.add_argument("--endless", action="store_true",
+                        help="stream an endless ocean in --world-sized chunks "
+                        "(--characters per chunk) instead of a fixed field")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="seed of the game's randomness")
+    parser.add_argument("--record", metavar="FILE",
+                        help="record the bot's input to FILE")
+    parser.add_argument("--replay", metavar="FILE",
+                        help="replay a recorded game (every tick of it, with its "
+                        "seed, fps, characters and world) instead of running the bot")
+    args = parser.parse_args()
+
+    player_input = ChaseBotInput()
+    seed, fps, characters, world = args.seed, args.fps, args.characters, args.world
+    array_backend = args.arrays
+    max_ticks, max_seconds = args.ticks, args.seconds
+    if seed is None:
+        # pick one anyway, so that a recording can reproduce the game
+        seed = random.randrange(2**32)
+    if args.replay:
+        player_input = ReplayInput(args.replay)
+        if args.arrays and not player_input.array_backend:
+            parser.error("the recording was made on a list field, not --arrays")
+        seed, fps, characters, world = player_input.seed, player_input.fps,\
+            player_input.num_characters, player_input.world
+        array_backend = player_input.array_backend
+        max_ticks, max_seconds = len(player_input), None
+    elif args.record:
+        player_input = InputRecorder(player_input, args.record, seed=seed, fps=fps,\
+            num_characters=characters, world=world, array_backend=array_backend)
+
+    field_class = HungrySharksArrayField if array_backend else HungrySharksField
+    chunks = None
+    if args.endless:
+        if args.record or args.replay:
+            parser.error("--endless games can't be recorded or replayed")
+        chunks = ChunkManager(field_class, chunk_size=world[0],\
+            characters_per_chunk=characters, seed=seed)
+        field = chunks.field
+    else:
+        field = field_class(world[0], world[1], characters, seed=seed)
+    if args.lod:
+        if array_backend:
+            parser.error("--lod only applies to list fields")
+        field.lod = LODScheduler()
+    if args.kinetic:
+        if array_backend:
+            parser.error("--kinetic only applies to list fields")
+        field.kinetic = KineticEventQueue(field.characters)
+    runner = HeadlessRunner(field, player_input, fps=fps, warp=args.warp,\
+        chunks=chunks)
+    stats = runner.run(max_ticks=max_ticks, max_seconds=max_seconds)
+    if isinstance(player_input, InputRecorder):
+        player_input.close()
+    if chunks is not None:
+        chunks.close()
+
+    print(f"ticks:             {stats.ticks}")
+    print(f"wall time:         {stats.wall_seconds:.3f} s")
+    print(f"simulated time:    {stats.sim_seconds:.1f} s")
+    print(f"ticks per second:  {stats.ticks_per_second:.0f}")
+    print(f"game-seconds/hour: {stats.ticks_per_second / fps * 3600:.0f}")
+    print(f"game end:          {stats.game_end or 'still playing'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,11 +2,15 @@
 Hungry Sharks game view
 """
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 import sys
 import math
 import pygame
 from pygame.locals import QUIT
 from euclid3 import Vector2
+from player_input import PlayerInput
+from game_loop import interpolated_position
+from frame_profiler import DISABLED
 
 
 def angle_from_x_axis(vector):
@@ -51,6 +55,222 @@ class HungrySharksView(ABC):
         """
 
 
+class SpriteCache():
+    """
+    Caches character images scaled to size, flipped and rotated to a quantized
+    heading, so each sprite is only transformed once instead of every frame.
+
+    Attributes:
+        _images_from_size: dict of size -> (image, scale factor), as in
+            PyGameView.images_from_size
+        _angle_steps (int): number of headings a full turn is quantized into
+        _max_entries (int): maximum number of rotated sprites kept
+        _scaled: dict of size -> scaled (unrotated) image
+        _sprites: OrderedDict of (size, flip, angle step) -> rotated sprite,
+            least recently used first
+        hits (int): number of lookups served from the cache
+        misses (int): number of lookups that had to build a sprite
+    """
+    def __init__(self, images_from_size, angle_steps=64, max_entries=1024):
+        self._images_from_size = images_from_size
+        self._angle_steps = angle_steps
+        self._max_entries = max_entries
+        self._scaled = {}
+        self._sprites = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._sprites)
+
+    def scaled_image(self, size):
+        """
+        Returns the unrotated image of a character size, scaled to draw size.
+
+        Args:
+            size (int): character size
+        """
+        if size not in self._scaled:
+            img, scale_fac = self._images_from_size[size]
+            draw_height = 40 * scale_fac
+            draw_width = draw_height * img.get_rect().width / img.get_rect().height
+            self._scaled[size] = pygame.transform.scale(img,\
+                (int(draw_width), int(draw_height)))
+        return self._scaled[size]
+
+    def key(self, size, angle):
+        """
+        Returns the cache key of a character size drawn at a heading.
+
+        Args:
+            size (int): character size
+            angle (float): heading in degrees from the x axis
+        """
+        flip = angle < -90 or angle > 90
+        step = round(angle * self._angle_steps / 360) % self._angle_steps
+        return (size, flip, step)
+
+    def get(self, size, angle):
+        """
+        Returns the sprite of a character size drawn at a heading, building it
+        on a cache miss.
+
+        Args:
+            size (int): character size
+            angle (float): heading in degrees from the x axis
+        """
+        key = self.key(size, angle)
+        sprite = self._sprites.get(key)
+        if sprite is not None:
+            self.hits += 1
+            self._sprites.move_to_end(key)
+            return sprite
+
+        self.misses += 1
+        sprite = self._build(key)
+        self._sprites[key] = sprite
+        if len(self._sprites) > self._max_entries:
+            self._sprites.popitem(last=False)
+        return sprite
+
+    def _build(self, key):
+        """
+        Scales, flips and rotates the sprite for a cache key.
+        """
+        size, flip, step = key
+        img = self.scaled_image(size)
+        if flip:
+            img = pygame.transform.flip(img, False, True)
+        sprite = pygame.transform.rotate(img, step * 360 / self._angle_steps)
+        # match the display's pixel format (much faster to blit) once there is one
+        if pygame.display.get_surface() is not None:
+            sprite = sprite.convert_alpha()
+        return sprite
+
+    def warm(self, sizes=None):
+        """
+        Builds every sprite ahead of time (as far as the cache can hold).
+
+        Args:
+            sizes (iterable of ints, optional): sizes to build. Defaults to
+                every size.
+        """
+        if sizes is None:
+            sizes = self._images_from_size.keys()
+        # headings just inside either edge of a step, as well as its center, so
+        # the steps straddling +-90 degrees get both their flipped and
+        # unflipped sprites
+        half_step = 180 / self._angle_steps * 0.999
+        for size in sizes:
+            for step in range(self._angle_steps):
+                angle = step * 360 / self._angle_steps
+                if angle > 180:
+                    angle -= 360
+                for heading in (angle, angle - half_step, angle + half_step):
+                    key = self.key(size, heading)
+                    if key not in self._sprites and len(self._sprites) < self._max_entries:
+                        self._sprites[key] = self._build(key)
+
+
+    def reach(self, size):
+        """
+        Returns how far from a character's position its sprite can extend at
+        any heading: half the diagonal of the scaled image.
+
+        Args:
+            size (int): character size
+        """
+        rect = self.scaled_image(size).get_rect()
+        return math.hypot(rect.width, rect.height) / 2
+
+
+class Camera():
+    """
+    A window-sized view onto a field that may be bigger than the window. It
+    follows a point (the player), but never shows anything past the field's
+    edges.
+
+    Attributes:
+        width, height (int): size of the window the camera draws to
+        _field_x, _field_y (float): size of the field
+        x, y (int): field coordinates of the window's top left corner
+            (whole pixels, so sprites and background scroll together)
+    """
+    def __init__(self, width, height, field_x, field_y):
+        self.width = width
+        self.height = height
+        self._field_x = field_x
+        self._field_y = field_y
+        self.x = 0
+        self.y = 0
+
+    def follow(self, point):
+        """
+        Centers the camera on a point of the field, as far as the field's
+        edges allow.
+
+        Args:
+            point: the point, an (x, y) pair or Vector2
+        """
+        self.x = round(min(max(point[0] - self.width/2, 0),\
+            max(self._field_x - self.width, 0)))
+        self.y = round(min(max(point[1] - self.height/2, 0),\
+            max(self._field_y - self.height, 0)))
+
+    def bounds(self, margin=0):
+        """
+        Returns the area of the field the camera sees.
+
+        Args:
+            margin (float): how far to grow the area on every side. Defaults
+                to 0.
+
+        Returns:
+            (tuple): (x_min, y_min, x_max, y_max) in field coordinates
+        """
+        return (self.x - margin, self.y - margin,\
+                self.x + self.width + margin, self.y + self.height + margin)
+
+    def to_window(self, point):
+        """
+        Returns where a point of the field is drawn in the window.
+
+        Args:
+            point: the point, an (x, y) pair or Vector2
+        """
+        return (point[0] - self.x, point[1] - self.y)
+
+    def to_field(self, point):
+        """
+        Returns the point of the field drawn at a window position.
+
+        Args:
+            point: the window position, an (x, y) pair
+        """
+        return (point[0] + self.x, point[1] + self.y)
+
+
+class PyGameInput(PlayerInput):
+    """
+    Live player input: the player follows the mouse and boosts while the space
+    bar is held down.
+
+    Attributes:
+        camera (Camera): converts the mouse position from the window to the
+            field. None if the window shows the whole field from its top left
+            corner.
+    """
+    def __init__(self, camera=None):
+        self.camera = camera
+
+    def get_input(self, field):
+        keys = pygame.key.get_pressed()
+        target = pygame.mouse.get_pos()
+        if self.camera is not None:
+            target = self.camera.to_field(target)
+        return target, bool(keys[pygame.K_SPACE])
+
+
 class PyGameView(HungrySharksView):
     """
     A viewing class for graphics using PyGame.
@@ -61,6 +281,34 @@ class PyGameView(HungrySharksView):
         _field: stores the game field
         _window: a pygame window used to draw on
         _clock: pygame clock
+        _fps (int): frame rate cap applied by draw (0 for uncapped)
+        sprites (SpriteCache): pre-transformed character images
+        camera (Camera): the part of the field shown in the window, which
+            follows the player. Only the AI players it can see are drawn.
+        _reach: dict of size -> how far that size's sprite can extend from
+            its character's position, at any heading
+        _background: the game background in the display's pixel format,
+            tiled to one image more than the window in each direction so that
+            any camera position is a single blit of part of it
+        _background_size: (width, height) of one background image
+        _drawn_camera: the camera position of the last frame drawn
+        _scroll: (dx, dy) the camera moved by since the last frame drawn, or
+            None if it didn't move
+        _render_mode (string): "full" to redraw the whole window every frame or
+            "dirty" to only redraw the areas that changed
+        _prev_rects: the areas drawn on in the previous dirty-rect frame, or
+            None if the next frame has to redraw the whole window
+        _previous_positions, _alpha: render interpolation for the frame being
+            drawn (see draw)
+        profiler (FrameProfiler): phase timings (the whole draw, plus its
+            sprite transform, blit, progress bar and display update parts),
+            shown in an overlay toggled with F3
+        show_profiler (bool): whether the profiler overlay is drawn
+        rewind (RewindBuffer): recent ticks of the game, or None. R pauses the
+            game to scrub through them with the arrow keys and R again
+            resumes from the tick shown.
+        rewind_tick (int): the buffered tick being shown while rewinding, or
+            None while the game is playing
     """
     colors = {
         "white": (255, 255, 255),
@@ -72,13 +320,20 @@ class PyGameView(HungrySharksView):
         "magenta": (255, 0, 255)
     }
 
-    def __init__(self, field):
+    render_modes = ("full", "dirty")
+
+    def __init__(self, field, sprite_angle_steps=64, sprite_cache_size=1024,\
+            warm_sprites=False, render_mode="full", profiler=DISABLED, fps=40,\
+            rewind=None, window_size=None):
         super().__init__(field)
 
-        # Initialize a pygame window and add it as an attribute
+        # Initialize a pygame window and add it as an attribute (by default
+        # as big as the field)
         pygame.init()
-        self._fps = 40
-        self._window = pygame.display.set_mode((field.window_x, field.window_y))
+        self._fps = fps
+        if window_size is None:
+            window_size = (field.window_x, field.window_y)
+        self._window = pygame.display.set_mode(window_size)
         pygame.display.set_caption("Game: ")
         self._clock = pygame.time.Clock()
         self._window.fill((255, 255, 255))
@@ -86,6 +341,47 @@ class PyGameView(HungrySharksView):
         # font stuff for displaying text
         pygame.font.init()
         self._font = pygame.font.SysFont('Georgia', 50)
+        self._small_font = pygame.font.SysFont('Courier', 14)
+
+        # sprite cache
+        self.sprites = SpriteCache(self.images_from_size, sprite_angle_steps,\
+            sprite_cache_size)
+        if warm_sprites:
+            self.sprites.warm()
+
+        # camera
+        self.camera = Camera(window_size[0], window_size[1], field.window_x,\
+            field.window_y)
+        self.camera.follow(field.player.position)
+        self._reach = {size: self.sprites.reach(size) for size in self.images_from_size}
+        self._drawn_camera = None
+        self._scroll = None
+
+        # rendering (background converted to the display's pixel format, which
+        # makes the per-frame blits much cheaper)
+        tile = self.game_background_image.convert()
+        self._background_size = tile.get_size()
+        tile_x, tile_y = self._background_size
+        self._background = pygame.Surface((window_size[0] + tile_x,\
+            window_size[1] + tile_y)).convert()
+        for x in range(0, self._background.get_width(), tile_x):
+            for y in range(0, self._background.get_height(), tile_y):
+                self._background.blit(tile, (x, y))
+        self._render_mode = None
+        self._prev_rects = None
+        self.render_mode = render_mode
+        self._previous_positions = None
+        self._alpha = 1
+
+        # profiling overlay
+        self.profiler = profiler
+        self.show_profiler = False
+
+        # rewinding (held arrow keys keep scrubbing)
+        self.rewind = rewind
+        self.rewind_tick = None
+        if rewind is not None:
+            pygame.key.set_repeat(300, 25)
 
     scale_fac = 1
     images_from_size = {
@@ -104,6 +400,20 @@ class PyGameView(HungrySharksView):
     win_background_image = pygame.image.load("images/win_background.png")
     lose_background_image = pygame.image.load("images/lose_background.png")
 
+    @property
+    def window_x(self):
+        """
+        Returns the width of the window.
+        """
+        return self.camera.width
+
+    @property
+    def window_y(self):
+        """
+        Returns the height of the window.
+        """
+        return self.camera.height
+
     @property
     def fps(self):
         """
@@ -111,7 +421,74 @@ class PyGameView(HungrySharksView):
         """
         return self._fps
 
-    def draw_character_as_img(self, char, highlight = False):
+    @property
+    def render_mode(self):
+        """
+        Returns private _render_mode attribute.
+        """
+        return self._render_mode
+
+    @render_mode.setter
+    def render_mode(self, mode):
+        """
+        Switches between full-window and dirty-rectangle rendering.
+
+        Args:
+            mode (string): "full" or "dirty"
+        """
+        if mode not in self.render_modes:
+            raise ValueError(f"unknown render mode {mode!r}, "\
+                f"expected one of {self.render_modes}")
+        self._render_mode = mode
+        self._prev_rects = None
+
+    @property
+    def rewinding(self):
+        """
+        Returns True while the game is paused to scrub through the rewind
+        buffer.
+        """
+        return self.rewind_tick is not None
+
+    def handle_rewind_key(self, key):
+        """
+        Rewind controls: R pauses the game on its newest buffered tick (or
+        resumes it from the tick shown, forgetting the ticks after it), and
+        the left and right arrow keys restore the previous or next buffered
+        tick.
+
+        Args:
+            key (int): a pygame key code
+        """
+        if self.rewind is None:
+            return
+        if key == pygame.K_r:
+            if self.rewinding:
+                self.rewind.truncate(self.rewind_tick)
+                self.rewind_tick = None
+            elif len(self.rewind):
+                self.rewind_tick = self.rewind.last_tick
+        elif self.rewinding and key in (pygame.K_LEFT, pygame.K_RIGHT):
+            step = -1 if key == pygame.K_LEFT else 1
+            self.rewind_tick = min(max(self.rewind_tick + step,\
+                self.rewind.first_tick), self.rewind.last_tick)
+            self.rewind.restore(self.rewind_tick, self._field)
+
+    def draw_background(self, area=None):
+        """
+        Draws the part of the background the camera sees.
+
+        Args:
+            area (pygame.Rect, optional): the part of the window to draw.
+                Defaults to the whole window.
+        """
+        if area is None:
+            area = self._window.get_rect()
+        tile_x, tile_y = self._background_size
+        self._window.blit(self._background, area,\
+            area=area.move(self.camera.x % tile_x, self.camera.y % tile_y))
+
+    def draw_character_as_img(self, char, highlight = False, position = None):
         """
         Draws a character with an appropriate image on the pygame screen.
 
@@ -119,56 +496,233 @@ class PyGameView(HungrySharksView):
             char (Character): Character instance to be drawn on screen
             highlight (bool): Draws highlight on player if set to True. False
                 by default.
-        """
-        # pick correct image
-        img = self.images_from_size[char.size][0]
-        scale_fac = self.images_from_size[char.size][1]
-        draw_height = 40 * scale_fac
-        draw_width = draw_height * img.get_rect().width / img.get_rect().height
-        img = pygame.transform.scale(img, (int(draw_width), int(draw_height)))
+            position (Vector2): where in the field to draw the character.
+                Defaults to its current position.
 
-        # rotate and scale image
-        char_angle = angle_from_x_axis(char.velocity)
-        if char_angle < -90 or char_angle > 90:
-            img = pygame.transform.flip(img, False, True)
-        img = pygame.transform.rotate(img, char_angle)
+        Returns:
+            pygame.Rect: the area of the window that was drawn on
+        """
+        # pick correct image, scaled and rotated
+        with self.profiler.phase("transform"):
+            img = self.sprites.get(char.size, angle_from_x_axis(char.velocity))
         rect = img.get_rect()
+        if position is None:
+            position = char.position
+        x, y = self.camera.to_window(position)
 
         # Draw image
-        self._window.blit(img, char.position - Vector2(rect.width/2, rect.height/2))
+        with self.profiler.phase("blit"):
+            drawn = self._window.blit(img, (x - rect.width/2, y - rect.height/2))
 
         # draw highlight
         if highlight:
-            pygame.draw.circle(self._window, self.colors["magenta"], char.position,\
-                3)
+            drawn = drawn.union(pygame.draw.circle(self._window,\
+                self.colors["magenta"], (x, y), 3))
 
-    def draw(self):
-        # VERY IMPORTANT but maybe belongs in the game loop?
-        for event in pygame.event.get():
-            if event.type == QUIT:
-                pygame.quit()
-                sys.exit()
+        return drawn
 
+    def visible_characters(self):
+        """
+        Returns the AI players whose sprites' bounding boxes overlap the
+        camera's view, found with a spatial query of the field rather than by
+        checking every one.
 
-        # draw AI players
-        for aip in self._field.characters:
-            # self.draw_character_as_circle(aip, self.colors["red"])
-            self.draw_character_as_img(aip)
+        The query covers the view grown by the largest sprite's reach, and
+        its results are then trimmed with each one's own reach.
+        """
+        candidates = self._field.characters_in_rect(\
+            *self.camera.bounds(max(self._reach.values())))
+        x_min, y_min, x_max, y_max = self.camera.bounds()
+        reach = self._reach
+        visible = []
+        for aip in candidates:
+            margin = reach[aip.size]
+            position = aip.position
+            if x_min - margin < position.x < x_max + margin\
+                    and y_min - margin < position.y < y_max + margin:
+                visible.append(aip)
+        return visible
+
+    def draw_scene(self):
+        """
+        Draws every character and the growth progress bar on the window.
+
+        Returns:
+            list of pygame.Rects: the areas of the window that were drawn on
+        """
+        if self._previous_positions is None:
+            def position_of(char):
+                return char.position
+        else:
+            def position_of(char):
+                return interpolated_position(char, self._previous_positions,\
+                    self._alpha)
+
+        # draw AI players the camera can see
+        with self.profiler.phase("cull"):
+            visible = self.visible_characters()
+        drawn = [self.draw_character_as_img(aip, position=position_of(aip))
+                 for aip in visible]
 
         # draw Player 1
-        # self.draw_character_as_circle(self._field.player, self.colors["blue"], is_player=True)
-        self.draw_character_as_img(self._field.player, highlight=True)
+        drawn.append(self.draw_character_as_img(self._field.player, highlight=True,\
+            position=position_of(self._field.player)))
 
         # draw growth progress bar
         health_progress = self._field.player.growth_progress
-        pygame.draw.rect(self._window, self.colors["gray"],\
-            pygame.Rect(0, 0, 20, self.field.window_y * health_progress/100),\
-            border_top_right_radius=5, border_bottom_right_radius=5)
+        with self.profiler.phase("progress_bar"):
+            drawn.append(pygame.draw.rect(self._window, self.colors["gray"],\
+                pygame.Rect(0, 0, 20, self.window_y * health_progress/100),\
+                border_top_right_radius=5, border_bottom_right_radius=5))
+
+        # draw profiler overlay
+        if self.show_profiler and self.profiler.enabled:
+            drawn.append(self.draw_profiler_overlay())
+
+        # show where we are in the rewind buffer
+        if self.rewinding:
+            status = self._small_font.render(f"REWIND  tick {self.rewind_tick}  "\
+                f"({self.rewind.first_tick}-{self.rewind.last_tick}, R resumes)",\
+                True, self.colors["red"])
+            drawn.append(self._window.blit(status, (30, 5)))
+
+        return drawn
+
+    def draw_profiler_overlay(self):
+        """
+        Draws the profiler's rolling per-phase percentiles in the top right
+        corner of the window.
+
+        Returns:
+            pygame.Rect: the area of the window that was drawn on
+        """
+        lines = [f"{'phase':<28}{'p50':>7}{'p95':>7}{'p99':>7}"]
+        for name, stats in sorted(self.profiler.summary().items()):
+            lines.append(f"{name:<28}{stats['p50']:>7.2f}{stats['p95']:>7.2f}"\
+                f"{stats['p99']:>7.2f}")
+
+        surfaces = [self._small_font.render(line, True, self.colors["black"])\
+            for line in lines]
+        width = max(surface.get_width() for surface in surfaces) + 10
+        height = sum(surface.get_height() for surface in surfaces) + 10
+        box = pygame.Rect(self.window_x - width, 0, width, height)
+        drawn = pygame.draw.rect(self._window, self.colors["white"], box)
+        y = box.top + 5
+        for surface in surfaces:
+            self._window.blit(surface, (box.left + 5, y))
+            y += surface.get_height()
+        return drawn
+
+    def draw_full(self):
+        """
+        Draws a frame by redrawing and updating the whole window.
+        """
+        with self.profiler.phase("blit"):
+            self.draw_background()
+        self.draw_scene()
 
         # update display
-        pygame.display.update()
-        # self._window.fill(self.colors["white"])
-        self._window.blit(self.game_background_image, Vector2(0,0))
+        with self.profiler.phase("display_update"):
+            pygame.display.update()
+
+    def draw_dirty(self):
+        """
+        Draws a frame by restoring the background only under last frame's
+        sprites and updating only the areas that changed.
+
+        When the camera has moved, the window's pixels are scrolled with it
+        instead: last frame's sprite areas move along, and only they and the
+        strips of background the scroll uncovered are redrawn. The whole
+        display still has to be updated on those frames, since everything on
+        it moved.
+        """
+        if self._prev_rects is None:
+            # nothing to go on yet: start from a clean background
+            with self.profiler.phase("blit"):
+                self.draw_background()
+            self._prev_rects = self.draw_scene()
+            with self.profiler.phase("display_update"):
+                pygame.display.update()
+            return
+
+        window = self._window.get_rect()
+        prev_rects = self._prev_rects
+        exposed = []
+        if self._scroll is not None:
+            dx, dy = self._scroll
+            if abs(dx) >= window.width or abs(dy) >= window.height:
+                # nothing on screen is still on screen
+                self._prev_rects = None
+                self.draw_dirty()
+                return
+            with self.profiler.phase("blit"):
+                self._window.scroll(-dx, -dy)
+            prev_rects = [rect.move(-dx, -dy) for rect in prev_rects]
+            if dx:
+                exposed.append(pygame.Rect(window.width - dx if dx > 0 else 0, 0,\
+                    abs(dx), window.height))
+            if dy:
+                exposed.append(pygame.Rect(0, window.height - dy if dy > 0 else 0,\
+                    window.width, abs(dy)))
+
+        # erase last frame's sprites (and fill in what the scroll uncovered)
+        with self.profiler.phase("blit"):
+            for rect in prev_rects + exposed:
+                rect = rect.clip(window)
+                if rect.width and rect.height:
+                    self.draw_background(rect)
+
+        drawn = self.draw_scene()
+        with self.profiler.phase("display_update"):
+            if self._scroll is not None:
+                pygame.display.update()
+            else:
+                pygame.display.update(prev_rects + drawn)
+        self._prev_rects = drawn
+
+    def draw(self, previous_positions=None, alpha=1):
+        """
+        Draws a frame of the game.
+
+        Args:
+            previous_positions (dict, optional): character -> (x, y) before
+                the last simulation step. If given, characters are drawn
+                interpolated between there and their current position.
+            alpha (float, optional): interpolation fraction, 0 (previous
+                position) to 1 (current position). Defaults to 1.
+        """
+        self._previous_positions = previous_positions
+        self._alpha = alpha
+
+        # follow the player where it is drawn, so it doesn't jitter
+        player = self._field.player
+        if previous_positions is None:
+            self.camera.follow(player.position)
+        else:
+            self.camera.follow(interpolated_position(player, previous_positions, alpha))
+        camera = (self.camera.x, self.camera.y)
+        self._scroll = None
+        if self._drawn_camera is not None and camera != self._drawn_camera:
+            # the whole scene scrolled (see draw_dirty)
+            self._scroll = (camera[0] - self._drawn_camera[0],\
+                camera[1] - self._drawn_camera[1])
+        self._drawn_camera = camera
+
+        # VERY IMPORTANT but maybe belongs in the game loop?
+        for event in pygame.event.get():
+            if event.type == QUIT:
+                pygame.quit()
+                sys.exit()
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                self.show_profiler = not self.show_profiler
+            elif event.type == pygame.KEYDOWN:
+                self.handle_rewind_key(event.key)
+
+        with self.profiler.phase("draw"):
+            if self._render_mode == "dirty":
+                self.draw_dirty()
+            else:
+                self.draw_full()
 
         # timekeeping
         self._clock.tick(self._fps)
@@ -187,7 +741,7 @@ class PyGameView(HungrySharksView):
 
         # This creates a new surface with text already drawn onto it.
         # At the end you can just blit the text surface onto your main screen.
-        self._window.blit(textsurface,(self.field.window_x/2,self.field.window_y/2))
+        self._window.blit(textsurface,(self.window_x/2,self.window_y/2))
 
         pygame.display.update()
 
@@ -198,7 +752,7 @@ class PyGameView(HungrySharksView):
         Args:
             img (Pygame Image): the image
         """
-        img = pygame.transform.scale(img, (self._field.window_x, self._field.window_y))
+        img = pygame.transform.scale(img, (self.window_x, self.window_y))
         self._window.blit(img, Vector2(0,0))
 
         pygame.display.update()
@@ -0,0 +1,200 @@
+"""
+Indexed storage for the AI players of a HungrySharksField.
+
+Eating removes an AI player and spawns another, and choosing the new one's
+size needs the number of AI players bigger than the player. A plain list
+makes both scans of the whole population; here removal is a swap-remove
+through an index of entity ids, and the AI players are counted by size as
+they come and go, so an eat costs the same however crowded the field is.
+"""
+from collections import Counter
+from entity_pool import EntityPool
+
+
+class SizeCounts():
+    """
+    Counts of AI players by size, with a running count of those bigger than
+    a threshold size (the player's).
+
+    Attributes:
+        _counts: dict of size -> number of AI players of that size
+        _threshold (int): the size _larger counts AI players bigger than
+        _larger (int): number of AI players bigger than _threshold
+    """
+    def __init__(self, sizes=()):
+        self._counts = dict(Counter(sizes))
+        self._threshold = 0
+        self._larger = sum(count for size, count in self._counts.items()
+                           if size > self._threshold)
+
+    def add(self, size):
+        """
+        Counts an AI player of a size.
+        """
+        self._counts[size] = self._counts.get(size, 0) + 1
+        if size > self._threshold:
+            self._larger += 1
+
+    def discard(self, size):
+        """
+        Stops counting an AI player of a size.
+        """
+        self._counts[size] -= 1
+        if size > self._threshold:
+            self._larger -= 1
+
+    def count(self, size):
+        """
+        Returns the number of AI players of a size.
+        """
+        return self._counts.get(size, 0)
+
+    def count_larger(self, size):
+        """
+        Returns the number of AI players bigger than a size.
+
+        The running count follows the size one step at a time, so asking
+        with the player's size after Player.grow costs one lookup per size
+        it grew by rather than a pass over every AI player.
+
+        Args:
+            size (int): the size to compare with (the player's)
+        """
+        while self._threshold < size:
+            self._threshold += 1
+            self._larger -= self._counts.get(self._threshold, 0)
+        while self._threshold > size:
+            self._larger += self._counts.get(self._threshold, 0)
+            self._threshold -= 1
+        return self._larger
+
+
+class IndexedPopulation():
+    """
+    A list-like collection of AIPlayer objects with constant-time removal
+    and per-size counts.
+
+    The AI players live in an EntityPool, which gives them their entity ids
+    and gets each one back, for reuse, once it has been removed. Removal is a
+    swap-remove, so the order of the AI players is not preserved (as with
+    AIPopulation).
+
+    Attributes:
+        _characters (list): the AI players
+        _positions: dict of entity id -> index in _characters
+        pool (EntityPool): the pool the AI players live in
+        size_counts (SizeCounts): the AI players counted by size
+    """
+    def __init__(self, characters=(), pool=None):
+        self._characters = []
+        self._positions = {}
+        self.pool = EntityPool() if pool is None else pool
+        self.size_counts = SizeCounts()
+        for aip in characters:
+            self.append(aip)
+
+    def append(self, aip):
+        """
+        Adds an AI player. One that isn't live in the pool yet (i.e. wasn't
+        acquired from it) is adopted into it, which gives it an entity id.
+
+        Args:
+            aip (AIPlayer): the AI player
+
+        Returns:
+            AIPlayer: the AI player
+        """
+        if self.pool.get(aip.entity_id) is not aip:
+            self.pool.adopt(aip)
+        self._positions[aip.entity_id] = len(self._characters)
+        self._characters.append(aip)
+        self.size_counts.add(aip.size)
+        return aip
+
+    def remove(self, aip):
+        """
+        Removes an AI player by moving the last one into its place.
+
+        Args:
+            aip (AIPlayer): the AI player
+
+        Raises:
+            ValueError: if the AI player is not in the population
+        """
+        if aip not in self:
+            raise ValueError("AI player is not in the population")
+        self.remove_id(aip.entity_id)
+
+    def remove_id(self, entity_id):
+        """
+        Removes the AI player with an entity id by moving the last one into
+        its place, and releases it to the pool (so the id goes stale and the
+        object may come back as another AI player).
+
+        Args:
+            entity_id (int): the AI player's entity id
+
+        Returns:
+            AIPlayer: the removed AI player
+
+        Raises:
+            KeyError: if no AI player in the population has the id
+        """
+        index = self._positions.pop(entity_id)
+        characters = self._characters
+        aip = characters[index]
+        last = characters.pop()
+        if last is not aip:
+            characters[index] = last
+            self._positions[last.entity_id] = index
+        self.size_counts.discard(aip.size)
+        self.pool.release(aip)
+        return aip
+
+    def get(self, entity_id):
+        """
+        Returns the AI player with an entity id, or None if no AI player in
+        the population has it.
+        """
+        index = self._positions.get(entity_id)
+        return None if index is None else self._characters[index]
+
+    def indices(self, characters):
+        """
+        Returns where some AI players are in the population, in order,
+        skipping any that are not in it.
+
+        Args:
+            characters: AIPlayers
+
+        Returns:
+            list: their indices, ascending
+        """
+        positions = self._positions
+        found = []
+        for aip in characters:
+            index = positions.get(aip.entity_id)
+            if index is not None and self._characters[index] is aip:
+                found.append(index)
+        found.sort()
+        return found
+
+    def count_larger(self, size):
+        """
+        Returns the number of AI players bigger than a size (see
+        SizeCounts.count_larger).
+        """
+        return self.size_counts.count_larger(size)
+
+    def __len__(self):
+        return len(self._characters)
+
+    def __iter__(self):
+        return iter(self._characters)
+
+    def __getitem__(self, index):
+        return self._characters[index]
+
+    def __contains__(self, aip):
+        index = self._positions.get(getattr(aip, "entity_id", None))
+        return index is not None and self._characters[index] is aip
@@ -0,0 +1,150 @@
+"""
+Kinetic scheduling of AI behavior checks.
+
+A wandering AI player's behavior can only change once it reaches the wall
+zone or the player comes within its fov (or collision range). Neither can
+happen sooner than its distance to them divided by the fastest they can
+close it (the AI player's speed, plus the player's boosted top speed), so
+each wandering AI player gets an event at that time in a priority queue and
+is not looked at again until the event fires. The bound holds whichever way
+the AI player turns, so a fish that wanders in circles only fires later
+than necessary, never too late.
+
+AI players that are already interacting (in the wall zone, within reach of
+the player or doing anything but wandering) are checked every tick.
+"""
+import heapq
+import itertools
+from behavior_kernels import BOUNDARY_MARGIN
+from hungry_sharks_field import COLLISION_RADIUS, max_player_speed
+
+
+class KineticEventQueue():
+    """
+    Tracks when each AI player of a HungrySharksField next needs its behavior
+    checked.
+
+    Attributes:
+        _min_sleep (float): AI players whose next possible change is sooner
+            than this (game seconds) are checked every tick instead
+        _player_speed (float): the fastest the player can move
+        _heap: (time, sequence number, AI player) events; an event is stale
+            once its AI player has been rescheduled or removed
+        _events: dict of AI player -> sequence number of its live event
+        _active: dict of the AI players checked every tick (an insertion
+            ordered set)
+        _sequence: counter that orders events with equal times
+        checked (int): AI players checked on the last tick
+    """
+    def __init__(self, characters=(), min_sleep=0.05):
+        self._min_sleep = min_sleep
+        self._player_speed = max_player_speed()
+        self._heap = []
+        self._events = {}
+        self._active = {}
+        self._sequence = itertools.count()
+        self.checked = 0
+        self.reset(characters)
+
+    def __len__(self):
+        """
+        Returns the number of AI players waiting for an event.
+        """
+        return len(self._events)
+
+    @property
+    def active(self):
+        """
+        Returns the AI players checked every tick.
+        """
+        return list(self._active)
+
+    def reset(self, characters):
+        """
+        Forgets every event and checks all of some AI players on the next tick
+        (e.g. after a field has been restored or shifted).
+
+        Args:
+            characters: the field's AI players
+        """
+        self._heap = []
+        self._events = {}
+        self._active = dict.fromkeys(characters)
+
+    def add(self, aip):
+        """
+        Starts tracking a new AI player (checked on the next tick).
+        """
+        self._active[aip] = None
+
+    def discard(self, aip):
+        """
+        Stops tracking an AI player. Its event, if any, goes stale.
+        """
+        self._active.pop(aip, None)
+        self._events.pop(aip, None)
+
+    def next_event_time(self):
+        """
+        Returns the time of the earliest live event, or None if there is
+        none.
+        """
+        while self._heap:
+            event_time, sequence, aip = self._heap[0]
+            if self._events.get(aip) == sequence:
+                return event_time
+            heapq.heappop(self._heap)
+        return None
+
+    def due(self, now):
+        """
+        Returns the AI players whose behavior needs checking now: the active
+        ones, and those whose events have come due (which stop waiting).
+
+        Args:
+            now (float): the current game time
+        """
+        due = dict(self._active)
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            _, sequence, aip = heapq.heappop(heap)
+            if self._events.get(aip) == sequence:
+                del self._events[aip]
+                due[aip] = None
+        self.checked = len(due)
+        return list(due)
+
+    def reschedule(self, field, aip, now):
+        """
+        Decides, after its behavior has been checked, when an AI player next
+        needs checking: every tick while it is interacting, or at the
+        earliest time it could reach the wall zone, the player's fov or the
+        collision radius.
+
+        Args:
+            field (HungrySharksField): the field
+            aip (AIPlayer): the AI player
+            now (float): the current game time
+        """
+        if aip.behavior_state != "wander":
+            self._active[aip] = None
+            return
+
+        speed = aip.max_speed()
+        to_wall_zone = (min(field.get_dist_to_walls(aip)) - BOUNDARY_MARGIN) / speed
+        player = field.player.position
+        to_player = ((aip.position.x - player.x)**2\
+            + (aip.position.y - player.y)**2)**0.5
+        closing_speed = speed + self._player_speed
+        to_fov = (to_player - aip.fov()) / closing_speed
+        to_collision = (to_player - COLLISION_RADIUS) / closing_speed
+        wait = min(to_wall_zone, to_fov, to_collision)
+
+        if wait < self._min_sleep:
+            self._active[aip] = None
+            return
+        self._active.pop(aip, None)
+        sequence = next(self._sequence)
+        self._events[aip] = sequence
+        # a hair early, so rounding can't make a check late
+        heapq.heappush(self._heap, (now + wait * 0.99, sequence, aip))
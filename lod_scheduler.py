@@ -0,0 +1,133 @@
+"""
+Level-of-detail scheduling of AI player updates.
+
+AI players far from the player (beyond a multiple of their fov) and away from
+the walls can't see the player or reach a wall for a while, so their behavior
+can only be "wander". Instead of moving them every tick, the scheduler moves
+them a few at a time, round robin, each one by all the game time since it
+last moved. AI players near the player or a wall are still moved and
+re-evaluated every tick.
+
+Far updates also have a wall-clock budget per tick: once it is spent, the
+rest wait for a later tick (and move further when they get their turn), so a
+crowded field slows the far fish down rather than the frame rate.
+"""
+import math
+import time
+from character import AIPlayer
+from behavior_kernels import BOUNDARY_MARGIN, SPEED_BY_SIZE
+
+
+class LODScheduler():
+    """
+    Decides which AI players a HungrySharksField updates each tick, and with
+    what timestep.
+
+    Attributes:
+        _fov_multiple (float): AI players further than this many of their
+            fovs from the player are far
+        _interval (int): ticks between a far AI player's updates, when the
+            budget allows
+        _max_ticks (int): most ticks of game time a far AI player is moved by
+            in one update (time beyond that is dropped)
+        _budget (float): wall-clock seconds per tick that far updates may
+            take
+        _last_update: dict of AI player entity id -> game time it was last
+            moved (by id, so an AIPlayer recycled by the entity pool starts
+            afresh)
+        _cursor (int): where in the field's characters the round robin
+            carries on
+        near (list): the AI players updated at full detail this tick
+        far_updates (int): far AI players moved this tick
+        over_budget (int): number of ticks whose far updates ran out of time
+    """
+    def __init__(self, fov_multiple=2, interval=4, max_ticks=8, budget=0.002):
+        self._fov_multiple = fov_multiple
+        self._interval = interval
+        self._max_ticks = max_ticks
+        self._budget = budget
+        self._last_update = {}
+        self._cursor = 0
+        self.near = []
+        self.far_updates = 0
+        self.over_budget = 0
+
+    def _near_characters(self, field, timestep):
+        """
+        Returns the AI players that need updating every tick: those within
+        fov_multiple of their fov of the player, or close enough to a wall to
+        reach its avoidance zone within one far update. Found with spatial
+        queries, not by checking every AI player.
+        """
+        player = field.player
+        px, py = player.position.x, player.position.y
+        near = {}
+        for aip in field.characters_near(player.position,\
+                self._fov_multiple * AIPlayer.max_fov()):
+            reach = self._fov_multiple * aip.fov()
+            if (aip.position.x - px)**2 + (aip.position.y - py)**2 < reach * reach:
+                near[aip] = None
+
+        if not field.walls:
+            return list(near)
+
+        # wall strips (reaching as far outside the field, for AI players that
+        # have bounced slightly past a wall)
+        strip = BOUNDARY_MARGIN + SPEED_BY_SIZE.max() * timestep * self._max_ticks
+        width, height = field.window_x, field.window_y
+        for rect in ((-strip, -strip, strip, height + strip),
+                     (width - strip, -strip, width + strip, height + strip),
+                     (-strip, -strip, width + strip, strip),
+                     (-strip, height - strip, width + strip, height + strip)):
+            for aip in field.characters_in_rect(*rect):
+                near[aip] = None
+        return list(near)
+
+    def schedule(self, field, timestep):
+        """
+        Yields the AI players to move this tick, each with the timestep to
+        move it by: first every near AI player, then far ones in round-robin
+        order until this tick's share of them is done or the budget is spent.
+        Far AI players are set to wander before they are yielded.
+
+        Args:
+            field (HungrySharksField): the field
+            timestep (float): length of a tick
+
+        Yields:
+            (tuple): (AI player, timestep)
+        """
+        now = field.sim_clock.time
+        last_update = self._last_update
+        self.near = self._near_characters(field, timestep)
+        for aip in self.near:
+            moved_by = now - last_update.get(aip.entity_id, now - timestep)
+            last_update[aip.entity_id] = now
+            yield aip, min(moved_by, timestep * self._max_ticks)
+
+        characters = field.characters
+        near = set(self.near)
+        self.far_updates = 0
+        start = time.perf_counter()
+        for _ in range(math.ceil(len(characters) / self._interval)):
+            if not characters:
+                break
+            if time.perf_counter() - start > self._budget:
+                self.over_budget += 1
+                break
+            self._cursor %= len(characters)
+            aip = characters[self._cursor]
+            self._cursor += 1
+            if aip in near:
+                continue
+            moved_by = now - last_update.get(aip.entity_id, now - timestep)
+            last_update[aip.entity_id] = now
+            aip.behavior_state = "wander"
+            self.far_updates += 1
+            yield aip, min(moved_by, timestep * self._max_ticks)
+
+        # forget AI players that have left the field
+        if len(last_update) > 2 * len(characters) + 64:
+            self._last_update = {aip.entity_id: last_update[aip.entity_id]
+                                 for aip in characters
+                                 if aip.entity_id in last_update}
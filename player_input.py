@@ -0,0 +1,285 @@
+"""
+Hungry Sharks player input sources.
+
+A player input source tells the PlayerVelocityController where the player wants
+to go and whether they are boosting. Keeping input behind this interface lets
+the game logic run without pygame (scripted, recorded or bot-driven players).
+"""
+from abc import ABC, abstractmethod
+import numpy as np
+from character_arrays import AIPopulation
+
+# input recording files: one header, then one frame per tick
+RECORDING_MAGIC = b"HSI1"
+RECORDING_VERSION = 3
+RECORDING_HEADER = np.dtype([
+    ("magic", "S4"),
+    ("version", "<u2"),
+    # simulation ticks per second the recording was made at
+    ("fps", "<u2"),
+    # the field's seed (only meaningful if has_seed is 1)
+    ("has_seed", "u1"),
+    ("seed", "<i8"),
+    # AI players the field was made with
+    ("num_characters", "<u4"),
+    # size of the field
+    ("world", "<u4", (2,)),
+    # 1 if the field stored its AI players in arrays (HungrySharksArrayField),
+    # which plays out differently from the same seed
+    ("array_backend", "u1"),
+])
+RECORDING_FRAME = np.dtype([
+    ("x", "<f8"),
+    ("y", "<f8"),
+    ("boost", "u1"),
+])
+
+
+class PlayerInput(ABC):
+    """
+    Abstract base class for any class which supplies the player's movement
+    input.
+    """
+    @abstractmethod
+    def get_input(self, field):
+        """
+        Returns the player's input for the current tick.
+
+        Args:
+            field (HungrySharksField): the field the player is in.
+
+        Returns:
+            (tuple): (target point as an (x, y) pair, boost as a bool)
+        """
+
+
+class ScriptedInput(PlayerInput):
+    """
+    Player input generated by a user-supplied script.
+
+    Attributes:
+        _script: a callable taking (field, tick) and returning a
+            (target point, boost) pair.
+        _tick: number of inputs produced so far.
+    """
+    def __init__(self, script):
+        self._script = script
+        self._tick = 0
+
+    def get_input(self, field):
+        target, boost = self._script(field, self._tick)
+        self._tick += 1
+        return target, boost
+
+
+class RecordedInput(PlayerInput):
+    """
+    Player input played back from a sequence of recorded frames.
+
+    Attributes:
+        _frames: a sequence of (x, y, boost) tuples, one per tick.
+        _loop (bool): start over when the frames run out. If False, the last
+            frame is held.
+        _tick: index of the next frame.
+    """
+    def __init__(self, frames, loop=False):
+        if not frames:
+            raise ValueError("RecordedInput needs at least one frame")
+        self._frames = frames
+        self._loop = loop
+        self._tick = 0
+
+    def get_input(self, field):
+        if self._tick >= len(self._frames):
+            index = self._tick % len(self._frames) if self._loop else -1
+        else:
+            index = self._tick
+        x, y, boost = self._frames[index]
+        self._tick += 1
+        return (x, y), bool(boost)
+
+
+class InputRecorder(PlayerInput):
+    """
+    Passes another input source through unchanged while writing every tick's
+    input to a recording file, which ReplayInput can play back.
+
+    Attributes:
+        _player_input (PlayerInput): the input source being recorded
+        _file: the open recording file
+        _frame: reusable RECORDING_FRAME record the input is packed into
+        ticks (int): number of ticks recorded so far
+    """
+    def __init__(self, player_input, path, seed=None, fps=40, num_characters=10,\
+            world=(1200, 600), array_backend=False):
+        self._player_input = player_input
+        self._file = open(path, "wb")
+        header = np.zeros((), dtype=RECORDING_HEADER)
+        header["magic"] = RECORDING_MAGIC
+        header["version"] = RECORDING_VERSION
+        header["fps"] = fps
+        header["has_seed"] = seed is not None
+        header["seed"] = 0 if seed is None else seed
+        header["num_characters"] = num_characters
+        header["world"] = world
+        header["array_backend"] = array_backend
+        self._file.write(header.tobytes())
+        self._frame = np.zeros((), dtype=RECORDING_FRAME)
+        self.ticks = 0
+
+    def get_input(self, field):
+        target, boost = self._player_input.get_input(field)
+        self._frame["x"], self._frame["y"] = target[0], target[1]
+        self._frame["boost"] = boost
+        self._file.write(self._frame.tobytes())
+        self.ticks += 1
+        return target, boost
+
+    def truncate(self, ticks):
+        """
+        Forgets every recorded tick after the first few (e.g. when the game
+        is rewound and resumed).
+
+        Args:
+            ticks (int): number of ticks to keep
+        """
+        if ticks < self.ticks:
+            self._file.truncate(RECORDING_HEADER.itemsize\
+                + ticks * RECORDING_FRAME.itemsize)
+            self._file.seek(0, 2)
+            self.ticks = ticks
+
+    def close(self):
+        """
+        Finishes the recording file.
+        """
+        self._file.close()
+
+
+def read_recording(path):
+    """
+    Reads an input recording file.
+
+    Args:
+        path (string): the recording file
+
+    Returns:
+        (tuple): (seed or None, fps, number of AI players, (width, height) of
+        the field, whether the field stored its AI players in arrays, list of
+        (x, y, boost) frames)
+
+    Raises:
+        ValueError: if the file is not an input recording this version can
+            read
+    """
+    data = np.fromfile(path, dtype=np.uint8)
+    header = data[:RECORDING_HEADER.itemsize].view(RECORDING_HEADER)
+    if len(header) != 1 or header[0]["magic"] != RECORDING_MAGIC\
+            or header[0]["version"] != RECORDING_VERSION:
+        raise ValueError(f"{path} is not a version {RECORDING_VERSION} input recording")
+    header = header[0]
+    frames = data[RECORDING_HEADER.itemsize:].view(RECORDING_FRAME)
+    seed = int(header["seed"]) if header["has_seed"] else None
+    return seed, int(header["fps"]), int(header["num_characters"]),\
+        tuple(header["world"].tolist()), bool(header["array_backend"]),\
+        [(x, y, bool(boost)) for x, y, boost in frames.tolist()]
+
+
+class ReplayInput(RecordedInput):
+    """
+    Player input played back from an InputRecorder file. Replaying on a field
+    made with the recording's seed, at the recording's fps, repeats the
+    recorded game exactly.
+
+    Attributes:
+        seed: the seed of the recorded game's field (None if unknown)
+        fps (int): the simulation ticks per second of the recording
+        num_characters (int): the number of AI players the field was made
+            with
+        world: (width, height) of the recorded game's field
+        array_backend (bool): whether the recorded game's field stored its AI
+            players in arrays (a HungrySharksArrayField)
+    """
+    def __init__(self, path, loop=False):
+        self.seed, self.fps, self.num_characters, self.world, self.array_backend,\
+            frames = read_recording(path)
+        super().__init__(frames, loop)
+
+    def __len__(self):
+        return len(self._frames)
+
+
+class ChaseBotInput(PlayerInput):
+    """
+    A simple bot: flees the closest threatening AI player if one is near,
+    otherwise chases the closest AI player it can eat.
+
+    Attributes:
+        _danger_radius (float): distance at which a bigger AI player is
+            considered a threat.
+        _boost_when_fleeing (bool): boost while running away.
+    """
+    def __init__(self, danger_radius=150, boost_when_fleeing=True):
+        self._danger_radius = danger_radius
+        self._boost_when_fleeing = boost_when_fleeing
+
+    @staticmethod
+    def _closest(field):
+        """
+        Finds the closest smaller (prey) and bigger (threat) AI players.
+
+        Args:
+            field (HungrySharksField): the field the player is in.
+
+        Returns:
+            (tuple): (prey position, squared prey distance, threat position,
+            squared threat distance). A missing prey or threat has position
+            None and distance inf.
+        """
+        player = field.player
+        px, py = player.position.x, player.position.y
+
+        if isinstance(field.characters, AIPopulation):
+            # array-backed field: masks over the whole population at once
+            population = field.characters
+            positions = population.positions
+            sizes = population.sizes
+            displacement = positions - (px, py)
+            dists = np.einsum("ij,ij->i", displacement, displacement)
+            closest = []
+            for mask in (sizes < player.size, sizes > player.size):
+                if not mask.any():
+                    closest += [None, float("inf")]
+                    continue
+                candidates = np.flatnonzero(mask)
+                index = candidates[np.argmin(dists[candidates])]
+                closest += [tuple(positions[index].tolist()), float(dists[index])]
+            return tuple(closest)
+
+        closest_prey, prey_dist = None, float("inf")
+        closest_threat, threat_dist = None, float("inf")
+        for aip in field.characters:
+            dist = (aip.position.x - px)**2 + (aip.position.y - py)**2
+            if aip.size < player.size and dist < prey_dist:
+                closest_prey, prey_dist = aip.position, dist
+            elif aip.size > player.size and dist < threat_dist:
+                closest_threat, threat_dist = aip.position, dist
+        prey = None if closest_prey is None else (closest_prey.x, closest_prey.y)
+        threat = None if closest_threat is None else (closest_threat.x, closest_threat.y)
+        return prey, prey_dist, threat, threat_dist
+
+    def get_input(self, field):
+        px, py = field.player.position.x, field.player.position.y
+        prey, _, threat, threat_dist = self._closest(field)
+
+        # run directly away from a nearby threat
+        if threat is not None and threat_dist < self._danger_radius**2:
+            # (clamped to the field, like a mouse would be to the window)
+            target = (min(max(2*px - threat[0], 0), field.window_x),
+                      min(max(2*py - threat[1], 0), field.window_y))
+            return target, self._boost_when_fleeing
+
+        if prey is not None:
+            return prey, False
+
+        return (field.window_x/2, field.window_y/2), False
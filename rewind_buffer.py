@@ -0,0 +1,274 @@
+"""
+Bounded in-memory history of a live game, for scrubbing backwards through
+the last few seconds.
+
+Every tick is recorded as a delta against the tick before it: the bytes of
+the field snapshot header (see field_snapshot) that changed, plus only the AI
+player records that changed. A list field marks the AI players the game
+changes as it goes (see HungrySharksField.changed), so only those are read;
+an array field's records are copied and compared row by row in a few array
+operations. Either way spawns and removals show up as new or changed rows and
+a changed count. Every keyframe_interval ticks a full snapshot is stored
+instead, and the oldest keyframe (with the deltas that depend on it) is
+dropped whenever the buffer goes over its tick or memory limit.
+"""
+from collections import deque, namedtuple
+import numpy as np
+from character_arrays import AIPopulation
+from field_snapshot import HEADER, AI_RECORD, ai_records, take_header,\
+    take_snapshot, restore_snapshot
+
+# one tick: the snapshot header (a HEADER record, or for a delta the
+# HEADER_CHANGEs against the previous tick's), the number of AI players and
+# the records of the rows that differ from the previous tick (all rows for a
+# keyframe)
+Frame = namedtuple("Frame", ["header", "count", "indices", "rows"])
+
+# one changed byte of a header
+HEADER_CHANGE = np.dtype([
+    ("offset", "<u2"),
+    ("value", "u1"),
+])
+
+
+def _frame_bytes(frame):
+    """
+    Returns the memory a frame's arrays take up.
+    """
+    return frame.header.nbytes + frame.indices.nbytes + frame.rows.nbytes
+
+
+def _header_bytes(header):
+    """
+    Returns a writable view of a HEADER record's bytes.
+    """
+    return header.reshape(1).view(np.uint8)
+
+
+def _header_changes(previous, current):
+    """
+    Returns how a header differs from the previous tick's: the bytes that
+    changed (usually the clock, the player and the random number generator's
+    position, not its whole state), or the whole header if that is smaller.
+
+    Args:
+        previous, current: HEADER records
+    """
+    old, new = _header_bytes(previous), _header_bytes(current)
+    offsets = np.flatnonzero(old != new)
+    if len(offsets) * HEADER_CHANGE.itemsize >= HEADER.itemsize:
+        return current
+    changes = np.empty(len(offsets), dtype=HEADER_CHANGE)
+    changes["offset"] = offsets
+    changes["value"] = new[offsets]
+    return changes
+
+
+def _changed_rows(previous, current):
+    """
+    Returns the indices of AI player records that differ between two ticks,
+    including rows that only exist in the current one.
+
+    Args:
+        previous, current (array): AI_RECORD arrays
+    """
+    common = min(len(previous), len(current))
+    old = previous[:common].view(np.uint8).reshape(common, AI_RECORD.itemsize)
+    new = current[:common].view(np.uint8).reshape(common, AI_RECORD.itemsize)
+    changed = np.flatnonzero((old != new).any(axis=1))
+    return np.concatenate([changed, np.arange(common, len(current))])
+
+
+class RewindBuffer():
+    """
+    Records ticks of a field and restores any of them.
+
+    Attributes:
+        _max_ticks (int): most ticks kept
+        _max_bytes (int): most memory the recorded frames may take up
+        _keyframe_interval (int): ticks between full snapshots
+        _segments: deque of lists of frames, each starting with a keyframe
+        _first_tick (int): tick number of the oldest recorded frame
+        _num_ticks (int): number of recorded frames
+        _last_header: the header of the newest recorded tick (what the next
+            delta is taken against)
+        _last_records: an array field's AI records of the newest recorded
+            tick (what the next delta is taken against)
+        _resumed (bool): whether ticks have been truncated since the last
+            recording, so the next one has to be a keyframe
+        nbytes (int): memory the recorded frames take up
+    """
+    def __init__(self, max_ticks=40*30, max_bytes=64 * 2**20, keyframe_interval=40):
+        self._max_ticks = max_ticks
+        self._max_bytes = max_bytes
+        self._keyframe_interval = keyframe_interval
+        self._segments = deque()
+        self._first_tick = 0
+        self._num_ticks = 0
+        self._last_header = None
+        self._last_records = None
+        self._resumed = False
+        self.nbytes = 0
+
+    def __len__(self):
+        return self._num_ticks
+
+    @property
+    def first_tick(self):
+        """
+        Returns the tick number of the oldest recorded tick.
+        """
+        return self._first_tick
+
+    @property
+    def last_tick(self):
+        """
+        Returns the tick number of the newest recorded tick (one before the
+        first tick if nothing is recorded).
+        """
+        return self._first_tick + self._num_ticks - 1
+
+    def record(self, field):
+        """
+        Records the field's current state as the next tick.
+
+        A list field starts marking the AI players it changes (see
+        HungrySharksField.changed) from the first keyframe on; only the
+        game's own updates are marked, so AI players changed by anything
+        else are picked up at the next keyframe.
+
+        Args:
+            field (HungrySharksField): the field
+
+        Returns:
+            int: the tick number it was recorded as
+        """
+        segment = self._segments[-1] if self._segments else None
+        if segment is None or len(segment) >= self._keyframe_interval\
+                or self._resumed:
+            header, records = take_snapshot(field)
+            frame = Frame(header, len(records), np.zeros(0, dtype=np.int64), records)
+            self._segments.append([frame])
+            self._resumed = False
+            if isinstance(field.characters, AIPopulation):
+                self._last_records = records
+            else:
+                field.changed = set()
+        else:
+            header = take_header(field)
+            count, indices, rows = self._changed_records(field)
+            frame = Frame(_header_changes(self._last_header, header), count,\
+                indices, rows)
+            segment.append(frame)
+        self._last_header = header
+        self._num_ticks += 1
+        self.nbytes += _frame_bytes(frame)
+
+        # drop whole segments: their deltas are useless without the keyframe
+        while len(self._segments) > 1 and (self._num_ticks > self._max_ticks\
+                or self.nbytes > self._max_bytes):
+            dropped = self._segments.popleft()
+            self._first_tick += len(dropped)
+            self._num_ticks -= len(dropped)
+            self.nbytes -= sum(_frame_bytes(old) for old in dropped)
+        return self.last_tick
+
+    def _changed_records(self, field):
+        """
+        Returns the AI player records that changed since the last recorded
+        tick.
+
+        Returns:
+            (tuple): (number of AI players, indices of the changed rows,
+            their records)
+        """
+        characters = field.characters
+        if isinstance(characters, AIPopulation):
+            records = take_snapshot(field)[1]
+            indices = _changed_rows(self._last_records, records)
+            self._last_records = records
+            return len(records), indices, records[indices]
+
+        indices = characters.indices(field.changed)
+        field.changed.clear()
+        if len(indices) == len(characters):
+            # everyone changed (e.g. every AI player moved)
+            return len(characters), np.arange(len(characters)),\
+                ai_records(characters)
+        return len(characters), np.array(indices, dtype=np.int64),\
+            ai_records([characters[index] for index in indices])
+
+    def _locate(self, tick):
+        """
+        Returns the segment holding a tick and the tick's position in it.
+
+        Raises:
+            IndexError: if the tick isn't buffered
+        """
+        if not self._first_tick <= tick <= self.last_tick:
+            raise IndexError(f"tick {tick} is not buffered "\
+                f"({self._first_tick}-{self.last_tick} are)")
+        offset = tick - self._first_tick
+        for segment in self._segments:
+            if offset < len(segment):
+                return segment, offset
+            offset -= len(segment)
+        raise IndexError(f"tick {tick} is not buffered")
+
+    def state_at(self, tick):
+        """
+        Rebuilds a buffered tick's state from its keyframe and deltas.
+
+        Args:
+            tick (int): the tick number
+
+        Returns:
+            (tuple): (header, records) as from field_snapshot.take_snapshot
+        """
+        segment, offset = self._locate(tick)
+        header = segment[0].header.copy()
+        records = segment[0].rows.copy()
+        for frame in segment[1:offset + 1]:
+            if frame.header.dtype == HEADER:
+                header = frame.header.copy()
+            else:
+                _header_bytes(header)[frame.header["offset"]] = frame.header["value"]
+            if frame.count != len(records):
+                resized = np.empty(frame.count, dtype=AI_RECORD)
+                kept = min(frame.count, len(records))
+                resized[:kept] = records[:kept]
+                records = resized
+            records[frame.indices] = frame.rows
+        return header, records
+
+    def restore(self, tick, field):
+        """
+        Puts a field back into a buffered tick's state.
+
+        Args:
+            tick (int): the tick number
+            field (HungrySharksField): the field (the one that was recorded)
+
+        Returns:
+            HungrySharksField: the field
+        """
+        header, records = self.state_at(tick)
+        return restore_snapshot(header, records, field)
+
+    def truncate(self, tick):
+        """
+        Forgets every tick after one, so recording carries on from it (e.g.
+        when a game resumes from a rewound tick). The next recording is a
+        keyframe, as the field may since have been restored to any tick.
+
+        Args:
+            tick (int): the last tick to keep
+        """
+        while self._num_ticks and self.last_tick > tick:
+            segment = self._segments[-1]
+            frame = segment.pop()
+            self.nbytes -= _frame_bytes(frame)
+            self._num_ticks -= 1
+            if not segment:
+                self._segments.pop()
+        self._resumed = True
@@ -0,0 +1,74 @@
+"""
+Game-time clock owned by a Hungry Sharks field.
+"""
+
+# time-warp settings: game seconds per real second, or None for unthrottled
+WARPS = (1, 10, 100, None)
+
+
+class SimulationClock():
+    """
+    Keeps simulated game time. It only moves when the simulation steps, so game
+    time is independent of how fast the simulation is actually run.
+
+    Attributes:
+        _time (float): game seconds simulated so far
+        _warp: game seconds per real second the game loop should aim for, or
+            None to run unthrottled (as fast as possible)
+    """
+    def __init__(self, warp=1):
+        self._time = 0.0
+        self._warp = None
+        self.warp = warp
+
+    @property
+    def time(self):
+        """
+        Returns private attribute _time
+        """
+        return self._time
+
+    @property
+    def warp(self):
+        """
+        Returns private attribute _warp
+        """
+        return self._warp
+
+    @warp.setter
+    def warp(self, warp):
+        """
+        Sets the time warp.
+
+        Args:
+            warp: a positive number of game seconds per real second, or None
+                for unthrottled.
+        """
+        if warp is not None and warp <= 0:
+            raise ValueError(f"time warp must be positive or None, not {warp}")
+        self._warp = warp
+
+    @property
+    def unthrottled(self):
+        """
+        Returns True if the simulation should run as fast as possible.
+        """
+        return self._warp is None
+
+    def advance(self, timestep):
+        """
+        Moves game time forward by one simulation step.
+
+        Args:
+            timestep (float): length of the step in game seconds
+        """
+        self._time += timestep
+
+    def reset(self, time=0.0):
+        """
+        Sets game time, e.g. when restoring a saved game.
+
+        Args:
+            time (float): game seconds. Defaults to 0.
+        """
+        self._time = time
@@ -0,0 +1,141 @@
+"""
+Uniform-grid spatial index for Hungry Sharks characters.
+"""
+import math
+
+
+class SpatialHashGrid():
+    """
+    Buckets characters into square cells so that "who is within r of point p"
+    can be answered by looking only at the cells overlapping the query circle.
+
+    Items must have a position attribute (a Vector2). The grid only remembers
+    which cell each item is in, so call update() whenever an item moves.
+
+    Attributes:
+        _cell_size (float): side length of a grid cell
+        _cells: dict of cell key -> dict of the items in that cell (the inner
+            dict is used as an insertion-ordered set)
+        _item_cells: dict of item -> the key of the cell it is in
+    """
+    def __init__(self, cell_size=30):
+        self._cell_size = cell_size
+        self._cells = {}
+        self._item_cells = {}
+
+    @property
+    def cell_size(self):
+        """
+        Returns private attribute _cell_size
+        """
+        return self._cell_size
+
+    def cell_key(self, x, y):
+        """
+        Returns the key of the cell containing the point (x, y).
+        """
+        return (math.floor(x / self._cell_size), math.floor(y / self._cell_size))
+
+    def insert(self, item):
+        """
+        Adds an item to the grid at its current position.
+        """
+        key = self.cell_key(item.position.x, item.position.y)
+        self._item_cells[item] = key
+        self._cells.setdefault(key, {})[item] = None
+
+    def remove(self, item):
+        """
+        Removes an item from the grid.
+        """
+        key = self._item_cells.pop(item)
+        cell = self._cells[key]
+        del cell[item]
+        if not cell:
+            del self._cells[key]
+
+    def update(self, item):
+        """
+        Moves an item to the cell of its current position. Does nothing if it
+        is still in the same cell.
+        """
+        key = self.cell_key(item.position.x, item.position.y)
+        old_key = self._item_cells[item]
+        if key == old_key:
+            return
+        old_cell = self._cells[old_key]
+        del old_cell[item]
+        if not old_cell:
+            del self._cells[old_key]
+        self._item_cells[item] = key
+        self._cells.setdefault(key, {})[item] = None
+
+    def query_radius(self, point, radius):
+        """
+        Returns the items within a distance of a point.
+
+        Args:
+            point: the center of the query, an (x, y) pair or Vector2
+            radius (float): the query radius
+
+        Returns:
+            (list): the items strictly closer than radius to point.
+        """
+        x, y = point[0], point[1]
+        min_cx, min_cy = self.cell_key(x - radius, y - radius)
+        max_cx, max_cy = self.cell_key(x + radius, y + radius)
+        radius_sq = radius * radius
+
+        found = []
+        # scan whichever is smaller: the covered cells or the occupied cells
+        if (max_cx - min_cx + 1) * (max_cy - min_cy + 1) <= len(self._cells):
+            cells = (self._cells.get((cx, cy)) for cx in range(min_cx, max_cx + 1)
+                     for cy in range(min_cy, max_cy + 1))
+        else:
+            cells = (cell for (cx, cy), cell in self._cells.items()
+                     if min_cx <= cx <= max_cx and min_cy <= cy <= max_cy)
+        for cell in cells:
+            if not cell:
+                continue
+            for item in cell:
+                pos = item.position
+                if (pos.x - x)**2 + (pos.y - y)**2 < radius_sq:
+                    found.append(item)
+        return found
+
+    def query_rect(self, x_min, y_min, x_max, y_max):
+        """
+        Returns the items inside an axis-aligned rectangle.
+
+        Args:
+            x_min, y_min (float): the rectangle's top left corner
+            x_max, y_max (float): the rectangle's bottom right corner
+
+        Returns:
+            (list): the items with x_min <= x < x_max and y_min <= y < y_max.
+        """
+        min_cx, min_cy = self.cell_key(x_min, y_min)
+        max_cx, max_cy = self.cell_key(x_max, y_max)
+
+        found = []
+        # scan whichever is smaller: the covered cells or the occupied cells
+        if (max_cx - min_cx + 1) * (max_cy - min_cy + 1) <= len(self._cells):
+            cells = (self._cells.get((cx, cy)) for cx in range(min_cx, max_cx + 1)
+                     for cy in range(min_cy, max_cy + 1))
+        else:
+            cells = (cell for (cx, cy), cell in self._cells.items()
+                     if min_cx <= cx <= max_cx and min_cy <= cy <= max_cy)
+        for cell in cells:
+            if not cell:
+                continue
+            for item in cell:
+                pos = item.position
+                if x_min <= pos.x < x_max and y_min <= pos.y < y_max:
+                    found.append(item)
+        return found
+
+    def __len__(self):
+        return len(self._item_cells)
+
+    def __contains__(self, item):
+        return item in self._item_cells
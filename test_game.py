@@ -2,11 +2,34 @@
 Unit testing for the game
 """
 
+import json
+import os
+import random
 import pytest
 from character import *
 from hungry_sharks_game import *
 from hungry_sharks_field import *
+from hungry_sharks_view import *
 from character_controller import *
+from player_input import *
+from hungry_sharks_headless import *
+from game_loop import *
+from simulation_clock import *
+from frame_profiler import FrameProfiler
+from benchmark_simulation import build_field, compare_results
+import benchmark_simulation
+import benchmark_render
+import hungry_sharks_headless
+import balance_runner
+from vector_env import VectorSharksEnv, OUTCOMES
+from field_snapshot import save_snapshot, load_snapshot, take_snapshot,\
+    restore_snapshot, HEADER
+from rewind_buffer import RewindBuffer
+from chunk_manager import ChunkManager
+from lod_scheduler import LODScheduler
+from kinetic_events import KineticEventQueue, max_player_speed
+from indexed_population import IndexedPopulation, SizeCounts
+from entity_pool import EntityPool, make_entity_id
 from euclid3 import Vector2
 
 # CHARACTER TESTING
@@ -298,3 +321,1683 @@ def test_num_enemies(num_enemies):
 
     # check that the correct number is returned from get_num_enemies
     assert field.get_num_enemies() == num_enemies
+
+
+# HEADLESS
+
+def test_recorded_input_drives_player():
+    """
+    Test that the player controller follows a recorded input source and holds
+    the last frame once the recording runs out.
+    """
+    field = HungrySharksField(1000, 1000, 0)
+    frames = [(900, 500, False), (900, 500, True)]
+    controller = PlayerVelocityController(field, RecordedInput(frames), fps=40)
+
+    for _ in range(3):
+        controller.move()
+
+    assert field.player.position.x > 500
+    assert field.player.boost
+
+
+def test_headless_runner():
+    """
+    Test that the headless runner steps the field the requested number of ticks
+    and reports a tick rate.
+    """
+    field = HungrySharksField(1200, 600, 10)
+    runner = HeadlessRunner(field, ChaseBotInput(), fps=40)
+    stats = runner.run(max_ticks=50)
+
+    assert stats.ticks == 50 or field.game_end
+    assert stats.sim_seconds == stats.ticks / 40
+    assert stats.ticks_per_second > 0
+    assert field.sim_clock.time == pytest.approx(stats.sim_seconds)
+
+
+# ARRAY FIELD
+
+def test_array_field_views_write_through():
+    """
+    Test that AI players in an array field are views whose changes land in the
+    population's arrays.
+    """
+    field = HungrySharksArrayField(1000, 1000, 0)
+    aip = field.spawn_new_ai(AIPlayer(3, Vector2(10, 20), Vector2(1, 0), "wander"))
+
+    aip.velocity = Vector2(4, 0)
+    aip.update_pos(0.5)
+    aip.behavior_state = "flee"
+
+    assert aip in field.characters
+    assert tuple(field.characters.positions[0]) == (12, 20)
+    assert field.characters.sizes[0] == 3
+    assert aip.behavior_state == "flee"
+    assert aip.fov() == AIPlayer.fov_from_size[3] * 3
+
+
+def test_array_field_swap_remove():
+    """
+    Test that removing an AI player keeps the other views pointing at their own
+    state, and the removed view keeps its state.
+    """
+    field = HungrySharksArrayField(1000, 1000, 0)
+    views = [field.spawn_new_ai(AIPlayer(size, Vector2(size, size), Vector2(0, 0), ""))
+             for size in range(1, 6)]
+
+    field.characters.remove(views[1])
+
+    assert len(field.characters) == 4
+    assert views[1] not in field.characters
+    assert views[1].size == 2 and views[1].position == Vector2(2, 2)
+    for view in views[:1] + views[2:]:
+        assert view.position == Vector2(view.size, view.size)
+
+
+@pytest.mark.parametrize("aip_size", LOSE_CASES)
+def test_array_field_eat_and_lose(aip_size):
+    """
+    Test that eating and losing behave the same on the array field.
+    """
+    field = HungrySharksArrayField(1000, 1000, 0)
+    aip = field.spawn_new_ai(AIPlayer(aip_size, Vector2(500,500), Vector2(0,0), ""))
+
+    field.handle_eating_and_win_lose()
+
+    if aip_size > field.player.size:
+        assert field.game_end == "lose"
+    elif aip_size < field.player.size:
+        assert aip not in field.characters
+        assert field.player.growth_progress > 0
+        assert len(field.characters) == 1
+    else:
+        assert field.game_end == ""
+
+
+# SPATIAL HASH
+
+@pytest.mark.parametrize("radius", [5, 30, 100, 225, 2000])
+def test_spatial_hash_query(radius):
+    """
+    Test that a spatial hash radius query finds exactly the characters a brute
+    force search does.
+
+    Args:
+        radius (float): query radius
+    """
+    field = HungrySharksField(1000, 1000, 200)
+    center = Vector2(480, 510)
+
+    expected = {aip for aip in field.characters if abs(aip.position - center) < radius}
+
+    assert set(field.grid.query_radius(center, radius)) == expected
+
+
+@pytest.mark.parametrize("field_class", [HungrySharksField, HungrySharksArrayField])
+@pytest.mark.parametrize("rect", [(0, 0, 50, 50), (100, 250, 700, 400),\
+    (-500, -500, 3000, 3000)])
+def test_characters_in_rect(field_class, rect):
+    """
+    Test that a rectangle query finds exactly the characters a brute force
+    search does, on both kinds of field.
+
+    Args:
+        field_class: the kind of field to query
+        rect: (x_min, y_min, x_max, y_max) of the query
+    """
+    field = field_class(1000, 1000, 200, seed=2)
+    x_min, y_min, x_max, y_max = rect
+
+    expected = {(aip.position.x, aip.position.y) for aip in field.characters
+                if x_min <= aip.position.x < x_max and y_min <= aip.position.y < y_max}
+
+    found = field.characters_in_rect(*rect)
+    assert len(found) == len(expected)
+    assert {(aip.position.x, aip.position.y) for aip in found} == expected
+
+
+def test_spatial_hash_follows_movement():
+    """
+    Test that the field's spatial index is kept up to date as AI players move
+    and are eaten.
+    """
+    field = HungrySharksField(1000, 1000, 0)
+    aip = field.spawn_new_ai(AIPlayer(1, Vector2(100, 100), Vector2(400, 400), "wander"))
+    assert field.player_collisions() == []
+
+    # move the aip onto the player
+    aip.update_pos(1)
+    assert field.player_collisions() == [aip]
+
+    field.handle_eating_and_win_lose()
+    assert aip not in field.grid
+    assert len(field.grid) == len(field.characters)
+
+
+# BATCHED BEHAVIORS
+
+def make_random_fields(num_characters, seed):
+    """
+    Returns a list field and an array field holding identical, randomly placed
+    AI players (many of them near walls or the player).
+
+    Args:
+        num_characters (int): number of AI players
+        seed (int): random seed
+    """
+    rng = random.Random(seed)
+    list_field = HungrySharksField(1000, 800, 0)
+    array_field = HungrySharksArrayField(1000, 800, 0)
+    for field in (list_field, array_field):
+        field.player._size = 5
+    for _ in range(num_characters):
+        pos = Vector2(rng.choice([rng.uniform(0, 30), rng.uniform(970, 1000),\
+            rng.uniform(300, 700)]), rng.uniform(0, 800))
+        vel = Vector2(rng.choice([0, rng.uniform(-100, 100)]), rng.uniform(-100, 100))
+        state = rng.choice(["wander", "attack", "flee", "avoid walls"])
+        size = rng.randrange(1, 11)
+        list_field.spawn_new_ai(AIPlayer(size, pos.copy(), vel.copy(), state))
+        array_field.spawn_new_ai(AIPlayer(size, pos.copy(), vel.copy(), state))
+    return list_field, array_field
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_chase_bot_array_field_matches_list(seed):
+    """
+    Test that the chase bot picks the same target on an array field (using
+    masks over the population) as on a list field.
+
+    Args:
+        seed (int): random seed for the fields
+    """
+    list_field, array_field = make_random_fields(200, seed)
+    bot = ChaseBotInput()
+    for player_size in (1, 5, 11):
+        for field in (list_field, array_field):
+            field.player._size = player_size
+        assert bot.get_input(array_field) == bot.get_input(list_field)
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_batched_behaviors_match_scalar(seed):
+    """
+    Test that the array field's batched behavior classification gives the same
+    states as the per-AI loop.
+
+    Args:
+        seed (int): random seed for the AI players
+    """
+    list_field, array_field = make_random_fields(500, seed)
+
+    list_field.update_ai_behaviors()
+    array_field.update_ai_behaviors()
+
+    assert [aip.behavior_state for aip in list_field.characters] == \
+        [aip.behavior_state for aip in array_field.characters]
+
+
+@pytest.mark.parametrize("aip_pos, aip_size, aip_velocity, correct_behavior",\
+    BEHAVIOR_STATE_CASES)
+def test_batched_behavior_state_update(aip_pos, aip_size, aip_velocity, correct_behavior):
+    """
+    Test the batched behavior classification on the single-AI cases.
+    """
+    field = HungrySharksArrayField(1000, 1000, 0)
+    aip = field.spawn_new_ai(AIPlayer(aip_size, aip_pos, aip_velocity, ""))
+
+    field.update_ai_behaviors()
+
+    assert aip.behavior_state == correct_behavior
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_batched_movement_matches_scalar(seed):
+    """
+    Test that moving an array field in batches gives the same positions and
+    velocities as moving the same AI players one at a time.
+
+    Args:
+        seed (int): random seed for the AI players
+    """
+    list_field, array_field = make_random_fields(500, seed)
+
+    for field in (list_field, array_field):
+        field.sim_clock.advance(0.1)
+        field.rng.seed(seed)
+        AIVelocityController(field, fps=40).move()
+
+    for scalar_aip, batched_aip in zip(list_field.characters, array_field.characters):
+        assert abs(scalar_aip.position - batched_aip.position) < 1e-9
+        assert abs(scalar_aip.velocity - batched_aip.velocity) < 1e-9
+        assert scalar_aip.clock == batched_aip.clock
+
+
+# VIEW
+
+def test_sprite_cache_hits_and_quantizes():
+    """
+    Test that the sprite cache reuses sprites for headings in the same angle
+    step and counts hits and misses.
+    """
+    cache = SpriteCache(PyGameView.images_from_size, angle_steps=64, max_entries=100)
+
+    cache.get(1, 0.0)
+    cache.get(1, 2.0)    # within half a step (2.8125 degrees) of 0
+    cache.get(1, 10.0)
+    cache.get(2, 0.0)
+
+    assert cache.misses == 3
+    assert cache.hits == 1
+    assert len(cache) == 3
+
+
+def test_sprite_cache_lru_eviction():
+    """
+    Test that the sprite cache never holds more than its limit and evicts the
+    least recently used sprite.
+    """
+    cache = SpriteCache(PyGameView.images_from_size, angle_steps=8, max_entries=2)
+
+    cache.get(1, 0.0)
+    cache.get(1, 45.0)
+    cache.get(1, 0.0)     # 0 is now more recently used than 45
+    cache.get(1, 90.0)    # evicts 45
+
+    assert len(cache) == 2
+    cache.get(1, 0.0)
+    assert cache.hits == 2
+    cache.get(1, 45.0)
+    assert cache.misses == 4
+
+
+def test_sprite_cache_warm_covers_flip_boundaries():
+    """
+    Test that a warmed sprite cache already holds the sprite for every heading,
+    including the flipped and unflipped sprites of the steps around +-90
+    degrees.
+    """
+    cache = SpriteCache(PyGameView.images_from_size, angle_steps=64, max_entries=1024)
+    cache.warm(sizes=[2])
+    built = cache.misses
+
+    assert cache.key(2, 91.0) == (2, True, 16)
+    for tenth in range(-1800, 1801):
+        cache.get(2, tenth / 10)
+    assert cache.misses == built
+
+def make_test_view(field, **kwargs):
+    """
+    Returns a PyGameView that draws to an offscreen (dummy driver) window.
+
+    Args:
+        field (HungrySharksField): the field to view
+    """
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    view = PyGameView(field, **kwargs)
+    view._fps = 0
+    return view
+
+
+def test_dirty_rect_rendering():
+    """
+    Test that dirty-rect frames only update areas around the sprites and leave
+    the rest of the window showing the background.
+    """
+    field = HungrySharksField(1200, 600, 5)
+    view = make_test_view(field, render_mode="dirty")
+
+    view.draw()
+    first_rects = list(view._prev_rects)
+    for aip in field.characters:
+        aip.update_pos(0.5)
+    view.draw()
+
+    window_area = field.window_x * field.window_y
+    assert sum(rect.width * rect.height for rect in view._prev_rects) < window_area
+    assert len(first_rects) == len(field.characters) + 2
+
+    with pytest.raises(ValueError):
+        view.render_mode = "sometimes"
+    view.render_mode = "full"
+    view.draw()
+
+
+def test_dirty_rect_rendering_follows_the_camera():
+    """
+    Test that dirty-rect frames keep working while the camera follows the
+    player, and draw exactly what a full redraw would.
+    """
+    field = HungrySharksField(3600, 1800, 200, seed=3)
+    view = make_test_view(field, window_size=(1200, 600), render_mode="dirty")
+    view.draw()
+
+    for _ in range(5):
+        field.player.translate(17, -9)
+        for aip in field.characters:
+            aip.update_pos(0.05)
+        view.draw()
+        assert view._scroll == (17, -9)
+        assert view._prev_rects is not None
+    dirty = pygame.image.tostring(view._window, "RGB")
+
+    view.render_mode = "full"
+    view.draw()
+    assert view._scroll is None
+    assert pygame.image.tostring(view._window, "RGB") == dirty
+
+
+def test_camera_follows_player_within_field():
+    """
+    Test that the camera centers on a point but never shows past the field's
+    edges, and converts between window and field coordinates.
+    """
+    camera = Camera(1200, 600, 3600, 1800)
+
+    camera.follow((1800, 900))
+    assert camera.bounds() == (1200, 600, 2400, 1200)
+    assert camera.to_window((1810, 905)) == (610, 305)
+    assert camera.to_field((610, 305)) == (1810, 905)
+
+    camera.follow((100, 1790))
+    assert (camera.x, camera.y) == (0, 1200)
+    camera.follow((3599, 0))
+    assert (camera.x, camera.y) == (2400, 0)
+
+    # a field smaller than the window stays in the top left corner
+    small = Camera(1200, 600, 800, 400)
+    small.follow((400, 200))
+    assert (small.x, small.y) == (0, 0)
+
+
+@pytest.mark.parametrize("render_mode", PyGameView.render_modes)
+def test_view_draws_only_visible_characters(render_mode):
+    """
+    Test that a view of a field much bigger than its window only transforms
+    and blits the characters whose sprites overlap the camera's view.
+
+    Args:
+        render_mode: "full" or "dirty"
+    """
+    field = HungrySharksField(12000, 6000, 2000, seed=8)
+    view = make_test_view(field, window_size=(1200, 600), render_mode=render_mode)
+    view.draw()
+
+    camera = view.camera
+    # centered on the player, in the middle of the field
+    assert camera.bounds() == (5400, 2700, 6600, 3300)
+    expected = [aip for aip in field.characters
+                if camera.x - view.sprites.reach(aip.size) < aip.position.x\
+                < camera.x + 1200 + view.sprites.reach(aip.size)
+                and camera.y - view.sprites.reach(aip.size) < aip.position.y\
+                < camera.y + 600 + view.sprites.reach(aip.size)]
+    assert 0 < len(expected) < len(field.characters) // 10
+    assert set(view.visible_characters()) == set(expected)
+    # one sprite lookup per visible AI player, plus the player
+    assert view.sprites.hits + view.sprites.misses == len(expected) + 1
+
+    # the camera scrolls with the player
+    field.player.translate(100, 0)
+    view.draw()
+    assert camera.x == 5500
+    assert set(view.visible_characters()) != set(expected)
+
+
+# GAME LOOP
+
+def test_game_command_line_options():
+    """
+    Test that the game's command-line flags reach main's keyword arguments.
+    """
+    assert parse_args([]) == {"tick_rate": 40, "max_substeps": 5, "warp": 1,\
+        "profile": False, "profile_inner": False, "profile_log": None,\
+        "rewind_seconds": 30, "world_scale": 3, "endless": False, "lod": False,\
+        "kinetic": False, "seed": None, "record_input": None, "replay_input": None,\
+        "render_mode": "full"}
+
+    options = parse_args(["--tick-rate", "60", "--max-substeps", "3", "--warp",\
+        "max", "--profile", "--profile-inner", "--profile-log", "frames.jsonl"])
+    assert options == {"tick_rate": 60, "max_substeps": 3, "warp": None,\
+        "profile": True, "profile_inner": True, "profile_log": "frames.jsonl",\
+        "rewind_seconds": 30, "world_scale": 3, "endless": False, "lod": False,\
+        "kinetic": False, "seed": None, "record_input": None, "replay_input": None,\
+        "render_mode": "full"}
+    assert parse_args(["--seed", "7", "--replay-input", "game.rec"])["seed"] == 7
+    assert parse_args(["--warp", "10"])["warp"] == 10
+    assert parse_args(["--render-mode", "dirty"])["render_mode"] == "dirty"
+
+    with pytest.raises(SystemExit):
+        parse_args(["--warp", "0"])
+    with pytest.raises(SystemExit):
+        parse_args(["--endless", "--record-input", "game.rec"])
+
+
+def test_fixed_timestep_accumulates():
+    """
+    Test that the fixed-timestep loop carries leftover time between frames.
+    """
+    loop = FixedTimestepLoop(tick_rate=40, max_substeps=5)
+
+    assert loop.advance(0.01) == 0
+    assert loop.alpha == pytest.approx(0.4)
+    assert loop.advance(0.02) == 1
+    assert loop.advance(0.05) == 2
+    assert loop.alpha == pytest.approx(0.2)
+
+
+def test_fixed_timestep_caps_substeps():
+    """
+    Test that a very slow frame runs at most max_substeps steps and drops the
+    rest of the time.
+    """
+    loop = FixedTimestepLoop(tick_rate=40, max_substeps=5)
+
+    assert loop.advance(1.0) == 5
+    assert loop.dropped_time == pytest.approx(1.0 - 5/40)
+    assert loop.advance(0) == 0
+
+
+def test_interpolated_position():
+    """
+    Test that render interpolation blends between the previous and current
+    positions.
+    """
+    field = HungrySharksField(1000, 1000, 1)
+    aip = field.characters[0]
+    previous_positions = capture_positions(field)
+    aip.velocity = Vector2(40, -20)
+    aip.update_pos(1)
+
+    assert interpolated_position(aip, previous_positions, 0) == \
+        Vector2(*previous_positions[aip])
+    assert interpolated_position(aip, previous_positions, 0.5) == \
+        Vector2(*previous_positions[aip]) + Vector2(20, -10)
+    assert interpolated_position(aip, {}, 0.5) == aip.position
+
+
+def test_sim_clock_drives_wander():
+    """
+    Test that wandering AI players keep time with the field's simulation
+    clock, not the system clock.
+    """
+    field = HungrySharksField(1000, 1000, 0)
+    aip = field.spawn_new_ai(AIPlayer(1, Vector2(500, 100), Vector2(10, 0), "wander"))
+    controller = AIVelocityController(field, fps=40)
+
+    field.sim_clock.advance(0.15)
+    controller.move()
+    assert aip.clock == pytest.approx(0.15)
+    assert aip.velocity == Vector2(10, 0)
+
+    # another 0.1 s of game time pushes the clock past 0.2 s: the aip turns
+    field.sim_clock.advance(0.1)
+    controller.move()
+    assert aip.clock == 0
+    assert aip.velocity != Vector2(10, 0)
+
+
+def test_time_warp():
+    """
+    Test that the time warp scales how many steps a frame runs and rejects
+    nonsense values.
+    """
+    loop = FixedTimestepLoop(tick_rate=40, max_substeps=5)
+    assert loop.advance(0.025, warp=10) == 10
+
+    clock = SimulationClock()
+    with pytest.raises(ValueError):
+        clock.warp = 0
+    clock.warp = None
+    assert clock.unthrottled
+
+
+# BENCHMARKS
+
+def test_benchmark_compare_flags_regressions():
+    """
+    Test that benchmark comparison flags only phases slower than the threshold
+    allows.
+    """
+    baseline = {"results": {"a": {"median_ms": 1.0}, "b": {"median_ms": 1.0}}}
+    current = {"results": {"a": {"median_ms": 1.1}, "b": {"median_ms": 1.5},\
+        "c": {"median_ms": 9.0}}}
+
+    assert compare_results(current, baseline, 0.2) == [("b", 1.0, 1.5)]
+
+
+def test_benchmark_field_mix():
+    """
+    Test that benchmark fields are reproducible and follow their mix.
+    """
+    field = build_field("array", 200, "start")
+    again = build_field("array", 200, "start")
+
+    assert all(aip.size == 1 and aip.behavior_state == "wander" for aip in field.characters)
+    assert (field.characters.positions == again.characters.positions).all()
+
+
+def test_benchmark_phases_get_fresh_fields(monkeypatch):
+    """
+    Test that each simulation phase is timed on its own freshly built field,
+    so earlier phases can't change the mix later ones see.
+    """
+    built = []
+    def recording_build_field(*args, **kwargs):
+        built.append(build_field(*args, **kwargs))
+        return built[-1]
+    monkeypatch.setattr(benchmark_simulation, "build_field", recording_build_field)
+
+    phases = benchmark_simulation.benchmark_field("array", 50, "mixed", 2)
+
+    assert len(built) == len(phases) == 4
+    assert len(set(map(id, built))) == 4
+
+
+def test_render_benchmark_phases():
+    """
+    Test that the render benchmark reports a time for every frame phase in both
+    render modes.
+    """
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    for mode in PyGameView.render_modes:
+        timing = benchmark_render.benchmark_view(20, mode, frames=2, cache_size=64)
+        assert set(timing) == set(benchmark_render.PHASES) | {"total"}
+        assert timing["total"] > 0
+
+
+# PROFILING
+
+def test_profiler_percentiles_and_log(tmp_path):
+    """
+    Test that the profiler keeps per-frame phase totals, reports percentiles
+    and writes one JSON line per frame.
+    """
+    log_path = tmp_path / "frames.jsonl"
+    profiler = FrameProfiler(window=100, jsonl_path=str(log_path))
+    for frame in range(100):
+        profiler.record("draw", (frame + 1) / 1000)
+        profiler.record("draw", (frame + 1) / 1000)
+        profiler.end_frame()
+    profiler.close()
+
+    p50, p95, p99 = profiler.percentiles("draw")
+    assert (p50, p95, p99) == pytest.approx((100, 190, 198))
+    lines = log_path.read_text().splitlines()
+    assert len(lines) == 100
+    assert json.loads(lines[0])["ms"]["draw"] == pytest.approx(2)
+
+
+def test_profiler_instrument_and_disabled():
+    """
+    Test that instrumenting a method times its calls, and that a disabled
+    profiler neither wraps methods nor records anything.
+    """
+    field = HungrySharksField(1000, 1000, 10)
+    profiler = FrameProfiler()
+    profiler.instrument(field, "update_ai_behaviors")
+    field.update()
+    profiler.end_frame()
+    assert profiler.percentiles("update_ai_behaviors")[0] > 0
+    profiler.uninstrument()
+    assert "update_ai_behaviors" not in vars(field)
+
+    disabled = FrameProfiler(enabled=False)
+    disabled.instrument(field, "update_ai_behaviors")
+    with disabled.phase("draw"):
+        pass
+    disabled.end_frame()
+    assert "update_ai_behaviors" not in vars(field)
+    assert disabled.summary() == {}
+
+
+# BALANCE RUNNER
+
+def test_balance_game_is_reproducible():
+    """
+    Test that a balance game played twice with the same seed gives the same
+    record.
+    """
+    first = balance_runner.play_game(7, max_seconds=20)
+    second = balance_runner.play_game(7, max_seconds=20)
+
+    assert first.tobytes() == second.tobytes()
+    assert first["size_reached_at"][2] == 0
+
+
+def test_balance_runner_pool():
+    """
+    Test that games played on a process pool come back in seed order and
+    aggregate into a summary.
+    """
+    records = balance_runner.run_games(4, base_seed=3, workers=2, batch_size=1,\
+        max_seconds=5)
+    summary = balance_runner.aggregate(records)
+
+    assert list(records["seed"]) == [3, 4, 5, 6]
+    assert summary["games"] == 4
+    assert sum(summary["outcomes"].values()) == 4
+
+
+def test_field_records_eater_when_player_grows_in_same_frame():
+    """
+    Test that the field remembers which AI player ate the player, even when
+    the player grew to that AI's size eating a smaller one in the same frame.
+    """
+    field = HungrySharksField(1200, 600, 0)
+    field.player.grow(80)
+    eater = field.spawn_new_ai(AIPlayer(3, field.player.position.copy(),\
+        Vector2(0, 0), ""))
+    field.spawn_new_ai(AIPlayer(1, field.player.position.copy(), Vector2(0, 0), ""))
+
+    field.handle_eating_and_win_lose()
+
+    assert field.game_end == "lose"
+    assert field.player.size == 3
+    assert field.eaten_by is eater
+
+
+def test_balance_params_set_max_nemeses():
+    """
+    Test that a max_nemeses balance override reaches new fields.
+    """
+    try:
+        balance_runner.apply_params({"max_nemeses": 5})
+        assert HungrySharksField(1200, 600, 0)._max_nemeses == 5
+    finally:
+        HungrySharksField.max_nemeses = 2
+
+
+# VECTOR ENV
+
+def test_vector_env_shapes():
+    """
+    Test that reset and step return one observation, reward and done flag per
+    game.
+    """
+    env = VectorSharksEnv(8, num_characters=5, seed=0)
+    observations = env.reset()
+    assert observations.shape == (8, env.observation_size)
+    assert (env.player_sizes == 2).all() and (env.ai_sizes == 1).all()
+
+    actions = np.tile([600.0, 300.0, 0.0], (8, 1))
+    observations, rewards, done = env.step(actions)
+    assert observations.shape == (8, env.observation_size)
+    assert rewards.shape == done.shape == (8,)
+    assert not done.any()
+
+
+def test_vector_env_player_matches_controller():
+    """
+    Test that players in a batched environment move and pay for boosting just
+    like a field's player driven by PlayerVelocityController.
+    """
+    frames = [(900, 500, False), (900, 500, True), (100, 50, True),\
+        (100, 50, False), (600, 300, False)]
+    field = HungrySharksField(1200, 600, 0)
+    field.player._growth_progress = 50
+    controller = PlayerVelocityController(field, RecordedInput(frames), fps=40)
+    env = VectorSharksEnv(1, num_characters=0, fps=40, seed=0)
+    env.player_growth[:] = 50
+
+    for x, y, boost in frames:
+        controller.move()
+        env.step([[x, y, boost]])
+        assert env.player_positions[0] == pytest.approx(\
+            [field.player.position.x, field.player.position.y])
+        assert env.player_growth[0] == pytest.approx(field.player.growth_progress)
+
+
+def test_vector_env_eating_losing_and_reset():
+    """
+    Test that a game grows its player and respawns the eaten AI player, that a
+    bigger AI player ends its game, and that ended games wait for a reset.
+    """
+    env = VectorSharksEnv(2, num_characters=2, seed=0)
+    env.player_positions[:] = (400, 300)
+    env.ai_positions[:] = (100, 100)
+    env.ai_positions[[0, 2]] = env.player_positions
+    env.ai_sizes[:] = (1, 1, 3, 1)
+    env.ai_behaviors[:] = 0
+    stay = np.hstack([env.player_positions, np.zeros((2, 1))])
+
+    _, rewards, done = env.step(stay)
+
+    assert rewards[0] == pytest.approx(0.25)
+    assert list(done) == [False, True]
+    assert OUTCOMES[env.outcomes[1]] == "lose"
+    assert np.linalg.norm(env.ai_positions[0] - env.player_positions[0]) >= 30
+
+    ticks = env.ticks.copy()
+    _, rewards, done = env.step(stay)
+    assert env.ticks[1] == ticks[1] and rewards[1] == 0 and done[1]
+
+    env.reset(done)
+    assert not env.done.any()
+    assert env.player_sizes[1] == 2 and env.ticks[1] == 0
+
+
+# ALLOCATIONS
+
+def test_characters_use_slots():
+    """
+    Test that characters store their state in slots rather than a __dict__.
+    """
+    for char in (Player(2, Vector2(0, 0)), AIPlayer(1, Vector2(0, 0), Vector2(1, 0), "")):
+        assert not hasattr(char, "__dict__")
+        with pytest.raises(AttributeError):
+            char.unexpected = 1
+
+
+def test_movement_updates_vectors_in_place():
+    """
+    Test that moving a character updates its position and velocity objects
+    instead of replacing them, with the same results as Vector2 arithmetic.
+    """
+    aip = AIPlayer(3, Vector2(100, 100), Vector2(30, -40), "")
+    position, velocity = aip.position, aip.velocity
+
+    aip.move_toward_point((200, 50), timestep=0.5)
+    expected = Vector2(100, -50).normalize() * aip.max_speed()
+    assert (velocity.x, velocity.y) == pytest.approx((expected.x, expected.y))
+    aip.move_away_from_point((0, 0), timestep=0.5)
+    aip.bounce(Vector2(0, 1), timestep=0.5)
+
+    assert aip.position is position and aip.velocity is velocity
+
+
+def test_view_movement_writes_population_arrays():
+    """
+    Test that in-place movement of an array-backed AI player writes its row.
+    """
+    field = HungrySharksArrayField(1200, 600, 0)
+    aip = field.spawn_new_ai(AIPlayer(3, Vector2(100, 100), Vector2(10, 0), ""))
+
+    aip.bounce(Vector2(1, 0), timestep=1)
+
+    assert list(field.characters.velocities[0]) == [10, 0]
+    assert list(field.characters.positions[0]) == [110, 100]
+    aip.move_toward_point((110, 300), timestep=0.5)
+    assert field.characters.positions[0, 1] == pytest.approx(100 + aip.max_speed() / 2)
+
+
+@pytest.mark.parametrize("backend", ["list", "array"])
+def test_steady_state_ticks_create_almost_no_vectors(backend):
+    """
+    Test that simulation ticks of a settled field create (almost) no Vector2
+    objects; only eating, which spawns new AI players, still does.
+
+    Args:
+        backend (string): "list" or "array"
+    """
+    counts = benchmark_simulation.tick_allocations(backend, 300, "mixed", ticks=50)
+
+    assert counts["vector2_per_tick"] < 1
+
+
+# SNAPSHOTS
+
+@pytest.mark.parametrize("field_class", [HungrySharksField, HungrySharksArrayField])
+def test_snapshot_restores_identical_game(field_class, tmp_path):
+    """
+    Test that a game restored from a snapshot plays on exactly like the
+    original from that point, random numbers included.
+
+    Args:
+        field_class: the kind of field to snapshot
+    """
+    field = field_class(1200, 600, 30, seed=5)
+    field.player.grow(40)
+    field._max_nemeses = 3
+    runner = HeadlessRunner(field, ChaseBotInput(), fps=40)
+    runner.run(max_ticks=20)
+    path = tmp_path / "field.snap"
+    save_snapshot(field, path)
+
+    def play(game):
+        HeadlessRunner(game, ChaseBotInput(), fps=40).run(max_ticks=40)
+        return [(aip.position.x, aip.position.y, aip.size, aip.behavior_state)
+                for aip in game.characters] + [(game.player.position.x,\
+                game.player.position.y, game.player.size, game.game_end)]
+
+    original = play(field)
+    restored = load_snapshot(path)
+
+    assert type(restored) is field_class
+    assert restored._max_nemeses == 3
+    assert play(restored) == original
+
+
+@pytest.mark.parametrize("num_characters", [10, 30, 50])
+def test_snapshot_restores_into_existing_objects(num_characters):
+    """
+    Test that restoring into a list field keeps its Player and reuses its
+    AIPlayers, however many AI players the field had, and leaves the field's
+    grid and size counts matching the restored AI players.
+
+    Args:
+        num_characters (int): AI players in the field restored into
+    """
+    source = HungrySharksField(1200, 600, 30, seed=5)
+    source.player.grow(40)
+    HeadlessRunner(source, ChaseBotInput(), fps=40).run(max_ticks=20)
+    header, records = take_snapshot(source)
+
+    field = HungrySharksField(1200, 600, num_characters, seed=8)
+    player = field.player
+    old_characters = set(field.characters)
+    restore_snapshot(header, records, field)
+
+    assert field.player is player
+    assert (player.position.x, player.position.y, player.size) ==\
+        (source.player.position.x, source.player.position.y, source.player.size)
+    assert len(old_characters & set(field.characters)) == min(num_characters, 30)
+    assert sorted((aip.position.x, aip.position.y, aip.size, aip.behavior_state)
+                  for aip in field.characters) ==\
+        sorted((aip.position.x, aip.position.y, aip.size, aip.behavior_state)
+               for aip in source.characters)
+    for aip in field.characters:
+        assert aip in field.characters_near(aip.position, 1)
+    assert field.get_num_enemies() == source.get_num_enemies()
+
+
+def test_snapshot_rejects_other_files(tmp_path):
+    """
+    Test that loading a file that isn't a snapshot fails cleanly.
+    """
+    path = tmp_path / "junk.snap"
+    path.write_bytes(bytes(4096))
+
+    with pytest.raises(ValueError):
+        load_snapshot(path)
+
+
+# REWIND
+
+def record_game(field_class, buffer, ticks, seed=3):
+    """
+    Plays a bot game into a rewind buffer and returns the state of every tick.
+
+    Args:
+        field_class: the kind of field to play on
+        buffer (RewindBuffer): the buffer to record into
+        ticks (int): ticks to play after recording the starting state
+        seed (int): random seed
+    """
+    field = field_class(1200, 600, 40, seed=seed)
+    runner = HeadlessRunner(field, ChaseBotInput(danger_radius=0), fps=40)
+    states = [take_snapshot(field)]
+    buffer.record(field)
+    for _ in range(ticks):
+        runner.step()
+        states.append(take_snapshot(field))
+        buffer.record(field)
+    return field, states
+
+
+@pytest.mark.parametrize("field_class", [HungrySharksField, HungrySharksArrayField])
+def test_rewind_rebuilds_every_tick(field_class):
+    """
+    Test that every buffered tick, keyframe or delta, rebuilds to exactly the
+    state that was recorded, including ticks with spawns and removals.
+
+    Args:
+        field_class: the kind of field to play on
+    """
+    buffer = RewindBuffer(keyframe_interval=10)
+    field, states = record_game(field_class, buffer, 60)
+
+    # the bot ate (so AI players were removed and spawned)
+    assert field.player.growth_progress > 0
+    assert (buffer.first_tick, buffer.last_tick) == (0, 60)
+    for tick, (header, records) in enumerate(states):
+        buffered_header, buffered_records = buffer.state_at(tick)
+        assert buffered_header.tobytes() == header.tobytes()
+        assert buffered_records.tobytes() == records.tobytes()
+
+    buffer.restore(25, field)
+    assert take_snapshot(field)[1].tobytes() == states[25][1].tobytes()
+
+
+def test_rewind_limits_and_truncate():
+    """
+    Test that the buffer drops its oldest keyframe groups to stay within its
+    tick and memory limits, and forgets later ticks when resumed.
+    """
+    by_ticks = RewindBuffer(max_ticks=25, keyframe_interval=10)
+    record_game(HungrySharksArrayField, by_ticks, 60)
+    assert by_ticks.last_tick == 60
+    assert by_ticks.first_tick == 40 and len(by_ticks) == 21
+
+    by_memory = RewindBuffer(max_bytes=20000, keyframe_interval=5)
+    record_game(HungrySharksArrayField, by_memory, 60)
+    assert by_memory.first_tick > 0 and by_memory.last_tick == 60
+    assert by_memory.nbytes <= 20000 + 5 * 5000
+
+    by_ticks.truncate(45)
+    assert by_ticks.last_tick == 45
+    with pytest.raises(IndexError):
+        by_ticks.state_at(50)
+
+
+def test_rewind_records_only_changes():
+    """
+    Test that a list field's deltas hold only the AI players the game changed
+    and the header bytes that changed, and that ticks recorded after resuming
+    from a rewound tick still rebuild exactly.
+    """
+    field = HungrySharksField(6000, 3000, 400, seed=2)
+    field.lod = LODScheduler()
+    runner = HeadlessRunner(field, ChaseBotInput(danger_radius=0), fps=40)
+    buffer = RewindBuffer(keyframe_interval=10)
+    states = [take_snapshot(field)]
+    buffer.record(field)
+    for _ in range(15):
+        runner.step()
+        states.append(take_snapshot(field))
+        buffer.record(field)
+
+    deltas = [buffer._locate(tick)[0][tick % 10] for tick in range(1, 10)]
+    assert all(0 < len(frame.rows) < 400 for frame in deltas)
+    assert all(frame.header.nbytes < HEADER.itemsize / 4 for frame in deltas)
+
+    buffer.restore(5, field)
+    buffer.truncate(5)
+    states = states[:6]
+    for _ in range(10):
+        runner.step()
+        states.append(take_snapshot(field))
+        buffer.record(field)
+    for tick, (header, records) in enumerate(states):
+        buffered_header, buffered_records = buffer.state_at(tick)
+        assert buffered_header.tobytes() == header.tobytes()
+        assert buffered_records.tobytes() == records.tobytes()
+
+
+def test_view_rewind_hotkeys():
+    """
+    Test that R pauses on the newest tick, the arrow keys restore buffered
+    ticks and R resumes from the tick shown.
+    """
+    buffer = RewindBuffer(keyframe_interval=10)
+    field, states = record_game(HungrySharksField, buffer, 30)
+    view = make_test_view(field, rewind=buffer)
+
+    view.handle_rewind_key(pygame.K_r)
+    assert view.rewinding and view.rewind_tick == 30
+    for _ in range(5):
+        view.handle_rewind_key(pygame.K_LEFT)
+    view.handle_rewind_key(pygame.K_RIGHT)
+    view.draw()
+
+    assert view.rewind_tick == 26
+    assert take_snapshot(field)[1].tobytes() == states[26][1].tobytes()
+    view.handle_rewind_key(pygame.K_r)
+    assert not view.rewinding and buffer.last_tick == 26
+
+
+# RECORD AND REPLAY
+
+@pytest.mark.parametrize("field_class", [HungrySharksField, HungrySharksArrayField])
+def test_field_seed_reproduces_game(field_class):
+    """
+    Test that two fields made with the same seed spawn and play identically,
+    without touching the global random module.
+
+    Args:
+        field_class: the kind of field to play on
+    """
+    def play(seed):
+        field = field_class(1200, 600, 30, seed=seed)
+        HeadlessRunner(field, ChaseBotInput(), fps=40).run(max_ticks=80)
+        return take_snapshot(field)[1].tobytes()
+
+    random.seed(1)
+    first = play(11)
+    random.seed(2)
+    assert play(11) == first
+    assert play(12) != first
+
+
+@pytest.mark.parametrize("field_class", [HungrySharksField, HungrySharksArrayField])
+def test_replay_repeats_recorded_session(field_class, tmp_path):
+    """
+    Test that replaying a recorded bot game on a field with the recording's
+    seed repeats it bit for bit.
+
+    Args:
+        field_class: the kind of field to play on
+    """
+    path = tmp_path / "game.rec"
+    field = field_class(1200, 600, 30, seed=21)
+    recorder = InputRecorder(ChaseBotInput(), path, seed=21, fps=40, num_characters=30,\
+        world=(1200, 600), array_backend=field_class is HungrySharksArrayField)
+    HeadlessRunner(field, recorder, fps=40).run(max_ticks=150)
+    recorder.close()
+
+    replay = ReplayInput(path)
+    assert (replay.seed, replay.fps, len(replay)) == (21, 40, recorder.ticks)
+    assert replay.array_backend == (field_class is HungrySharksArrayField)
+    replayed = field_class(*replay.world, replay.num_characters, seed=replay.seed)
+    HeadlessRunner(replayed, replay, fps=replay.fps).run(max_ticks=len(replay))
+
+    header, records = take_snapshot(field)
+    replayed_header, replayed_records = take_snapshot(replayed)
+    assert replayed_header.tobytes() == header.tobytes()
+    assert replayed_records.tobytes() == records.tobytes()
+
+
+@pytest.mark.parametrize("arrays", [False, True])
+def test_headless_record_without_seed_replays(arrays, tmp_path, monkeypatch, capsys):
+    """
+    Test that the headless runner records a seed and the field's backend even
+    when neither was asked for, so replaying repeats the game whatever flags
+    the replay is run with.
+
+    Args:
+        arrays (bool): whether the recorded game stores AI players in arrays
+    """
+    path = tmp_path / "game.rec"
+    record_args = ["--characters", "30", "--ticks", "150", "--record", str(path)]
+    monkeypatch.setattr("sys.argv", ["hungry_sharks_headless.py"] + record_args\
+        + (["--arrays"] if arrays else []))
+    hungry_sharks_headless.main()
+    recorded = capsys.readouterr().out
+
+    replay = ReplayInput(path)
+    assert replay.seed is not None
+    assert replay.array_backend == arrays
+    monkeypatch.setattr("sys.argv", ["hungry_sharks_headless.py", "--replay",\
+        str(path)])
+    hungry_sharks_headless.main()
+    replayed = capsys.readouterr().out
+
+    def outcome(output):
+        return [line for line in output.splitlines()
+                if line.startswith(("ticks:", "simulated", "game end"))]
+    assert outcome(replayed) == outcome(recorded)
+
+    if not arrays:
+        monkeypatch.setattr("sys.argv", ["hungry_sharks_headless.py", "--replay",\
+            str(path), "--arrays"])
+        with pytest.raises(SystemExit):
+            hungry_sharks_headless.main()
+
+
+def test_recorder_truncate_and_bad_files(tmp_path):
+    """
+    Test that truncating a recording keeps only its first ticks and that
+    files that aren't recordings are rejected.
+    """
+    path = tmp_path / "game.rec"
+    frames = [(x, 2*x, x % 2 == 0) for x in range(10)]
+    recorder = InputRecorder(RecordedInput(frames), path, fps=60)
+    field = HungrySharksField(1200, 600, 0)
+    for _ in range(10):
+        recorder.get_input(field)
+    recorder.truncate(4)
+    recorder.get_input(field)
+    recorder.close()
+
+    seed, fps, num_characters, world, array_backend, recorded = read_recording(path)
+    assert (seed, fps, num_characters, world, array_backend) ==\
+        (None, 60, 10, (1200, 600), False)
+    # the source had run out, so it repeats its last frame
+    assert recorded == frames[:4] + [frames[-1]]
+
+    junk = tmp_path / "junk.rec"
+    junk.write_bytes(bytes(100))
+    with pytest.raises(ValueError):
+        ReplayInput(junk)
+
+
+# ENDLESS OCEAN
+
+def ocean_characters(chunks):
+    """
+    Returns the ocean position, size and velocity of every AI player in a
+    chunk manager's field, sorted.
+    """
+    return sorted(chunks.ocean_position(aip.position.x, aip.position.y)\
+        + (aip.size, aip.velocity.x, aip.velocity.y) for aip in chunks.field.characters)
+
+
+def swim(chunks, dx, dy, steps):
+    """
+    Moves the player of a chunk manager's field in steps, updating the chunks
+    after each one.
+    """
+    for _ in range(steps):
+        chunks.field.player.translate(dx, dy)
+        chunks.update()
+
+
+@pytest.mark.parametrize("field_class", [HungrySharksField, HungrySharksArrayField])
+def test_chunks_stream_with_bounded_memory(field_class, tmp_path):
+    """
+    Test that swimming far keeps the field to the chunks around the player,
+    the stored chunks within the memory budget (the rest evicted to disk),
+    and that coming back finds the AI players where they were left.
+
+    Args:
+        field_class: the kind of field to stream through
+    """
+    chunks = ChunkManager(field_class, chunk_size=600, characters_per_chunk=5,\
+        max_bytes=1500, seed=4, directory=tmp_path)
+    start = ocean_characters(chunks)
+    assert len(start) == 9 * 5
+
+    swim(chunks, 150, 0, 80)
+    assert chunks.center == (20, 0)
+    assert len(chunks.field.characters) == 9 * 5
+    # the player stays in the field's center chunk, however far it swims
+    assert 600 <= chunks.field.player.position.x < 1200
+    assert chunks.ocean_position(chunks.field.player.position.x, 0)[0] == 300 + 80 * 150
+    assert chunks.store.nbytes <= 1500
+    assert chunks.store.evictions > 0 and len(os.listdir(tmp_path)) > 0
+
+    swim(chunks, -150, 0, 80)
+    assert chunks.center == (0, 0)
+    assert ocean_characters(chunks) == start
+    chunks.close()
+    # a directory that was passed in is left alone
+    assert os.path.isdir(tmp_path)
+
+
+@pytest.mark.parametrize("field_class", [HungrySharksField, HungrySharksArrayField])
+def test_chunks_have_no_walls(field_class, tmp_path):
+    """
+    Test that AI players swim on past the edges of an endless ocean's field,
+    and that one that has swum out of the loaded chunks is stored with the
+    nearest one when that chunk is unloaded.
+
+    Args:
+        field_class: the kind of field to stream through
+    """
+    chunks = ChunkManager(field_class, chunk_size=600, characters_per_chunk=5,\
+        seed=4, directory=tmp_path, background=False)
+    field = chunks.field
+    aip = field.spawn_new_ai(AIPlayer(1, Vector2(10, 900), Vector2(-50, 0), "wander"))
+    field.update_ai_behaviors()
+    assert aip.behavior_state == "wander"
+
+    # past the field's left edge, in chunk (-2, 0)
+    aip.translate(-310, 0)
+    assert chunks.chunk_of(aip.position.x, aip.position.y) == (-2, 0)
+    assert chunks.loaded_chunk_of(aip.position.x, aip.position.y) == (-1, 0)
+    swim(chunks, 150, 0, 4)
+    assert chunks.center == (1, 0)
+    assert all(chunks.ocean_position(other.position.x, other.position.y)[0] >= -600
+               for other in field.characters)
+    stored = chunks.store.take((-1, 0))
+    assert (-900, 300) in [tuple(position) for position in stored["positions"].tolist()]
+    chunks.close()
+
+
+def test_chunks_generate_ahead_deterministically():
+    """
+    Test that chunks are generated ahead of the player in the background, and
+    that doing so doesn't change what the player finds.
+    """
+    background = ChunkManager(seed=9)
+    foreground = ChunkManager(seed=9, background=False)
+
+    background.field.player.set_velocity(200, 0)
+    background.update()
+    # the next two chunk rows to the right are on their way
+    assert set(background._pending) == {(2, -1), (2, 0), (2, 1), (3, -1), (3, 0), (3, 1)}
+
+    for chunks in (background, foreground):
+        swim(chunks, 200, 0, 20)
+    assert background.center == foreground.center == (3, 0)
+    assert ocean_characters(background) == ocean_characters(foreground)
+    background.close()
+    foreground.close()
+    assert not os.path.exists(background.store.directory)
+
+
+def test_endless_headless_game():
+    """
+    Test that a bot game in an endless ocean runs with the chunks following
+    the player.
+    """
+    chunks = ChunkManager(chunk_size=600, seed=1)
+    runner = HeadlessRunner(chunks.field, ChaseBotInput(), fps=40, chunks=chunks)
+    runner.run(max_ticks=200)
+
+    player = chunks.field.player
+    assert chunks.chunk_of(player.position.x, player.position.y) == chunks.center
+    chunks.close()
+
+
+# LEVEL OF DETAIL
+
+def test_lod_updates_far_characters_less_often():
+    """
+    Test that AI players near the player move every tick, far ones every few
+    ticks by the time they missed, and far ones all get their turn.
+    """
+    field = HungrySharksField(3000, 3000, 0)
+    # beyond its fov (150) of the player, but within twice that
+    near = field.spawn_new_ai(AIPlayer(1, Vector2(1500, 1750), Vector2(0, 40), "wander"))
+    far = field.spawn_new_ai(AIPlayer(1, Vector2(500, 500), Vector2(0, 40), "attack"))
+    for x in range(600, 960, 20):
+        field.spawn_new_ai(AIPlayer(1, Vector2(x, 800), Vector2(0, 40), "wander"))
+    field.lod = LODScheduler(fov_multiple=2, interval=4)
+    controller = AIVelocityController(field, fps=40)
+
+    moves = []
+    for _ in range(8):
+        before = far.position.y
+        controller.move()
+        field.update_ai_behaviors()
+        field.sim_clock.advance(1/40)
+        moves.append(far.position.y - before)
+
+    assert field.lod.near == [near]
+    assert near.position.y == pytest.approx(1750 + 8 * 40/40)
+    # the far one wanders, and moves (by four ticks' time) on one tick in four
+    assert far.behavior_state == "wander"
+    assert sum(move != 0 for move in moves) == 2
+    assert max(moves) == pytest.approx(4 * 40/40)
+    assert len(field.characters) == 20
+
+
+def test_lod_game_keeps_far_characters_wandering():
+    """
+    Test that in a bot game with level of detail scheduling, every AI player
+    left out of the full-detail updates could neither see the player nor
+    touch a wall, so a full update would have had it wandering too.
+    """
+    field = HungrySharksField(4000, 2000, 300, seed=6)
+    field.lod = LODScheduler()
+    runner = HeadlessRunner(field, ChaseBotInput(), fps=40)
+
+    for _ in range(200):
+        runner.step()
+        near = set(field.lod.near)
+        player = field.player.position
+        for aip in field.characters:
+            if aip in near:
+                continue
+            assert abs(aip.position - player) >= aip.fov()
+            assert min(field.get_dist_to_walls(aip)) > 25
+        if field.game_end:
+            break
+    assert field.lod.far_updates > 0
+
+
+def test_lod_budget_defers_far_updates():
+    """
+    Test that far updates stop once the tick's time budget is spent, while
+    near AI players still move.
+    """
+    field = HungrySharksField(3000, 3000, 0)
+    near = field.spawn_new_ai(AIPlayer(1, Vector2(1600, 1500), Vector2(0, 40), "wander"))
+    far = field.spawn_new_ai(AIPlayer(1, Vector2(500, 500), Vector2(0, 40), "wander"))
+    field.lod = LODScheduler(budget=0)
+    controller = AIVelocityController(field, fps=40)
+
+    for _ in range(3):
+        controller.move()
+        field.sim_clock.advance(1/40)
+
+    assert near.position.y > 1500
+    assert far.position.y == 500
+    assert field.lod.over_budget == 3
+
+
+def test_lod_forgets_recycled_characters():
+    """
+    Test that an AIPlayer the entity pool recycles into a new AI player is
+    moved by one tick's time on its first update, not by all the time since
+    the despawned AI player it used to be was last moved.
+    """
+    field = HungrySharksField(3000, 3000, 0)
+    field.lod = LODScheduler()
+    controller = AIVelocityController(field, fps=40)
+    pool = field.characters.pool
+    old = field.spawn_new_ai(pool.acquire(1, 1500, 1700, 0, 40, "flee"))
+    controller.move()
+    field.despawn_ai(old)
+    field._reclaim_despawned()
+    field.sim_clock.advance(1.0)
+
+    new = field.spawn_new_ai(pool.acquire(1, 1500, 1700, 0, 40, "flee"))
+    assert new is old
+    controller.move()
+
+    assert new.position.y - 1700 == pytest.approx(new.max_speed() / 40)
+
+
+# KINETIC EVENTS
+
+def test_kinetic_event_waits_for_earliest_contact():
+    """
+    Test that a wandering AI player is not checked again until it could first
+    reach the player's fov, and that despawning it drops its event.
+    """
+    field = HungrySharksField(3000, 3000, 0)
+    aip = field.spawn_new_ai(AIPlayer(1, Vector2(1500, 2000), Vector2(0, -40), "wander"))
+    field.kinetic = KineticEventQueue(field.characters)
+
+    field.update_ai_behaviors()
+    assert field.kinetic.checked == 1
+    assert field.kinetic.active == []
+    wait = (500 - aip.fov()) / (aip.max_speed() + max_player_speed())
+    event_time = field.kinetic.next_event_time()
+    assert event_time == pytest.approx(wait, rel=0.02)
+    assert event_time <= wait
+
+    assert field.kinetic.due(event_time - 0.01) == []
+    assert field.kinetic.due(event_time) == [aip]
+    field.kinetic.reschedule(field, aip, event_time)
+    field.despawn_ai(aip)
+    assert len(field.kinetic) == 0
+    assert field.kinetic.next_event_time() is None
+
+
+def test_kinetic_keeps_interacting_characters_active():
+    """
+    Test that AI players near a wall, within reach of the player or not
+    wandering are checked every tick.
+    """
+    field = HungrySharksField(3000, 3000, 0)
+    by_wall = field.spawn_new_ai(AIPlayer(1, Vector2(20, 1000), Vector2(0, 40), "wander"))
+    by_player = field.spawn_new_ai(AIPlayer(1, Vector2(1500, 1600), Vector2(0, 40), "wander"))
+    far = field.spawn_new_ai(AIPlayer(1, Vector2(800, 800), Vector2(0, 40), "wander"))
+    field.kinetic = KineticEventQueue(field.characters)
+
+    field.update_ai_behaviors()
+    assert by_player.behavior_state == "flee"
+    assert set(field.kinetic.active) == {by_wall, by_player}
+    assert field.kinetic.due(field.sim_clock.time) == [by_wall, by_player]
+    assert far not in field.kinetic.active
+
+
+def test_kinetic_game_matches_full_updates():
+    """
+    Test that a bot game with kinetic events plays out exactly like one that
+    checks every AI player every tick, while checking far fewer.
+    """
+    fields = [HungrySharksField(4000, 2000, 300, seed=9) for _ in range(2)]
+    fields[1].kinetic = KineticEventQueue(fields[1].characters)
+    runners = [HeadlessRunner(field, ChaseBotInput(), fps=40) for field in fields]
+
+    checked = 0
+    for _ in range(300):
+        for runner in runners:
+            runner.step()
+        checked += fields[1].kinetic.checked
+        if fields[0].game_end:
+            break
+
+    full, kinetic = (take_snapshot(field) for field in fields)
+    assert full[0].tobytes() == kinetic[0].tobytes()
+    assert full[1].tobytes() == kinetic[1].tobytes()
+    assert checked < 300 * 300 / 4
+
+
+# SWEPT COLLISIONS
+
+@pytest.mark.parametrize("field_class", [HungrySharksField, HungrySharksArrayField])
+def test_swept_collision_catches_pass_through(field_class):
+    """
+    Test that an AI player the player swam through during a tick is eaten,
+    even though they are too far apart at its end, and that several are
+    reached in order along the path.
+
+    Args:
+        field_class: the field backend to test
+    """
+    field = field_class(1000, 600, 0)
+    field.player.translate(-50, 0)
+    second = field.spawn_new_ai(AIPlayer(1, Vector2(480, 310), Vector2(0, 0), "wander"))
+    first = field.spawn_new_ai(AIPlayer(1, Vector2(460, 290), Vector2(0, 0), "wander"))
+    field.start_tick(1/40)
+    # the player swims from (450, 300) to (550, 300) in 1/40 s
+    field.player.translate(100, 0)
+    assert field.player_collisions() == []
+    assert field.player_collisions(1/40) == [first, second]
+
+    field.handle_eating_and_win_lose(1/40)
+    assert len(field.characters) == 2
+    assert first not in list(field.characters)
+    assert field.player.growth_progress > 0
+
+
+def test_swept_collision_ignores_paths_crossed_at_different_times():
+    """
+    Test that an AI player crossing the player's path after the player has
+    gone by doesn't collide with it.
+    """
+    field = HungrySharksField(1000, 600, 0)
+    field.player.translate(-50, 0)
+    aip = field.spawn_new_ai(AIPlayer(1, Vector2(450, 200), Vector2(0, 2400), "wander"))
+    field.start_tick(1/40)
+    # swims from (450, 200) to (450, 260) while the player goes by
+    field.player.translate(100, 0)
+    aip.translate(0, 60)
+    assert field.player_collisions(1/40) == []
+    assert swept_contact(field.player, aip, (450, 300), (450, 200)) is None
+
+    # one that started on top of the player collides from the start
+    assert swept_contact(field.player, aip, (0, 0), (10, 0)) == 0
+
+
+@pytest.mark.parametrize("field_class", [HungrySharksField, HungrySharksArrayField])
+def test_swept_collision_ignores_turning_in_place(field_class):
+    """
+    Test that an AI player just out of reach that turns on the spot (a
+    wander turn moves it nowhere) isn't eaten as if it had swum backwards
+    into the player along its velocity.
+
+    Args:
+        field_class: the field backend to test
+    """
+    field = field_class(1000, 600, 0)
+    field.sim_clock.reset(0.5)
+    aip = field.spawn_new_ai(AIPlayer(1, Vector2(531, 300), Vector2(100, 0), "wander"))
+    aip.prev_tick = 0
+    player_input = ScriptedInput(lambda field, tick: ((500, 300), False))
+    player_controller = PlayerVelocityController(field, player_input, fps=40)
+    ai_controller = AIVelocityController(field, fps=40)
+    step_game(field, player_controller, ai_controller, 1/40)
+
+    assert (aip.position.x, aip.position.y) == (531, 300)
+    assert (aip.velocity.x, aip.velocity.y) != (100, 0)
+    assert len(field.characters) == 1
+    assert field.player.growth_progress == 0
+
+
+@pytest.mark.parametrize("field_class", [HungrySharksField, HungrySharksArrayField])
+def test_swept_collision_follows_stopped_characters(field_class):
+    """
+    Test that an AI player that swam through the player and stopped (zero
+    velocity, as move_toward_point leaves it) is followed along the path it
+    actually took, not treated as if it had been still all tick.
+
+    Args:
+        field_class: the field backend to test
+    """
+    field = field_class(1000, 600, 0)
+    aip = field.spawn_new_ai(AIPlayer(1, Vector2(500, 265), Vector2(0, 0), "wander"))
+    field.start_tick(1/40)
+    aip.translate(0, 70)
+
+    assert field.player_collisions() == []
+    assert field.player_collisions(1/40) == [aip]
+
+
+def test_swept_contacts_kernel_matches_swept_contact():
+    """
+    Test that the batched swept collision test agrees with the per-pair one.
+    """
+    rng = random.Random(4)
+    player = Player(2, Vector2(500, 500))
+    offsets, displacements, expected = [], [], []
+    for _ in range(500):
+        player.velocity = Vector2(rng.uniform(-300, 300), rng.uniform(-300, 300))
+        aip = AIPlayer(1, Vector2(500 + rng.uniform(-80, 80), 500 + rng.uniform(-80, 80)),\
+            Vector2(rng.uniform(-300, 300), rng.uniform(-300, 300)), "wander")
+        offsets.append((aip.position.x - 500, aip.position.y - 500))
+        displacements.append(((aip.velocity.x - player.velocity.x) / 10,\
+            (aip.velocity.y - player.velocity.y) / 10))
+        # each moved at its velocity for 1/10 s
+        contact = swept_contact(player, aip,\
+            (500 - player.velocity.x / 10, 500 - player.velocity.y / 10),\
+            (aip.position.x - aip.velocity.x / 10, aip.position.y - aip.velocity.y / 10))
+        expected.append(np.inf if contact is None else contact)
+
+    contacts = behavior_kernels.swept_contacts(np.array(offsets),\
+        np.array(displacements), COLLISION_RADIUS)
+    assert contacts == pytest.approx(expected)
+    assert 0 < np.count_nonzero(np.isfinite(contacts)) < 500
+
+
+# INDEXED POPULATION
+
+def test_indexed_population_swap_removes_by_entity_id():
+    """
+    Test that removing an AI player moves the last one into its place, that
+    entity ids keep finding the right AI players and that sizes are counted.
+    """
+    characters = [AIPlayer(size, Vector2(0, 0), Vector2(0, 0), "wander")
+                  for size in (1, 2, 2, 3, 5)]
+    population = IndexedPopulation(characters)
+    ids = [make_entity_id(slot, 0) for slot in range(5)]
+    assert [aip.entity_id for aip in population] == ids
+
+    assert population.remove_id(ids[1]) is characters[1]
+    assert list(population) == [characters[0], characters[4], characters[2],\
+        characters[3]]
+    assert population.get(ids[4]) is characters[4]
+    assert population.get(ids[1]) is None
+    assert characters[1] not in population
+    with pytest.raises(ValueError):
+        population.remove(characters[1])
+
+    population.remove(characters[4])
+    assert population.size_counts.count(2) == 1
+    assert population.size_counts.count(5) == 0
+    assert population.count_larger(1) == 2
+    assert len(population) == 3
+
+
+def test_size_counts_follow_the_threshold_both_ways():
+    """
+    Test that the count of AI players bigger than a size stays right as the
+    size moves up and down and AI players come and go.
+    """
+    counts = SizeCounts([1, 3, 3, 4, 6])
+    assert counts.count_larger(2) == 4
+    assert counts.count_larger(4) == 1
+    counts.add(5)
+    counts.discard(1)
+    assert counts.count_larger(4) == 2
+    assert counts.count_larger(0) == 5
+    assert counts.count_larger(3) == 3
+
+
+@pytest.mark.parametrize("field_class", [HungrySharksField, HungrySharksArrayField])
+def test_enemy_count_stays_correct_as_the_player_grows(field_class):
+    """
+    Test that the incrementally counted number of enemies matches a full
+    count after every tick of a bot game, through eating and growing.
+
+    Args:
+        field_class: the field backend to test
+    """
+    field = field_class(1200, 600, 60, seed=5)
+    runner = HeadlessRunner(field, ChaseBotInput(), fps=40)
+    sizes = {field.player.size}
+    for _ in range(2000):
+        runner.step()
+        sizes.add(field.player.size)
+        assert field.get_num_enemies()\
+            == sum(aip.size > field.player.size for aip in field.characters)
+        if field.game_end:
+            break
+    assert len(sizes) > 1
+
+
+# ENTITY POOL
+
+def test_entity_pool_recycles_with_new_generations():
+    """
+    Test that a released AI player's object comes back as a new AI player
+    only after a reclaim, with an id its old one can't be mistaken for.
+    """
+    pool = EntityPool()
+    aip = pool.acquire(3, 10, 20, 1, 0)
+    old_id = aip.entity_id
+    pool.release(aip)
+    assert pool.get(old_id) is None
+    assert aip.entity_id is None
+    with pytest.raises(ValueError):
+        pool.release(aip)
+
+    # not reused within the same tick
+    other = pool.acquire(1, 0, 0, 0, 0)
+    assert other is not aip
+    pool.reclaim()
+    again = pool.acquire(5, 30, 40, 0, 2, "attack")
+    assert again is aip
+    assert again.entity_id != old_id
+    assert pool.get(old_id) is None
+    assert pool.get(again.entity_id) is aip
+    assert (again.size, again.position, again.velocity, again.behavior_state)\
+        == (5, Vector2(30, 40), Vector2(0, 2), "attack")
+    assert again.growth_progress == 0
+    assert pool.allocated == 2
+    assert len(pool) == 2
+
+
+def test_eating_recycles_ai_players():
+    """
+    Test that in a bot game respawns reuse eaten AI players' objects, and
+    that eaten AI players' ids go stale.
+    """
+    field = HungrySharksField(1200, 600, 60, seed=5)
+    pool = field.characters.pool
+    runner = HeadlessRunner(field, ChaseBotInput(), fps=40)
+    eaten = []
+    ids = {aip.entity_id for aip in field.characters}
+    for _ in range(2000):
+        runner.step()
+        new_ids = {aip.entity_id for aip in field.characters}
+        eaten.extend(ids - new_ids)
+        ids = new_ids
+        if field.game_end:
+            break
+
+    assert len(eaten) > 10
+    assert pool.allocated <= 60 + 3
+    assert not any(pool.is_alive(entity_id) for entity_id in eaten)
+    assert all(field.characters.get(aip.entity_id) is aip for aip in field.characters)
+
+
+@pytest.mark.parametrize("field_class", [HungrySharksField, HungrySharksArrayField])
+def test_bulk_spawn(field_class):
+    """
+    Test that spawning thousands of AI players at once places them within
+    the spawn area, heads them at their full speed and is reproducible from
+    the field's seed (and the same for both backends).
+
+    Args:
+        field_class: the field backend to test
+    """
+    sizes = [1 + i % 10 for i in range(5000)]
+    fields = [field_class(4000, 3000, 0, seed=2), HungrySharksField(4000, 3000, 0, seed=2)]
+    for field in fields:
+        field.spawn_ais(sizes, area=(100, 900, 200, 700))
+    field = fields[0]
+
+    assert len(field.characters) == 5000
+    assert field.characters.count_larger(9) == 500
+    positions = np.array([(aip.position.x, aip.position.y) for aip in field.characters])
+    assert positions[:, 0].min() >= 100 and positions[:, 0].max() < 900
+    assert positions[:, 1].min() >= 200 and positions[:, 1].max() < 700
+    for aip in list(field.characters)[:50]:
+        assert abs(aip.velocity) == pytest.approx(aip.max_speed())
+        assert aip.behavior_state == "wander"
+
+    assert sorted(map(tuple, positions)) == sorted(
+        (aip.position.x, aip.position.y) for aip in fields[1].characters)
@@ -0,0 +1,377 @@
+"""
+Many Hungry Sharks games stepped together, for training bot players.
+
+Every game's state lives in shared NumPy arrays (one row per game, or one row
+per AI player of each game), so a single step() call advances thousands of
+games without a Python loop per game. The rules are the same as
+HungrySharksField's and the controllers'.
+"""
+import numpy as np
+from hungry_sharks_field import HungrySharksField, COLLISION_RADIUS
+from character_arrays import BEHAVIOR_CODES
+import behavior_kernels
+
+# game_end of each game as a code, same strings as HungrySharksField.game_end
+OUTCOMES = ("", "win", "lose")
+
+# player values per game in an observation
+PLAYER_FEATURES = 4
+# values per AI player in an observation
+AI_FEATURES = 3
+
+
+class VectorSharksEnv():
+    """
+    A batch of independent Hungry Sharks games with the same field size and
+    number of AI players.
+
+    Actions are one (x, y, boost) row per game: the point the player moves
+    toward and whether it boosts, as a PlayerInput would give to
+    PlayerVelocityController. Finished games are not stepped until they are
+    reset.
+
+    Attributes:
+        num_envs (int): number of games
+        num_characters (int): AI players per game
+        window_x, window_y (float): field size
+        _fps (int): simulation ticks per game second (sets the timestep)
+        max_ticks (int): ticks after which a game ends as a timeout, or None
+        time (float): game time shared by every game (AI wander clocks only
+            use differences of it)
+        ticks: (num_envs,) ticks since each game was reset
+        player_positions, player_velocities: (num_envs, 2) player state
+        player_sizes: (num_envs,) player sizes
+        player_growth: (num_envs,) player growth progress
+        player_boost: (num_envs,) whether each player is boosting
+        ai_positions, ai_velocities: (num_envs * num_characters, 2) AI state,
+            game by game
+        ai_sizes, ai_behaviors, ai_clocks, ai_prev_ticks:
+            (num_envs * num_characters,) AI state
+        outcomes: (num_envs,) index into OUTCOMES of each game's game_end
+        timed_out: (num_envs,) whether each game ended by reaching max_ticks
+        _rng (numpy.random.Generator): source of all randomness
+    """
+    def __init__(self, num_envs, num_characters=10, window_x=1200, window_y=600,\
+            fps=40, max_ticks=None, seed=None):
+        self.num_envs = num_envs
+        self.num_characters = num_characters
+        self.window_x = window_x
+        self.window_y = window_y
+        self._fps = fps
+        self.max_ticks = max_ticks
+        self._rng = np.random.default_rng(seed)
+        self.time = 0.0
+
+        num_ais = num_envs * num_characters
+        self.ticks = np.zeros(num_envs, dtype=np.int64)
+        self.player_positions = np.zeros((num_envs, 2))
+        self.player_velocities = np.zeros((num_envs, 2))
+        self.player_sizes = np.zeros(num_envs, dtype=np.int64)
+        self.player_growth = np.zeros(num_envs)
+        self.player_boost = np.zeros(num_envs, dtype=bool)
+        self.ai_positions = np.zeros((num_ais, 2))
+        self.ai_velocities = np.zeros((num_ais, 2))
+        self.ai_sizes = np.zeros(num_ais, dtype=np.int64)
+        self.ai_behaviors = np.zeros(num_ais, dtype=np.int8)
+        self.ai_clocks = np.zeros(num_ais)
+        self.ai_prev_ticks = np.zeros(num_ais)
+        self.outcomes = np.zeros(num_envs, dtype=np.int8)
+        self.timed_out = np.zeros(num_envs, dtype=bool)
+        self.reset()
+
+    @property
+    def observation_size(self):
+        """
+        Returns the length of one game's observation vector.
+        """
+        return PLAYER_FEATURES + AI_FEATURES * self.num_characters
+
+    @property
+    def done(self):
+        """
+        Returns a (num_envs,) bool array of the games that have ended.
+        """
+        return (self.outcomes != 0) | self.timed_out
+
+    def _ai_rows(self, envs):
+        """
+        Returns the AI player rows of some games.
+
+        Args:
+            envs (array): game indices
+        """
+        return (envs[:, np.newaxis] * self.num_characters\
+            + np.arange(self.num_characters)).ravel()
+
+    def _random_ai_state(self, rows, sizes):
+        """
+        Gives AI players a random position and heading, like
+        HungrySharksField.get_new_ai.
+
+        Args:
+            rows (array): AI player rows
+            sizes (array): new size of each of those AI players
+        """
+        count = len(rows)
+        self.ai_sizes[rows] = sizes
+        self.ai_positions[rows, 0] = self._rng.integers(50, self.window_x - 50, count)
+        self.ai_positions[rows, 1] = self._rng.integers(50, self.window_y - 50, count)
+        headings = self._rng.integers(-10, 10, (count, 2)).astype(float)
+        lengths = np.sqrt(np.einsum("ij,ij->i", headings, headings))
+        lengths[lengths == 0] = 1
+        self.ai_velocities[rows] = headings / lengths[:, np.newaxis]\
+            * behavior_kernels.SPEED_BY_SIZE[sizes][:, np.newaxis]
+        self.ai_behaviors[rows] = BEHAVIOR_CODES["wander"]
+        self.ai_clocks[rows] = 0
+
+    def reset(self, envs=None):
+        """
+        Starts games over: the player is back in the middle at size 2 and the
+        AI players are new minnows.
+
+        Args:
+            envs (array, optional): indices (or a bool mask) of the games to
+                reset. Defaults to every game.
+
+        Returns:
+            (array): (num_envs, observation_size) observations of every game
+        """
+        if envs is None:
+            envs = np.arange(self.num_envs)
+        envs = np.asarray(envs)
+        if envs.dtype == bool:
+            envs = np.flatnonzero(envs)
+
+        self.ticks[envs] = 0
+        self.player_positions[envs] = (self.window_x/2, self.window_y/2)
+        self.player_velocities[envs] = 0
+        self.player_sizes[envs] = 2
+        self.player_growth[envs] = 0
+        self.player_boost[envs] = False
+        self.outcomes[envs] = 0
+        self.timed_out[envs] = False
+
+        rows = self._ai_rows(envs)
+        self._random_ai_state(rows, np.ones(len(rows), dtype=np.int64))
+        self.ai_prev_ticks[rows] = self.time
+        return self.observe()
+
+    def observe(self):
+        """
+        Returns every game's observation vector: the player's position
+        (as fractions of the field size), size / 10 and growth progress / 100,
+        then each AI player's offset from the player (as fractions of the field
+        size) and size difference / 10, nearest AI player first.
+
+        Returns:
+            (array): (num_envs, observation_size) float32 observations
+        """
+        observations = np.empty((self.num_envs, self.observation_size),\
+            dtype=np.float32)
+        observations[:, 0] = self.player_positions[:, 0] / self.window_x
+        observations[:, 1] = self.player_positions[:, 1] / self.window_y
+        observations[:, 2] = self.player_sizes / 10
+        observations[:, 3] = self.player_growth / 100
+        if not self.num_characters:
+            return observations
+
+        shape = (self.num_envs, self.num_characters)
+        offsets = self.ai_positions.reshape(shape + (2,))\
+            - self.player_positions[:, np.newaxis]
+        order = np.argsort(np.einsum("eij,eij->ei", offsets, offsets), axis=1)
+        offsets = np.take_along_axis(offsets, order[:, :, np.newaxis], axis=1)
+        sizes = np.take_along_axis(self.ai_sizes.reshape(shape), order, axis=1)
+
+        ai_features = observations[:, PLAYER_FEATURES:].reshape(shape + (AI_FEATURES,))
+        ai_features[:, :, 0] = offsets[:, :, 0] / self.window_x
+        ai_features[:, :, 1] = offsets[:, :, 1] / self.window_y
+        ai_features[:, :, 2] = (sizes - self.player_sizes[:, np.newaxis]) / 10
+        return observations
+
+    def _progress(self):
+        """
+        Returns each player's size plus its growth toward the next size.
+        """
+        return self.player_sizes + self.player_growth / 100
+
+    def _move_players(self, envs, targets, boosts, timestep):
+        """
+        Moves players toward their targets, like PlayerVelocityController.move:
+        the speed and boost growth cost use the boost of the previous tick,
+        then the new boost takes effect.
+        """
+        displacement = targets - self.player_positions[envs]
+        distance = np.sqrt(np.einsum("ij,ij->i", displacement, displacement))
+        moving = distance >= 5
+        boosting = self.player_boost[envs]
+        boost_scale = np.where(boosting & (self.player_growth[envs] > 0), 1.5, 1)
+        scale = np.zeros_like(distance)
+        scale[moving] = behavior_kernels.SPEED_BY_SIZE[self.player_sizes[envs[moving]]]\
+            * boost_scale[moving] / distance[moving]
+
+        self.player_velocities[envs] = displacement * scale[:, np.newaxis]
+        # boosting costs 15 growth progress points / second
+        self.player_growth[envs[boosting]] -= 15 * timestep
+        self.player_positions[envs] += self.player_velocities[envs] * timestep
+        self.player_boost[envs] = boosts
+
+    def _move_ais(self, rows, timestep):
+        """
+        Moves AI players by behavior state, like
+        AIVelocityController.move_batched.
+        """
+        owner_positions = self.player_positions[rows // max(self.num_characters, 1)]
+        behaviors = self.ai_behaviors[rows]
+
+        behavior_kernels.wander(self.ai_positions, self.ai_velocities,\
+            self.ai_clocks, self.ai_prev_ticks,\
+            rows[behaviors == BEHAVIOR_CODES["wander"]], self.time, timestep,\
+            rng=self._rng)
+        for code, flee in ((BEHAVIOR_CODES["attack"], False),\
+                (BEHAVIOR_CODES["flee"], True)):
+            chosen = behaviors == code
+            behavior_kernels.pursue(self.ai_positions, self.ai_velocities,\
+                self.ai_sizes, rows[chosen], owner_positions[chosen], timestep,\
+                flee=flee)
+        behavior_kernels.bounce(self.ai_positions, self.ai_velocities,\
+            rows[behaviors == BEHAVIOR_CODES["avoid walls"]],\
+            self.window_x, self.window_y, timestep)
+
+    def _update_behaviors(self, rows):
+        """
+        Updates AI behavior states, like HungrySharksField.update_ai_behaviors.
+        """
+        owners = rows // max(self.num_characters, 1)
+        self.ai_behaviors[rows] = behavior_kernels.classify_behaviors(\
+            self.ai_positions[rows], self.ai_velocities[rows], self.ai_sizes[rows],\
+            self.ai_behaviors[rows], self.player_positions[owners],\
+            self.player_sizes[owners], self.window_x, self.window_y)
+
+    def _respawn(self, envs, rows):
+        """
+        Replaces eaten AI players with new ones, sized and placed like
+        HungrySharksField.handle_eating_and_win_lose does.
+
+        Args:
+            envs (array): the games the eaten AI players were in
+            rows (array): the eaten AI players' rows
+        """
+        player_sizes = self.player_sizes[envs]
+        shape = (self.num_envs, self.num_characters)
+        enemies = np.count_nonzero(self.ai_sizes.reshape(shape)[envs]\
+            > player_sizes[:, np.newaxis], axis=1)
+        # the eaten AI player no longer counts
+        enemies -= self.ai_sizes[rows] > player_sizes
+
+        # smaller or one size bigger than the player, within sizes 1-10
+        low = np.maximum(1, np.minimum(player_sizes - 2, 9))
+        high = np.where(enemies < HungrySharksField.max_nemeses,\
+            np.minimum(player_sizes + 3, 10), np.minimum(player_sizes, 10))
+        self._random_ai_state(rows, self._rng.integers(low, high))
+        self.ai_prev_ticks[rows] = 0
+
+        # move new AI players that could see the player to a safe distance
+        fovs = behavior_kernels.FOV_BY_SIZE[self.ai_sizes[rows]]
+        player_positions = self.player_positions[envs]
+        offsets = self.ai_positions[rows] - player_positions
+        too_close = np.sqrt(np.einsum("ij,ij->i", offsets, offsets)) < fovs + 50
+        to_center = (self.window_x/2, self.window_y/2) - player_positions[too_close]
+        lengths = np.sqrt(np.einsum("ij,ij->i", to_center, to_center))
+        lengths[lengths == 0] = 1
+        self.ai_positions[rows[too_close]] = player_positions[too_close]\
+            + to_center / lengths[:, np.newaxis]\
+            * (fovs[too_close] * 1.25)[:, np.newaxis]
+
+    def _offsets(self, rows):
+        """
+        Returns the offsets of some AI rows from their games' players.
+        """
+        owners = rows // max(self.num_characters, 1)
+        return self.ai_positions[rows] - self.player_positions[owners]
+
+    def _handle_eating(self, envs, rows, start_offsets):
+        """
+        Resolves collisions between players and AI players, like
+        HungrySharksField.handle_eating_and_win_lose: AI players a player
+        touched at any point during the tick collide with it, a bigger AI
+        player ends the game, a smaller one is eaten (growing the player) and
+        replaced. Several collisions in one game are handled one after
+        another, in AI row order.
+
+        Args:
+            envs (array): the games being stepped
+            rows (array): their AI rows
+            start_offsets (array): the rows' offsets from their players at
+                the start of the tick (see _offsets)
+        """
+        owners = rows // max(self.num_characters, 1)
+        offsets = self._offsets(rows)
+        displacements = offsets - start_offsets
+        colliding = np.isfinite(behavior_kernels.swept_contacts(offsets,\
+            displacements, COLLISION_RADIUS))
+        rows, owners = rows[colliding], owners[colliding]
+
+        # the k-th collision of every game is handled in round k
+        first = np.ones(len(owners), dtype=bool)
+        first[1:] = owners[1:] != owners[:-1]
+        starts = np.flatnonzero(first)
+        ranks = np.arange(len(owners)) - np.repeat(starts, np.diff(np.append(starts,\
+            len(owners))))
+        for rank in range(ranks.max() + 1 if len(ranks) else 0):
+            this_round = ranks == rank
+            round_rows, round_envs = rows[this_round], owners[this_round]
+            ai_sizes = self.ai_sizes[round_rows]
+            player_sizes = self.player_sizes[round_envs]
+
+            self.outcomes[round_envs[ai_sizes > player_sizes]] = OUTCOMES.index("lose")
+
+            eaten = ai_sizes < player_sizes
+            eaten_rows, eater_envs = round_rows[eaten], round_envs[eaten]
+            self.player_growth[eater_envs] += HungrySharksField.growth_rate\
+                * ai_sizes[eaten] / player_sizes[eaten] * 100
+            evolved = eater_envs[self.player_growth[eater_envs] > 100]
+            self.player_growth[evolved] = 15
+            self.player_sizes[evolved] += 1
+            self._respawn(eater_envs, eaten_rows)
+
+        self.outcomes[envs[self.player_sizes[envs] > 10]] = OUTCOMES.index("win")
+
+    def step(self, actions):
+        """
+        Runs one tick of every game that hasn't ended: player control, AI
+        control, then behavior updates and eating (like step_game).
+
+        Args:
+            actions (array): (num_envs, 3) rows of target x, target y and
+                boost (nonzero to boost)
+
+        Returns:
+            (tuple): (observations, rewards, done). Observations are as from
+            observe(). Rewards are each player's growth this tick, in sizes
+            (size plus growth progress / 100), so boosting costs reward and
+            evolving is worth about one. Done flags the games that have ended,
+            including earlier ones (which get no reward).
+        """
+        actions = np.asarray(actions, dtype=float)
+        timestep = 1/self._fps
+        envs = np.flatnonzero(~self.done)
+        rows = self._ai_rows(envs)
+        before = self._progress()
+
+        start_offsets = self._offsets(rows)
+
+        # control
+        self._move_players(envs, actions[envs, :2], actions[envs, 2] != 0, timestep)
+        self._move_ais(rows, timestep)
+
+        # update model to valid state
+        self._update_behaviors(rows)
+        self._handle_eating(envs, rows, start_offsets)
+        self.time += timestep
+        self.ticks[envs] += 1
+        if self.max_ticks is not None:
+            self.timed_out[envs] = (self.ticks[envs] >= self.max_ticks)\
+                & (self.outcomes[envs] == 0)
+
+        rewards = self._progress() - before
+        return self.observe(), rewards, self.done